@@ -0,0 +1,178 @@
+"""
+End-to-end latency benchmark of Neo against the local mock server.
+
+Runs full turns (prompt, streamed reply, MCP tags, follow-up) through the
+real NeoAI engine and reports where the time goes: client-side time to
+first token, parse/render overhead of the streamed deltas, tool round
+trips, total turn time and turns per second. The mock server's own
+scripted time is subtracted to estimate Neo's overhead.
+
+Usage:
+    python benchmarks/bench_e2e.py [--mode lm_studio] [--turns 20] [--ttft 0.1] [--tps 200]
+                                   [--chunk-chars 4] [--script replies.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import contextlib
+
+# Keep the benchmark's token cache, FIFO and logs away from a real Neo session
+tempfile.tempdir = tempfile.mkdtemp(prefix="neo-bench-")
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockSettings, start_server
+from src.ai_core import AsyncNeoAI, NeoAI
+
+
+def build_config(mode, base_url):
+    """Neo configuration pointing the selected backend at the mock server."""
+    config = {
+        "mode": mode,
+        "command_approval": {"require_approval": False, "auto_approve_all": True},
+        "cache": {"enabled": False},
+    }
+    if mode == "lm_studio":
+        config.update({"api_url": f"{base_url}/v1", "api_key": "mock", "model": "mock-model"})
+    elif mode == "openai":
+        config["openai_config"] = {"api_url": f"{base_url}/v1", "api_key": "mock", "model": "mock-model"}
+    elif mode == "digital_ocean":
+        config["digital_ocean_config"] = {
+            "agent_id": "mock-agent",
+            "agent_key": "mock-key",
+            "agent_endpoint": f"{base_url}/api/v1",
+            "auth_api_url": f"{base_url}/api/v1",
+            "model": "mock-model",
+        }
+    return config
+
+
+class InstrumentedNeoAI(AsyncNeoAI):
+    """AsyncNeoAI recording when deltas arrive and how long handling them takes."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.first_delta_at = None
+        self.feed_time = 0.0
+        self.deltas = 0
+
+    def _create_response_stream(self, clear_thinking):
+        stream = super()._create_response_stream(clear_thinking)
+        feed = stream.feed
+
+        def timed_feed(content):
+            started = time.perf_counter()
+            if self.first_delta_at is None:
+                self.first_delta_at = started
+            feed(content)
+            self.feed_time += time.perf_counter() - started
+            self.deltas += 1
+
+        stream.feed = timed_feed
+        return stream
+
+    def start_turn(self):
+        self.first_delta_at = None
+        self.feed_time = 0.0
+        self.deltas = 0
+
+
+def summarize(values):
+    """Mean, median and 95th percentile of a list of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0, 0.0, 0.0
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * len(ordered))) - 1)]
+    return sum(ordered) / len(ordered), ordered[len(ordered) // 2], p95
+
+
+def report(name, values, unit="ms", scale=1000.0):
+    mean, p50, p95 = summarize(values)
+    print(f"{name:<32} mean {mean * scale:>9.2f} {unit}   p50 {p50 * scale:>9.2f} {unit}   "
+          f"p95 {p95 * scale:>9.2f} {unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark against the mock server")
+    parser.add_argument("--mode", default="lm_studio", choices=["lm_studio", "openai", "digital_ocean"],
+                        help="Backend to exercise")
+    parser.add_argument("--turns", type=int, default=20, help="Timed turns")
+    parser.add_argument("--ttft", type=float, default=0.1, help="Mock time to first token (seconds)")
+    parser.add_argument("--tps", type=float, default=200.0, help="Mock deltas per second, 0 for unthrottled")
+    parser.add_argument("--chunk-chars", type=int, default=4, help="Characters per delta")
+    parser.add_argument("--script", help="JSON file with the list of scripted replies")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r") as f:
+            script = json.load(f)
+
+    settings = MockSettings(args.ttft, args.tps, args.chunk_chars, script)
+    server = start_server(settings)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    config = build_config(args.mode, base_url)
+    engine = InstrumentedNeoAI(config)
+    neo = NeoAI(config, engine=engine)
+
+    ttft, feed, per_delta, tool, model, turn, overhead = [], [], [], [], [], [], []
+    sink = io.StringIO()
+
+    try:
+        # Warm-up turn: context gathering, connection setup, token fetch
+        with contextlib.redirect_stdout(sink):
+            neo.query("Warm-up")
+        baseline = len(engine.history)
+
+        started_all = time.perf_counter()
+        for number in range(args.turns):
+            # Every timed turn starts from the same history
+            del engine.history[baseline:]
+            engine.start_turn()
+            sink.seek(0)
+            sink.truncate()
+
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(sink):
+                neo.query(f"Benchmark turn {number}")
+            elapsed = time.perf_counter() - started
+
+            steps = engine.last_run["steps"]
+            scripted = sum(settings.streaming_time(step["response"]) for step in steps)
+
+            turn.append(elapsed)
+            ttft.append(engine.first_delta_at - started if engine.first_delta_at else 0.0)
+            feed.append(engine.feed_time)
+            per_delta.append(engine.feed_time / max(1, engine.deltas))
+            tool.append(sum(step["tool_time"] for step in steps))
+            model.append(sum(step["model_time"] for step in steps))
+            overhead.append(elapsed - scripted)
+        total = time.perf_counter() - started_all
+
+    finally:
+        neo.close()
+        server.shutdown()
+
+    print(f"Mode {args.mode}: {args.turns} turns of {len(steps)} steps, mock ttft {args.ttft * 1000:.0f} ms, "
+          f"{args.tps:.0f} deltas/s of {args.chunk_chars} chars\n")
+    report("Client time to first token", ttft)
+    report("Parse/render per turn", feed)
+    report("Parse/render per delta", per_delta, "us", 1e6)
+    report("Tool round trip per turn", tool)
+    report("Model time per turn", model)
+    report("Turn time", turn)
+    report("Neo overhead per turn", overhead)
+    print(f"\n{args.turns / total:.2f} turns/s")
+
+
+if __name__ == "__main__":
+    main()
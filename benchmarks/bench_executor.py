@@ -0,0 +1,100 @@
+"""
+Per-command overhead benchmark of the persistent terminal executor.
+
+Runs 'true' through the persistent terminal protocol (command FIFO, status
+FIFO, output file) with the shell started on pipes or on a pseudo-terminal
+instead of in a terminal window, and compares it with running the same
+command in a plain subprocess. The difference is the executor's overhead per
+command. The shell pool is measured with --parallel commands in flight.
+
+Usage:
+    python benchmarks/bench_executor.py [--runs 200] [--command true] [--parallel 4] [--backend pipe]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import contextlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep the benchmark's FIFOs and output file away from a real Neo session
+tempfile.tempdir = tempfile.mkdtemp(prefix="neo-bench-")
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from src.command_executor import PersistentTerminalExecutor, run_command_direct
+from src.shell_backends import SHELL_BACKENDS
+from src.shell_pool import shell_pool
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(run, runs):
+    """Run a callable repeatedly and return its durations in milliseconds."""
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run()
+        durations.append((time.perf_counter() - started) * 1000.0)
+    return durations
+
+
+def report(name, durations):
+    print(f"{name:<28} mean {sum(durations) / len(durations):>8.2f} ms   "
+          f"p50 {percentile(durations, 0.5):>8.2f} ms   p95 {percentile(durations, 0.95):>8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neo persistent terminal overhead benchmark")
+    parser.add_argument("--runs", type=int, default=200, help="Commands per measurement")
+    parser.add_argument("--command", default="true", help="Command to run")
+    parser.add_argument("--parallel", type=int, default=4, help="Commands in flight on the shell pool")
+    parser.add_argument("--backend", default="pipe", choices=["pipe", "pty"],
+                        help="Host of the persistent shell")
+    args = parser.parse_args()
+
+    executor = PersistentTerminalExecutor(tempfile.mkdtemp(), SHELL_BACKENDS[args.backend]())
+
+    def persistent():
+        executor.execute_command(args.command)
+        return executor.wait_for_command_completion()
+
+    # The spinner and newline of the executor are meant for a terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        persistent()
+        first = (time.perf_counter() - started) * 1000.0
+        terminal = measure(persistent, args.runs)
+        direct = measure(lambda: run_command_direct(args.command), args.runs)
+    subprocess_run = measure(lambda: subprocess.run(args.command, shell=True), args.runs)
+
+    shell_pool.size = args.parallel
+    with ThreadPoolExecutor(max_workers=args.parallel) as threads:
+        # Start the shells first
+        list(threads.map(lambda _: shell_pool.run(args.command), range(args.parallel)))
+        started = time.perf_counter()
+        list(threads.map(lambda _: shell_pool.run(args.command), range(args.runs)))
+        pool_elapsed = time.perf_counter() - started
+
+    print(f"'{args.command}', {args.runs} runs\n")
+    print(f"{'first command (shell start)':<28} {first:>13.2f} ms")
+    report(f"persistent terminal ({args.backend})", terminal)
+    report("run_command_direct", direct)
+    report("subprocess.run (baseline)", subprocess_run)
+    print(f"{'shell pool':<28} {args.runs / pool_elapsed:>8.0f} commands/s with {args.parallel} in flight")
+    overhead = percentile(terminal, 0.5) - percentile(subprocess_run, 0.5)
+    print(f"\nPersistent terminal overhead per command: {overhead:+.2f} ms (p50 against the baseline)")
+    executor._cleanup()
+    shell_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Micro-benchmark of the SSE stream decoding used by the chat backends.
+
+Builds a synthetic OpenAI-style completion stream, splits it into byte chunks
+the way they arrive from the network, and measures how many tokens per second
+each decoder can parse. Fast local models produce a few hundred tokens per
+second, so the decoder should be orders of magnitude above that.
+
+Usage:
+    python benchmarks/bench_sse.py [--tokens 200000] [--chunk-size 512] [--repeat 5]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from src.backends import sse
+from src.backends.sse import SSEDecoder, DONE_SENTINEL, JSON_PARSER
+
+WORDS = ["the", " command", " output", " shows", " that", " port", " 22", " is", " open", ".\n",
+         " `nmap", " -sV`", " reports", " OpenSSH", " 8.9p1", " on", " the", " host", ",", " and"]
+
+
+def build_stream(tokens, chunk_size, seed=42):
+    """Build the SSE byte stream of a completion and split it into chunks."""
+    rng = random.Random(seed)
+    parts = []
+    for index in range(tokens):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 1700000000,
+            "model": "bench-model",
+            "choices": [{"index": 0, "delta": {"content": WORDS[index % len(WORDS)]}, "finish_reason": None}],
+        }
+        parts.append(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+    parts.append(b"data: [DONE]\n\n")
+    body = b"".join(parts)
+
+    chunks = []
+    position = 0
+    while position < len(body):
+        size = rng.randint(1, chunk_size * 2)
+        chunks.append(body[position:position + size])
+        position += size
+    return body, chunks
+
+
+def stdlib_loads(data):
+    """The json fallback of the decoder when orjson is not installed."""
+    return json.loads(data.decode("utf-8"))
+
+
+def decode_legacy(chunks):
+    """Line-based decoding as done before: strip, startswith and json.loads per line."""
+    count = 0
+    pending = ""
+    for chunk in chunks:
+        text = pending + chunk.decode("utf-8", errors="replace")
+        lines = text.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            line = line.strip()
+            if line.startswith("data:"):
+                line = line[len("data:"):].strip()
+            if line:
+                try:
+                    data = json.loads(line)
+                    if "choices" in data and data["choices"]:
+                        if data["choices"][0].get("delta", {}).get("content", ""):
+                            count += 1
+                except json.JSONDecodeError:
+                    if line == "[DONE]":
+                        return count
+    return count
+
+
+def decode_incremental(chunks, loads):
+    """Incremental byte-level decoding with the given JSON parser."""
+    original = sse._json_loads
+    sse._json_loads = loads
+    try:
+        count = 0
+        decoder = SSEDecoder()
+        for chunk in chunks:
+            for data in decoder.feed(chunk):
+                if data == DONE_SENTINEL:
+                    return count
+                if sse.parse_delta(data):
+                    count += 1
+        return count
+    finally:
+        sse._json_loads = original
+
+
+def run(name, decode, chunks, tokens, body_size, repeat):
+    """Time a decoder and print its throughput."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = decode(chunks)
+        best = min(best, time.perf_counter() - start)
+    assert count == tokens, f"{name} decoded {count} of {tokens} tokens"
+    print(f"{name:<28} {tokens / best:>14,.0f} tokens/s {body_size / best / 1e6:>10.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SSE stream decoding")
+    parser.add_argument("--tokens", type=int, default=200000, help="Number of streamed deltas")
+    parser.add_argument("--chunk-size", type=int, default=512, help="Average network chunk size in bytes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per decoder, the best one is reported")
+    args = parser.parse_args()
+
+    body, chunks = build_stream(args.tokens, args.chunk_size)
+    print(f"{args.tokens:,} deltas, {len(body) / 1e6:.1f} MB in {len(chunks):,} chunks "
+          f"(fast JSON parser: {JSON_PARSER})\n")
+
+    run("legacy line-based (json)", decode_legacy, chunks, args.tokens, len(body), args.repeat)
+    run("incremental (json)", lambda c: decode_incremental(c, stdlib_loads), chunks, args.tokens, len(body), args.repeat)
+    if JSON_PARSER != "json":
+        run(f"incremental ({JSON_PARSER})", lambda c: decode_incremental(c, sse._json_loads),
+            chunks, args.tokens, len(body), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
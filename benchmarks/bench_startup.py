@@ -0,0 +1,113 @@
+"""
+Startup benchmark of Neo.
+
+Measures the wall time of fresh interpreters running the startup steps that
+come before the first prompt (importing the engine, creating it, the daemon
+client), next to a bare interpreter, and lists the slowest imports reported by 'python -X importtime'.
+Exits with status 1 when the engine startup exceeds the budget, so it can
+guard against import-time regressions.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--budget-ms 300] [--top 15] [--mode lm_studio]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STEPS = {
+    "interpreter": "pass",
+    "import src.ai_core": "import src.ai_core",
+    "engine ready": "import src.ai_core; src.ai_core.AsyncNeoAI(CONFIG)",
+    "daemon client": "import neo_client",
+}
+
+TEMPLATE = """
+import json
+CONFIG = json.loads({config!r})
+{code}
+"""
+
+
+def build_config(mode):
+    """Minimal configuration of the backend, no request is sent."""
+    return {
+        "mode": mode,
+        "api_url": "http://127.0.0.1:1/v1",
+        "api_key": "bench",
+        "model": "bench",
+        "openai_config": {"api_url": "http://127.0.0.1:1/v1", "api_key": "bench", "model": "bench"},
+        "digital_ocean_config": {"agent_id": "bench", "agent_key": "bench",
+                                 "agent_endpoint": "http://127.0.0.1:1/api/v1", "model": "bench"},
+    }
+
+
+def run_step(code, config, extra_args=()):
+    """Run a snippet in a fresh interpreter and return its (wall time in ms, stderr)."""
+    script = TEMPLATE.format(config=json.dumps(config), code=code)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *extra_args, "-c", script], cwd=parent_dir,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = (time.perf_counter() - started) * 1000.0
+    if result.returncode != 0:
+        sys.exit(f"Startup step failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def slowest_imports(config, top):
+    """
+    Modules with the largest cumulative import time when creating the engine.
+
+    Returns:
+        list: (cumulative microseconds, self microseconds, module) tuples, slowest first
+    """
+    _, stderr = run_step(STEPS["engine ready"], config, ("-X", "importtime"))
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            entries.append((int(cumulative_us), int(self_us), module.rstrip()))
+        except ValueError:
+            continue  # Header line
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neo startup benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per step")
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="Budget of the median 'engine ready' time, in milliseconds")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--mode", default="lm_studio", choices=["lm_studio", "openai", "digital_ocean"],
+                        help="Backend the engine is created for")
+    args = parser.parse_args()
+
+    config = build_config(args.mode)
+    medians = {}
+    print(f"Startup, median of {args.runs} fresh interpreters ({args.mode} mode)\n")
+    for name, code in STEPS.items():
+        durations = sorted(run_step(code, config)[0] for _ in range(args.runs))
+        medians[name] = durations[len(durations) // 2]
+        print(f"{name:<20} median {medians[name]:>8.1f} ms   min {durations[0]:>8.1f} ms   "
+              f"max {durations[-1]:>8.1f} ms")
+
+    print("\nSlowest imports (cumulative, self) while creating the engine:")
+    for cumulative_us, self_us, module in slowest_imports(config, args.top):
+        print(f"  {cumulative_us / 1000.0:>8.1f} ms {self_us / 1000.0:>8.1f} ms  {module}")
+
+    ready = medians["engine ready"]
+    within = ready <= args.budget_ms
+    print(f"\nEngine ready in {ready:.1f} ms, budget {args.budget_ms:.0f} ms: {'OK' if within else 'OVER BUDGET'}")
+    sys.exit(0 if within else 1)
+
+
+if __name__ == "__main__":
+    main()
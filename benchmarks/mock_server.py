@@ -0,0 +1,218 @@
+"""
+Mock OpenAI-compatible streaming chat completion server.
+
+Serves the chat completions of LM Studio and OpenAI (/v1/chat/completions)
+and DigitalOcean (/api/v1/chat/completions) and the DigitalOcean agent token
+endpoints, answering 404 on any other path so a misconfigured URL shows, with a configurable time to first
+token, streaming rate, delta size and scripted MCP tags. Lets Neo be
+measured without a model or a network.
+
+The script is a list of replies: the first one answers a user prompt, the
+next ones answer the successive command results of the same task.
+
+Usage:
+    python benchmarks/mock_server.py [--port 8000] [--ttft 0.2] [--tps 50] [--chunk-chars 4]
+                                     [--script replies.json]
+"""
+
+import re
+import json
+import time
+import base64
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SCRIPT = [
+    "Let me look at that. <mcp:files>read:/etc/hostname</mcp:files>",
+    "The hostname file has been read, everything looks fine.",
+]
+
+# Paths served, with or without DigitalOcean's /api prefix
+COMPLETION_PATH = re.compile(r"^(/api)?/v1/chat/completions$")
+TOKEN_PATH = re.compile(r"^(/api)?/v1/auth/agents/[^/]+/token$")
+
+# Follow-up messages carrying command results, see src/history_manager.format_tool_result
+TOOL_RESULT_PATTERN = re.compile(r"The \w+ command '.*?' was executed\. Here is the result:\n", re.DOTALL)
+
+
+def make_token(lifetime):
+    """Build an unsigned JWT with an expiry, enough for Neo's token manager."""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode({'exp': int(time.time() + lifetime)})}.mock"
+
+
+def script_step(messages):
+    """Number of command results sent back since the last user prompt."""
+    step = 0
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        if not TOOL_RESULT_PATTERN.search(message.get("content", "")):
+            break
+        step += 1
+    return step
+
+
+class MockSettings:
+    """Behaviour of the mock server."""
+
+    def __init__(self, ttft=0.2, tps=50.0, chunk_chars=4, script=None, token_lifetime=3600):
+        """
+        Initialize the settings.
+
+        Args:
+            ttft (float): Seconds before the first delta
+            tps (float): Deltas streamed per second, 0 streams as fast as possible
+            chunk_chars (int): Characters per delta
+            script (list): Replies by step of the task
+            token_lifetime (int): Lifetime of issued access tokens, in seconds
+        """
+        self.ttft = ttft
+        self.tps = tps
+        self.chunk_chars = max(1, chunk_chars)
+        self.script = script or list(DEFAULT_SCRIPT)
+        self.token_lifetime = token_lifetime
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def reply(self, messages):
+        """Scripted reply for a conversation."""
+        step = script_step(messages)
+        return self.script[min(step, len(self.script) - 1)]
+
+    def streaming_time(self, text):
+        """Time the server spends on a reply: time to first token plus streaming."""
+        deltas = -(-len(text) // self.chunk_chars)
+        return self.ttft + (deltas - 1) / self.tps if self.tps > 0 and deltas else self.ttft
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Request handler of the mock server."""
+
+    protocol_version = "HTTP/1.1"
+    settings = MockSettings()
+
+    def log_message(self, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _send_json(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if COMPLETION_PATH.match(path):
+            self._stream_completion(self._read_json())
+        elif TOKEN_PATH.match(path):
+            self._read_json()
+            self._send_json({"refresh_token": make_token(24 * 3600)})
+        else:
+            self.send_error(404)
+
+    def do_PUT(self):
+        if TOKEN_PATH.match(self.path.split("?", 1)[0]):
+            self._read_json()
+            self._send_json({"access_token": make_token(self.settings.token_lifetime)})
+        else:
+            self.send_error(404)
+
+    def _stream_completion(self, body):
+        settings = self.settings
+        settings.count_request()
+        text = settings.reply(body.get("messages", []))
+        model = body.get("model", "mock-model")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        started = time.monotonic()
+        time.sleep(settings.ttft)
+        interval = 1.0 / settings.tps if settings.tps > 0 else 0.0
+
+        for index, position in enumerate(range(0, len(text), settings.chunk_chars)):
+            if interval:
+                # Pace against the start time so per-write overhead does not accumulate
+                delay = started + settings.ttft + index * interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": text[position:position + settings.chunk_chars]},
+                             "finish_reason": None}],
+            }
+            self._write_chunk(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+def start_server(settings, host="127.0.0.1", port=0):
+    """
+    Start the mock server in a daemon thread.
+
+    Args:
+        settings (MockSettings): Behaviour of the server
+        host (str): Address to bind
+        port (int): Port to bind, 0 picks a free one
+
+    Returns:
+        ThreadingHTTPServer: Running server, its port is server.server_address[1]
+    """
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"settings": settings})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible streaming server")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Seconds before the first delta")
+    parser.add_argument("--tps", type=float, default=50.0, help="Deltas per second, 0 for unthrottled")
+    parser.add_argument("--chunk-chars", type=int, default=4, help="Characters per delta")
+    parser.add_argument("--script", help="JSON file with the list of scripted replies")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r") as f:
+            script = json.load(f)
+
+    settings = MockSettings(args.ttft, args.tps, args.chunk_chars, script)
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"settings": settings})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Mock server listening on http://{args.host}:{args.port}")
+    print(f"  LM Studio / OpenAI: http://{args.host}:{args.port}/v1")
+    print(f"  DigitalOcean agent endpoint and auth API: http://{args.host}:{args.port}/api/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -82,7 +82,6 @@ install_python_packages() {
     debug "Installing Python packages..."
     cat >requirements.txt <<EOL
 setuptools==74.1.2
-openai==0.28
 pyyaml==6.0.1
 pynput==1.7.7
 httpx==0.28.1
@@ -97,7 +96,7 @@ EOL
 # Function to check installed Python packages
 check_python_packages() {
     debug "Checking installed Python packages..."
-    REQUIRED_PKG=("setuptools" "openai" "pyyaml" "pynput")
+    REQUIRED_PKG=("setuptools" "httpx" "pyyaml" "pynput")
     for pkg in "${REQUIRED_PKG[@]}"; do
         if ! pip show $pkg &>/dev/null; then
             echo "Error: $pkg is not installed correctly."
@@ -123,6 +122,7 @@ add_alias_to_bashrc() {
         echo "" >>~/.bashrc
         echo "# Neo AI Integration" >>~/.bashrc
         echo "alias neo='source $(pwd)/venv/bin/activate && python3 $(pwd)/main.py'" >>~/.bashrc
+        echo "alias neo-ask='python3 $(pwd)/neo_client.py'" >>~/.bashrc
         echo "Alias added to ~/.bashrc"
     else
         echo "Alias already present in ~/.bashrc"
@@ -6,17 +6,42 @@ This file initializes the Neo AI core and UI components.
 import os
 import sys
 import yaml
+import logging
 import argparse
-from src.ai_core import NeoAI
-from src.terminal_interface import TerminalInterface
+import tempfile
 
-try:
-    from src.terminal_ui import ImprovedTerminalUI
-    IMPROVED_UI_AVAILABLE = True
-except ImportError:
-    IMPROVED_UI_AVAILABLE = False
-    print("Note: Improved UI not available, defaulting to classic interface.")
-    print("To install improved UI requirements: pip install prompt_toolkit pygments")
+# The engine and the interfaces are imported once the arguments are known,
+# so batch and daemon runs never load the UI and --help stays instant
+
+def configure_logging(debug=False):
+    """Send logs to neo_command.log in the temporary directory, never to the terminal."""
+    logging.basicConfig(
+        level=logging.DEBUG if debug else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        filename=os.path.join(tempfile.gettempdir(), "neo_command.log"),
+        filemode='a'
+    )
+
+def load_interface(classic=False):
+    """
+    Import the terminal interface class.
+
+    Args:
+        classic (bool): Use the classic interface even if the improved one is available
+
+    Returns:
+        type: ImprovedTerminalUI or TerminalInterface
+    """
+    if not classic:
+        try:
+            from src.terminal_ui import ImprovedTerminalUI
+            return ImprovedTerminalUI
+        except ImportError:
+            print("Note: Improved UI not available, defaulting to classic interface.")
+            print("To install improved UI requirements: pip install prompt_toolkit pygments")
+
+    from src.terminal_interface import TerminalInterface
+    return TerminalInterface
 
 def load_config():
     """Load configuration from config.yaml file."""
@@ -36,6 +61,17 @@ def parse_arguments():
     parser.add_argument('--classic', action='store_true', help='Use classic terminal interface')
     parser.add_argument('--version', action='version', version='Neo AI v1.1.0')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--trace', action='store_true',
+                        help='Record per-turn timing spans (summarize with: python -m src.tracing)')
+    parser.add_argument('--batch', metavar='PROMPTS_JSONL',
+                        help="Run the prompts of a JSONL file headlessly ('-' for stdin) and exit")
+    parser.add_argument('--concurrency', type=int, help='Prompts in flight at once in batch mode')
+    parser.add_argument('--approval', choices=['allow', 'deny', 'read_only'],
+                        help='Approval policy for commands in batch mode')
+    parser.add_argument('--output', metavar='RESULTS_JSONL', help='Batch results file (default: stdout)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Serve a warm Neo on a Unix socket for neo_client.py')
+    parser.add_argument('--socket', help='Daemon socket path')
     return parser.parse_args()
 
 def main():
@@ -48,22 +84,35 @@ def main():
         config = load_config()
 
         # Check for required keys in the configuration
-        if 'api_url' not in config:
+        if config.get('mode', 'lm_studio') == 'lm_studio' and 'api_url' not in config:
             raise KeyError("'api_url'")
 
-        # Initialize NeoAI
-        neo_ai = NeoAI(config)
+        config['debug'] = args.debug or config.get('debug', False)
+        configure_logging(config['debug'])
+        if args.trace:
+            config['trace'] = dict(config.get('trace') or {}, enabled=True)
+
+        if args.batch:
+            from src.batch_runner import run_batch
+            sys.exit(run_batch(config, args.batch, args.output, args.concurrency, args.approval))
+
+        if args.daemon:
+            from src.daemon import run_daemon
+            sys.exit(run_daemon(config, args.socket))
 
         # Choose interface based on argument and availability
-        if args.classic or not IMPROVED_UI_AVAILABLE:
-            # Use classic terminal interface
-            terminal = TerminalInterface(neo_ai, config)
-        else:
-            # Use improved terminal UI
-            terminal = ImprovedTerminalUI(neo_ai, config)
+        interface = load_interface(args.classic)
+
+        # Initialize NeoAI
+        from src.ai_core import NeoAI
+        neo_ai = NeoAI(config)
+        terminal = interface(neo_ai, config)
 
         # Run the selected interface
-        terminal.run()
+        try:
+            terminal.run()
+        finally:
+            neo_ai.close()
 
     except KeyError as e:
         if str(e) == "'api_url'":
@@ -0,0 +1,122 @@
+"""
+Thin client for the Neo AI daemon.
+Standard library only: connects to the daemon started with 'python main.py --daemon',
+streams the reply and answers approval requests in this terminal.
+
+Usage:
+    python neo_client.py "why is the disk full?"
+    python neo_client.py                      # interactive
+    python neo_client.py --new "start over"   # forget this terminal's conversation first
+    python neo_client.py --ping | --stop
+"""
+
+import os
+import sys
+import socket
+import argparse
+
+from src.daemon_protocol import default_socket_path, encode, decode
+
+
+def ask_approval(command):
+    """Ask the user in this terminal, even when stdin is redirected."""
+    print(f"\n\033[1;36mneo >\033[0m {command}")
+    try:
+        with open("/dev/tty", "r") as tty:
+            print("  \033[1;35m↳\033[0m Execute this command? [Enter/n]: ", end="", flush=True)
+            answer = tty.readline().strip().lower()
+    except OSError:
+        print("  No terminal to ask for approval, command denied.")
+        return False
+    approved = answer not in ("n", "no")
+    print("  \033[32m✓\033[0m" if approved else "  \033[31m✗\033[0m")
+    return approved
+
+
+def request(sock, reader, message_type, **fields):
+    """
+    Send a request and handle the daemon's messages until it is answered.
+
+    Returns:
+        int: Exit code, 0 on success
+    """
+    sock.sendall(encode(message_type, **fields))
+    for line in reader:
+        message = decode(line)
+        if message is None:
+            continue
+        kind = message.get("type")
+        if kind == "output":
+            sys.stdout.write(message.get("text", ""))
+            sys.stdout.flush()
+        elif kind == "approval_request":
+            approved = ask_approval(message.get("command", ""))
+            sock.sendall(encode("approval", id=message.get("id"), approved=approved))
+        elif kind == "done":
+            # A notice of an early stop was already streamed with the output
+            return 0
+        elif kind == "pong":
+            print(f"Neo daemon up for {message.get('uptime')}s, {message.get('sessions')} conversations")
+            return 0
+        elif kind == "error":
+            print(f"\nError: {message.get('message')}", file=sys.stderr)
+            return 1
+    print("\nThe Neo daemon closed the connection.", file=sys.stderr)
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask the running Neo AI daemon")
+    parser.add_argument("prompt", nargs="*", help="Prompt, interactive when omitted")
+    parser.add_argument("--socket", help="Daemon socket")
+    parser.add_argument("--session", help="Conversation to use (default: one per terminal)")
+    parser.add_argument("--new", action="store_true", help="Forget the conversation before asking")
+    parser.add_argument("--ping", action="store_true", help="Check that the daemon is running")
+    parser.add_argument("--stop", action="store_true", help="Stop the daemon")
+    args = parser.parse_args()
+
+    path = args.socket or default_socket_path()
+    # The parent is the shell of this terminal, so each terminal keeps its own conversation
+    session = args.session or f"shell-{os.getppid()}"
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        print(f"The Neo daemon is not running on {path}. Start it with: python main.py --daemon",
+              file=sys.stderr)
+        return 2
+
+    reader = sock.makefile("rb")
+    try:
+        if args.ping:
+            return request(sock, reader, "ping")
+        if args.stop:
+            return request(sock, reader, "shutdown")
+        if args.new:
+            request(sock, reader, "reset", session=session)
+
+        cwd = os.getcwd()
+        if args.prompt:
+            return request(sock, reader, "query", prompt=" ".join(args.prompt), session=session, cwd=cwd)
+
+        while True:
+            try:
+                prompt = input("\033[1;34mYou:\033[0m ").strip()
+            except EOFError:
+                return 0
+            if prompt.lower() in ("exit", "quit"):
+                return 0
+            if prompt:
+                request(sock, reader, "query", prompt=prompt, session=session, cwd=cwd)
+    except KeyboardInterrupt:
+        # Closing the connection cancels the prompt in the daemon
+        print()
+        return 130
+    finally:
+        reader.close()
+        sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
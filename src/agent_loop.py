@@ -0,0 +1,116 @@
+"""
+Agent loop for Neo AI.
+Drives the model / tool round trips of one task within step, time and token budgets.
+"""
+
+import time
+import logging
+
+# Defaults used when the 'agent' section is missing from config.yaml
+DEFAULT_AGENT_CONFIG = {
+    "max_steps": 8,           # Model calls per task, including the first one
+    "max_seconds": 300,       # Wall-clock budget of a task
+    "max_tokens": 60000,      # Prompt and completion tokens of a task, summed over its steps
+}
+
+# Why a task stopped
+STOP_DONE = "done"
+STOP_MAX_STEPS = "max_steps"
+STOP_TIME_BUDGET = "time_budget"
+STOP_TOKEN_BUDGET = "token_budget"
+
+STOP_MESSAGES = {
+    STOP_MAX_STEPS: "step limit of {max_steps} reached",
+    STOP_TIME_BUDGET: "time budget of {max_seconds}s exhausted",
+    STOP_TOKEN_BUDGET: "token budget of {max_tokens} exhausted",
+}
+
+
+class AgentLoop:
+    """
+    Iterative driver of a task.
+
+    Each step sends the conversation to the model and runs the MCP tags of
+    its reply. The loop ends as soon as a reply carries no tag to follow up
+    on, or when the next step would exceed the step, time or token budget.
+    """
+
+    def __init__(self, config):
+        """
+        Initialize the agent loop.
+
+        Args:
+            config (dict): Full Neo AI configuration
+        """
+        settings = dict(DEFAULT_AGENT_CONFIG)
+        settings.update(config.get('agent', {}) or {})
+
+        self.max_steps = max(1, settings["max_steps"])
+        self.max_seconds = settings["max_seconds"]
+        self.max_tokens = settings["max_tokens"]
+
+    async def run(self, step):
+        """
+        Run a task to completion or until a budget is exhausted.
+
+        Args:
+            step: Coroutine function (index, follow_up) -> step record dict with
+                'response', 'follow_up' (None when there is nothing to send back),
+                'model_time', 'tool_time', 'prompt_tokens' and 'completion_tokens'
+
+        Returns:
+            dict: 'response' of the last step, 'steps' records, 'stop_reason',
+                'elapsed' seconds and 'tokens' used
+        """
+        started = time.monotonic()
+        steps = []
+        tokens = 0
+        follow_up = None
+        stop_reason = STOP_MAX_STEPS
+
+        for index in range(self.max_steps):
+            record = await step(index, follow_up)
+            record["step"] = index + 1
+            steps.append(record)
+            tokens += record.get("prompt_tokens", 0) + record.get("completion_tokens", 0)
+
+            logging.debug(
+                f"Agent step {index + 1}: model {record.get('model_time', 0):.2f}s, "
+                f"tools {record.get('tool_time', 0):.2f}s, "
+                f"tokens {record.get('prompt_tokens', 0)}+{record.get('completion_tokens', 0)}"
+            )
+
+            follow_up = record.get("follow_up")
+            if not follow_up:
+                stop_reason = STOP_DONE
+                break
+            if time.monotonic() - started >= self.max_seconds:
+                stop_reason = STOP_TIME_BUDGET
+                break
+            if tokens >= self.max_tokens:
+                stop_reason = STOP_TOKEN_BUDGET
+                break
+
+        return {
+            "response": steps[-1].get("response", "") if steps else "",
+            "steps": steps,
+            "stop_reason": stop_reason,
+            "elapsed": time.monotonic() - started,
+            "tokens": tokens,
+        }
+
+    def describe_stop(self, stop_reason):
+        """
+        Human readable reason for a task that stopped before the model was done.
+
+        Args:
+            stop_reason (str): Stop reason from run()
+
+        Returns:
+            str: Description, or None if the task completed normally
+        """
+        message = STOP_MESSAGES.get(stop_reason)
+        if message is None:
+            return None
+        return message.format(max_steps=self.max_steps, max_seconds=self.max_seconds,
+                              max_tokens=self.max_tokens)
@@ -1,16 +1,27 @@
-import httpx
-import jwt
-import json
+import asyncio
+import concurrent.futures
+import contextvars
+import copy
+import functools
 import logging
 import os
+import sys
+import threading
 import time
-from src.command_executor import execute_command_in_terminal, execute_command
-from src.utils import load_persistent_memory
+from src.command_executor import working_directory, configure_executor
+from src.utils import gather_context, DEFAULT_CONTEXT_CONFIG
 from src.mcp_protocol import mcp  # Import the MCP singleton
-import openai
-from src.token_manager import TokenManager
-from src.command_executor import wait_for_command_completion
-from src.approval_handler import ApprovalHandler
+from src.mcp_protocol.batch import DEFAULT_MAX_PARALLEL_TAGS
+from src.http_client import create_http_client, create_async_http_client, LazyHTTPClient
+from src.backends import create_backend, BackendError
+from src.response_stream import ResponseStream
+from src.stream_renderer import StreamRenderer
+from src.history_manager import HistoryManager, format_tool_result
+from src.token_counter import TokenCounter
+from src.agent_loop import AgentLoop
+from src.response_cache import ResponseCache
+from src.tracing import tracer
+from src.shell_pool import shell_pool
 
 # Clear all proxy environment variables
 os.environ.pop('http_proxy', None)
@@ -22,295 +33,466 @@ os.environ.pop('ALL_PROXY', None)
 os.environ.pop('socks_proxy', None)
 os.environ.pop('SOCKS_PROXY', None)
 
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
 
+class AsyncNeoAI:
+    """
+    Asyncio-native Neo AI engine.
+
+    Streaming, context gathering and token refresh run as coroutines so they
+    can overlap. Blocking work (MCP approvals and command execution) is moved
+    to worker threads so the event loop keeps running.
+    """
 
-class NeoAI:
     def __init__(self, config):
         self.mode = config.get('mode', 'lm_studio')
         logging.info(f"Initializing NeoAI in {self.mode} mode.")
         self.require_approval = config.get('command_approval', {}).get('require_approval', True)
         self.auto_approve_all = config.get('command_approval', {}).get('auto_approve_all', False)
-        self.is_streaming_mode = config.get('stream', True)
+        self.max_parallel_tags = (config.get('mcp', {}) or {}).get('max_parallel_tags', DEFAULT_MAX_PARALLEL_TAGS)
+        self.debug = config.get('debug', False)
         self.config = config
+        tracer.configure(config)
+        configure_executor(config)
+        shell_pool.configure(config)
+
+        # Pooled keep-alive clients: async for chat streaming, sync for token refresh
+        # Built with the first request, starting the engine does not import httpx
+        self.http_client = LazyHTTPClient(create_async_http_client, config)
+        self.auth_http_client = LazyHTTPClient(create_http_client, config)
+
+        self.backend = create_backend(config, self.http_client, self.auth_http_client)
+        self.model = self.backend.model
 
-        if self.mode == 'digital_ocean':
-            self.token_manager = TokenManager(
-                agent_id=config['digital_ocean_config']['agent_id'],
-                agent_key=config['digital_ocean_config']['agent_key'],
-                auth_api_url="https://cluster-api.do-ai.run/v1"
-            )
-            self.access_token = self.token_manager.get_valid_access_token()
-            self.token_timestamp = time.time()
-            self.agent_endpoint = config['digital_ocean_config']['agent_endpoint']
-            self.model = config['digital_ocean_config']['model']
-        else:
-            openai.api_base = config['api_url']
-            openai.api_key = config['api_key']
-            self.model = config['model']
-
-        self.lm_studio_config = config.get('lm_studio_config', {})
         self.history = []
+        self.token_counter = TokenCounter(config, self.model)
+        self.history_manager = HistoryManager(config, self.model, self.token_counter)
+        self.response_cache = ResponseCache(config)
+        self.agent_loop = AgentLoop(config)
+        self.stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                      "cache_hits": 0, "cache_misses": 0, "agent_steps": 0, "budget_stops": 0}
+        self.last_run = None
+        self._turn_prompt_tokens = 0
         self.context_initialized = False
+        # Where streamed replies are rendered, sys.stdout when None; an output
+        # with an async drain() is awaited between deltas, e.g. a daemon client
+        self.output = None
 
-    def _ensure_valid_token(self):
-        """Check that the token is still valid and renew it if necessary"""
-        if self.mode != 'digital_ocean':
-            return
+        context_settings = dict(DEFAULT_CONTEXT_CONFIG)
+        context_settings.update(config.get('context', {}) or {})
+        self.context_max_entries = context_settings["max_entries"]
+        # (directory, future) of the context gathered in the background for the first turn
+        self._prefetch = self._start_prefetch(os.getcwd()) if context_settings["prefetch"] else None
 
-        # Check token every 15 minutes or in case of 401 error
-        current_time = time.time()
-        token_age = current_time - self.token_timestamp
+    def new_session(self):
+        """
+        Create an engine with its own conversation that shares this engine's
+        backend, connection pools, token and caches. Only the engine that
+        created them closes them, sessions need no aclose().
 
-        if token_age > 900:  # 15 minutes
+        Returns:
+            AsyncNeoAI: Session engine
+        """
+        session = copy.copy(self)
+        session.history = []
+        session.context_initialized = False
+        session._prefetch = None
+        session.stats = {key: 0 for key in self.stats}
+        session.last_run = None
+        session._turn_prompt_tokens = 0
+        session.output = None
+        return session
+
+    async def _run_sync(self, func, *args, **kwargs):
+        """Run a blocking callable in a worker thread, keeping context variables."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(None, call)
+
+    def _start_prefetch(self, directory):
+        """Gather the first turn's context in a background thread while the user types."""
+        future = concurrent.futures.Future()
+
+        def prefetch():
             try:
-                logging.info("Token age > 15 minutes, refreshing...")
-                self.access_token = self.token_manager.get_valid_access_token()
-                self.token_timestamp = current_time
+                future.set_result(gather_context(directory, self.context_max_entries))
             except Exception as e:
-                logging.error(f"Error refreshing token: {e}")
-                # Attempt to completely reset token management
-                self.token_manager = TokenManager(
-                    agent_id=self.config['digital_ocean_config']['agent_id'],
-                    agent_key=self.config['digital_ocean_config']['agent_key'],
-                    auth_api_url="https://cluster-api.do-ai.run/v1"
-                )
-                self.access_token = self.token_manager.get_valid_access_token()
-                self.token_timestamp = current_time
-
-    def initialize_context(self):
-        context_commands = [
-            "pwd",
-            "ls"
-        ]
-        context_data = load_persistent_memory()
-        initial_context = "<context>\n"
-
-        for command in context_commands:
-            result = execute_command(command)
-            initial_context += f"Command: {command}\nResult:\n{result}\n"
-
-        full_context = f"{context_data}\n\n{initial_context}</context>"
+                future.set_exception(e)
+
+        threading.Thread(target=prefetch, name="neo-context-prefetch", daemon=True).start()
+        return directory, future
+
+    async def initialize_context(self):
+        directory = working_directory.get() or os.getcwd()
+        prefetch, self._prefetch = self._prefetch, None
+        full_context = None
+
+        with tracer.span("context_init") as span:
+            # The prefetched context is used once, and only if the directory did not change
+            if prefetch is not None and prefetch[0] == directory:
+                span.set(prefetched=prefetch[1].done())
+                try:
+                    # Only waits if the prefetch has not finished yet
+                    full_context = await asyncio.wrap_future(prefetch[1])
+                except Exception as e:
+                    logging.warning(f"Context prefetch failed: {e}")
+            if full_context is None:
+                full_context = await self._run_sync(gather_context, directory, self.context_max_entries)
+
         self.context_initialized = True
         return full_context
 
-    def _query_lm_studio(self, prompt, clear_thinking=False):
-        instruction = f"{self.lm_studio_config.get('input_prefix', '### Instruction:')} {prompt} {self.lm_studio_config.get('input_suffix', '### Response:')}"
+    def _preflight(self):
+        """
+        Make sure the request fits the model's context window before sending it.
+        The history is compacted harder if needed; the request is refused if it
+        still does not fit.
 
-        messages = self.history.copy()
-        messages.append({"role": "user", "content": instruction})
+        Returns:
+            bool: True if the request can be sent
+        """
+        limit = self.token_counter.prompt_limit
+        if self.token_counter.count_messages(self.history) <= limit:
+            return True
+
+        self.history_manager.compact(self.history, token_budget=limit, aggressive=True)
+        if self.token_counter.count_messages(self.history) <= limit:
+            return True
+
+        # Do not keep a prompt that can never be sent
+        rejected = self.history.pop()
+        if "<context>" in rejected["content"]:
+            self.context_initialized = False
+        return False
+
+    def _record_usage(self, completion):
+        """Account the tokens of the turn that just streamed and return its completion tokens."""
+        completion_tokens = self.token_counter.count_text(completion)
+        self.stats["requests"] += 1
+        self.stats["prompt_tokens"] += self._turn_prompt_tokens
+        self.stats["completion_tokens"] += completion_tokens
+
+        method = "exact" if self.token_counter.exact else "estimated"
+        message = f"Turn tokens ({method}): prompt={self._turn_prompt_tokens} completion={completion_tokens}"
+        logging.debug(message)
+        if self.debug:
+            self._notify(f"\033[2m[debug] {message}\033[0m")
+        return completion_tokens
+
+    async def _drain_output(self):
+        """Wait for a slow output to catch up, so a long reply is not buffered in memory."""
+        drain = getattr(self.output, "drain", None)
+        if drain is not None:
+            await drain()
+
+    def _notify(self, text):
+        """Show a message to the user on the sink of the streamed replies, so a daemon client gets it too."""
+        output = self.output or sys.stdout
+        output.write(f"{text}\n")
+        output.flush()
+
+    def _create_response_stream(self, clear_thinking):
+        """Create the stream that prints deltas and runs MCP tags as they close."""
+        batch = mcp.create_batch(self.require_approval, self.auto_approve_all, self.max_parallel_tags)
+        return ResponseStream(batch, renderer=StreamRenderer(self.config, clear_thinking, self.output))
+
+    def _lookup_cache(self, payload):
+        """
+        Look up a request in the response cache.
 
-        try:
-            completion = openai.ChatCompletion.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                stream=self.is_streaming_mode,
-            )
-
-            full_response = ""
-            is_first_chunk = True
-
-            for chunk in completion:
-                if 'choices' in chunk and len(chunk['choices']) > 0:
-                    content = chunk['choices'][0]['delta'].get('content', '')
-                    if content:
-                        if is_first_chunk:
-                            if clear_thinking:
-                                print('\r' + ' ' * 30 + '\r', end="", flush=True)
-                            print("\033[1;34mNeo:\033[0m ", end='', flush=True)
-                            is_first_chunk = False
-
-                        print(content, end='', flush=True)
-                        full_response += content
-
-            print()
-            return self._process_response(full_response)
+        Args:
+            payload (dict): Everything that determines the response
 
-        except Exception as e:
-            print(f"Error while querying LM Studio: {e}")
-            return "An error occurred while querying LM Studio."
+        Returns:
+            tuple: (cache key or None when caching is disabled, cached deltas or None)
+        """
+        if not self.response_cache.enabled:
+            return None, None
+
+        key = self.response_cache.make_key(payload)
+        chunks = self.response_cache.get(key)
+        self.stats["cache_hits" if chunks is not None else "cache_misses"] += 1
+        return key, chunks
+
+    async def _replay_cached(self, chunks, clear_thinking):
+        """Replay a cached response through the normal streaming path, without any network."""
+        logging.info("Response cache hit, replaying cached completion.")
+        started = time.monotonic()
+        stream = self._create_response_stream(clear_thinking)
+        for chunk in chunks:
+            stream.feed(chunk)
+            await self._drain_output()
+        return await self._complete_response(stream, started)
+
+    async def _complete_response(self, stream, started, cache_key=None):
+        """
+        Finish a streamed response: wait for its MCP tags and record it.
 
-    def _query_digitalocean(self, prompt, clear_thinking=False):
-        self._ensure_valid_token()
+        Args:
+            stream (ResponseStream): Stream that received the whole completion
+            started (float): time.monotonic() when the request was sent
+            cache_key (str): Key to store the completion under, if caching is enabled
 
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
-        payload = {
-            "model": self.model,
-            "messages": self.history + [{"role": "user", "content": prompt}],
-            "stream": True,
+        Returns:
+            dict: Step record for the agent loop
+        """
+        # Tags run while the response streams, tool time is only the wait after it
+        model_time = time.monotonic() - started
+        results = await stream.finish()
+        tool_time = time.monotonic() - started - model_time
+
+        assistant_response = stream.text.strip()
+        completion_tokens = self._record_usage(stream.text)
+
+        if cache_key is not None and assistant_response:
+            self.response_cache.put(cache_key, stream.deltas)
+
+        follow_up = None
+        if assistant_response:
+            self.history.append({"role": "assistant", "content": assistant_response})
+            with tracer.span("follow_up", tags=len(results)):
+                follow_up = self._build_follow_up(results)
+
+        return self._step_record(assistant_response, follow_up, len(results), model_time, tool_time,
+                                 self._turn_prompt_tokens, completion_tokens)
+
+    @staticmethod
+    def _step_record(response, follow_up=None, tags=0, model_time=0.0, tool_time=0.0,
+                     prompt_tokens=0, completion_tokens=0):
+        """Build the record of one agent step."""
+        return {
+            "response": response,
+            "follow_up": follow_up,
+            "tags": tags,
+            "model_time": model_time,
+            "tool_time": tool_time,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
         }
 
-        max_retries = 2
-        retry_count = 0
-
-        while retry_count < max_retries:
-            try:
-                with httpx.stream(
-                        "POST",
-                        f"{self.agent_endpoint}/chat/completions",
-                        json=payload,
-                        headers=headers,
-                        timeout=30.0
-                ) as response:
-                    response.raise_for_status()
-
-                    is_first_chunk = True
-                    assistant_response = ""
-
-                    for line in response.iter_lines():
-                        line = line.strip()
-                        if line.startswith("data:"):
-                            line = line[len("data:"):].strip()
-
-                        if line:
-                            try:
-                                chunk = json.loads(line)
-                                if "choices" in chunk and chunk["choices"]:
-                                    content = chunk["choices"][0].get("delta", {}).get("content", "")
-                                    if content:
-                                        if is_first_chunk:
-                                            if clear_thinking:
-                                                print('\r' + ' ' * 30 + '\r', end="", flush=True)
-                                            print("\033[1;34mNeo:\033[0m ", end="", flush=True)
-                                            is_first_chunk = False
-                                        print(content, end="", flush=True)
-                                        assistant_response += content
-                            except json.JSONDecodeError:
-                                if line == "[DONE]":
-                                    break
-                                continue
-                    print()
-
-                    if assistant_response.strip():
-                        self.history.append({"role": "assistant", "content": assistant_response.strip()})
-                        return self._process_response(assistant_response.strip())
-                    return ""
-
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 401 and retry_count < max_retries:
-                    retry_count += 1
-                    # Force token refresh
-                    self.token_manager = TokenManager(
-                        agent_id=self.config['digital_ocean_config']['agent_id'],
-                        agent_key=self.config['digital_ocean_config']['agent_key'],
-                        auth_api_url="https://cluster-api.do-ai.run/v1"
-                    )
-                    self.access_token = self.token_manager.get_valid_access_token()
-                    self.token_timestamp = time.time()
-
-                    # Update header with new token
-                    headers["Authorization"] = f"Bearer {self.access_token}"
-                    continue
-                else:
-                    print(f"Details: {e}")
-                    break
-
-            except httpx.ReadTimeout:
-                retry_count += 1
-                if retry_count < max_retries:
-                    self.access_token = self.token_manager.get_valid_access_token()
-                    self.token_timestamp = time.time()
-                    headers["Authorization"] = f"Bearer {self.access_token}"
-                    continue
-                else:
-                    print("Failed after multiple attempts.")
-                    break
-
-            except Exception as e:
-                import traceback
-                print(f"\nDetailed error: {e}")
-                print(traceback.format_exc())
-                break
+    async def _query_backend(self, clear_thinking=False):
+        """
+        Send the history, whose last entry is the prompt, to the configured backend.
 
-        return "Sorry, I couldn't get a response. Please try again."
+        Returns:
+            dict: Step record for the agent loop
+        """
+        with tracer.span("request_build") as span:
+            # Keep the re-sent history within the model's token budget
+            self.history_manager.compact(self.history)
+
+            fits = self._preflight()
+            if fits:
+                self._turn_prompt_tokens = self.token_counter.count_messages(self.history)
+                messages = self.backend.prepare_messages(self.history)
+                cache_key, cached = self._lookup_cache(self.backend.cache_payload(messages))
+                span.set(prompt_tokens=self._turn_prompt_tokens, cached=cached is not None)
+
+        if not fits:
+            message = (f"The request does not fit the {self.token_counter.context_window}-token "
+                       f"context window of {self.model}, even after compacting the history.")
+            self._notify(f"\033[1;31m{message}\033[0m")
+            return self._step_record(message)
+
+        if cached is not None:
+            return await self._replay_cached(cached, clear_thinking)
+
+        started = time.monotonic()
+        first_delta_at = None
+        stream = self._create_response_stream(clear_thinking)
 
-    def query(self, prompt, clear_thinking=False):
         try:
-            if not self.context_initialized:
-                context = self.initialize_context()
-                prompt = f"{context}\n\n{prompt}"
-
-            self.history.append({"role": "user", "content": prompt})
-
-            if self.mode == 'digital_ocean':
-                return self._query_digitalocean(prompt, clear_thinking)
-            else:
-                response = self._query_lm_studio(prompt, clear_thinking)
-                if response:
-                    self.history.append({"role": "assistant", "content": response})
-                return response
+            async for delta in self.backend.stream_chat(messages):
+                if first_delta_at is None:
+                    first_delta_at = time.monotonic()
+                    tracer.record("ttft", first_delta_at - started, backend=self.backend.name)
+                stream.feed(delta)
+                await self._drain_output()
+            if first_delta_at is not None:
+                tracer.record("stream", time.monotonic() - first_delta_at, deltas=len(stream.deltas))
+        except BackendError as e:
+            stream.cancel()
+            self._notify(f"\nError while querying {self.backend.name}: {e}")
+            return self._step_record("Sorry, I couldn't get a response. Please try again.",
+                                     model_time=time.monotonic() - started)
+        except BaseException:
+            stream.cancel()
+            raise
+
+        return await self._complete_response(stream, started, cache_key)
+
+    async def _run_step(self, index, follow_up, clear_thinking=False):
+        """One agent step: send back the tool results of the previous step, if any, then query the model."""
+        if follow_up:
+            self.history.append({"role": "user", "content": follow_up})
+        return await self._query_backend(clear_thinking and index == 0)
+
+    async def query(self, prompt, clear_thinking=False):
+        try:
+            run = await self.run(prompt, clear_thinking)
+            return run["response"]
         except Exception as e:
-            import traceback
-            print(f"Details: {e}")
-            print(traceback.format_exc())
+            logging.exception("Query failed")
+            self._notify(f"Details: {e}")
 
-    def _process_response(self, response):
+    async def run(self, prompt, clear_thinking=False):
         """
-        Process the AI response and handle MCP protocol commands.
-        This replaces the old system tag processing with the new MCP protocol.
+        Run a task and return its agent loop record; unlike query(), errors propagate.
 
         Args:
-            response: Text response from the AI
+            prompt (str): User prompt
+            clear_thinking (bool): Clear the "Thinking..." line before the first delta
 
         Returns:
-            Processed response with command outputs integrated
+            dict: Record from AgentLoop.run()
         """
+        turn = tracer.start_turn()
         try:
-            # Process all MCP protocol tags using the MCP singleton
-            mcp_results = mcp.process_response(
-                response,
-                require_approval=self.require_approval,
-                auto_approve=self.auto_approve_all
-            )
-
-            # Log the MCP results for debugging
-           # print(f"DEBUG - MCP results: {mcp_results}")
-
-            # Check if any protocols were executed
-            follow_up_messages = []
-
-            for protocol, result in mcp_results.items():
-                # Skip error key or non-dict results
-                if protocol == "error" or not isinstance(result, dict):
-                    continue
-
-                # Check if the protocol was executed
-                if result.get("executed", False):
-                    command = result.get("command", "unknown command")
-                    output = result.get("output", "No output")
-
-                    # Create a follow-up message for this protocol
-                    follow_up_prompt = f"The {protocol} command '{command}' was executed. Here is the result:\n{output}"
-                    follow_up_messages.append(follow_up_prompt)
-
-            # If we have follow-up messages, send them to the AI
-            if follow_up_messages:
-                combined_prompt = "\n\n".join(follow_up_messages)
-                self.history.append({"role": "user", "content": combined_prompt})
-
-                if self.mode == "digital_ocean":
-                    return self._query_digitalocean(combined_prompt)
-                elif self.mode == "lm_studio":
-                    return self._query_lm_studio(combined_prompt)
-                else:
-                    return f"Unknown mode: {self.mode}. Unable to send follow-up prompt."
+            with tracer.span("turn", mode=self.mode) as span:
+                run = await self._run_task(prompt, clear_thinking)
+                span.set(steps=len(run["steps"]), stop_reason=run["stop_reason"])
+            return run
+        finally:
+            tracer.end_turn(turn)
+
+    async def _run_task(self, prompt, clear_thinking):
+        """Gather the context on the first turn, then drive the agent loop."""
+        if not self.context_initialized:
+            # Context gathering and token refresh overlap instead of serializing
+            context, _ = await asyncio.gather(self.initialize_context(), self.backend.prepare())
+            prompt = f"{context}\n\n{prompt}"
+
+        self.history.append({"role": "user", "content": prompt})
+
+        run = await self.agent_loop.run(functools.partial(self._run_step, clear_thinking=clear_thinking))
+        self._record_run(run)
+        return run
+
+    def _record_run(self, run):
+        """Account the steps of a finished task and report why it stopped early, if it did."""
+        self.last_run = run
+        self.stats["agent_steps"] += len(run["steps"])
+
+        if self.debug:
+            for record in run["steps"]:
+                self._notify(f"\033[2m[debug] Step {record['step']}: model {record['model_time']:.2f}s, "
+                      f"tools {record['tool_time']:.2f}s ({record['tags']} tags), "
+                      f"tokens {record['prompt_tokens']}+{record['completion_tokens']}\033[0m")
+
+        reason = self.agent_loop.describe_stop(run["stop_reason"])
+        if reason:
+            self.stats["budget_stops"] += 1
+            logging.warning(f"Agent loop stopped early: {reason}")
+            steps = len(run["steps"])
+            self._notify(f"\033[1;33mStopped after {steps} step{'s' if steps > 1 else ''}: {reason}. "
+                  f"The last command results were not sent back.\033[0m")
+
+    def _build_follow_up(self, mcp_results):
+        """
+        Build the follow-up for the MCP tags executed while the response streamed.
 
-        except Exception as e:
-            import traceback
-            print(f"\nAn unexpected error occurred while processing the response: {e}")
-            print(traceback.format_exc())
-            return "An error occurred while processing the command."
+        Args:
+            mcp_results: Ordered list of (protocol, result) tuples from the stream
+
+        Returns:
+            str: Combined tool results to send back, or None if no tag was executed
+        """
+        follow_up_messages = []
 
-        return response.strip()
+        for protocol, result in mcp_results:
+            # Skip error key or non-dict results
+            if protocol == "error" or not isinstance(result, dict):
+                continue
+
+            # Check if the protocol was executed
+            if result.get("executed", False):
+                command = result.get("command", "unknown command")
+                output = result.get("output", "No output")
+
+                # Create a follow-up message for this protocol
+                follow_up_messages.append(format_tool_result(protocol, command, output))
+
+        return "\n\n".join(follow_up_messages) if follow_up_messages else None
 
     def get_conversation_history(self):
         return self.history
 
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats.update(self.backend.get_stats())
+        return stats
+
     def reset_history(self):
         self.history = []
         self.context_initialized = False
-        self.auto_approve_all = False
\ No newline at end of file
+        self.auto_approve_all = False
+
+    async def aclose(self):
+        """Close the backend and the pooled HTTP connections."""
+        await self.backend.aclose()
+        await self.http_client.aclose()
+        self.auth_http_client.close()
+        shell_pool.close()
+        tracer.close()
+
+
+class NeoAI:
+    """
+    Synchronous wrapper around AsyncNeoAI.
+
+    Owns a private event loop that is kept between calls, so the async HTTP
+    connection pool survives from one query to the next. Used by
+    ImprovedTerminalUI and TerminalInterface.
+    """
+
+    def __init__(self, config, engine=None):
+        self._loop = asyncio.new_event_loop()
+        # A preconfigured engine may be passed in, e.g. an instrumented one
+        self.engine = engine or AsyncNeoAI(config)
+
+    def _run(self, coroutine):
+        """Run a coroutine to completion on the private event loop."""
+        task = self._loop.create_task(coroutine)
+        try:
+            return self._loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            # Cancel the in-flight request so the loop is clean for the next query
+            task.cancel()
+            try:
+                self._loop.run_until_complete(task)
+            except (asyncio.CancelledError, Exception):
+                pass
+            raise
+
+    @property
+    def mode(self):
+        return self.engine.mode
+
+    @property
+    def model(self):
+        return self.engine.model
+
+    @property
+    def history(self):
+        return self.engine.history
+
+    def query(self, prompt, clear_thinking=False):
+        return self._run(self.engine.query(prompt, clear_thinking))
+
+    def get_conversation_history(self):
+        return self.engine.get_conversation_history()
+
+    def get_stats(self):
+        return self.engine.get_stats()
+
+    def reset_history(self):
+        self.engine.reset_history()
+
+    def close(self):
+        """Close the pooled HTTP connections and the event loop."""
+        if self._loop.is_closed():
+            return
+        self._run(self.engine.aclose())
+        # Finalize response generators left suspended by an interrupted stream
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.close()
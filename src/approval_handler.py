@@ -3,20 +3,28 @@ Enhanced approval handler for Neo AI command execution.
 Uses a simple bash-style prompt UI for command approval.
 """
 
-from prompt_toolkit import print_formatted_text, HTML
-from prompt_toolkit.shortcuts import clear
-from prompt_toolkit.styles import Style
-from prompt_toolkit import prompt
+import contextvars
+from src.tracing import tracer
 
-# Define approval style
-APPROVAL_STYLE = Style.from_dict({
+# Approval style, turned into a prompt_toolkit Style on the first prompt
+APPROVAL_STYLE_RULES = {
     'prompt': '#5fd7ff bold',      # Bright cyan for Neo prompt
     'command': '#ffffff',          # White for command text
     'arrow': '#d787af bold',       # Pink for the arrow
     'question': '#d7d787',         # Light yellow for question
     'success': '#98fb98',          # Pale Green for success
     'error': '#ff6b6b',            # Soft Red for error
-})
+}
+
+# Non-interactive approval policies, e.g. for headless batch runs
+POLICY_ALLOW = "allow"            # Approve every command
+POLICY_DENY = "deny"              # Deny every command
+POLICY_READ_ONLY = "read_only"    # Approve read-only MCP tags only, see MCPBatch
+APPROVAL_POLICIES = (POLICY_ALLOW, POLICY_DENY, POLICY_READ_ONLY)
+
+# Policy answering approval requests in the current context: one of APPROVAL_POLICIES,
+# a callable(command) -> bool asking the user elsewhere (e.g. a daemon client), or None to prompt here
+approval_policy = contextvars.ContextVar("approval_policy", default=None)
 
 
 class ApprovalHandler:
@@ -38,22 +46,40 @@ class ApprovalHandler:
             bool: True if approved, False otherwise
             str: Always None as we've removed the 'approve all' option
         """
+        policy = approval_policy.get()
+        if policy in APPROVAL_POLICIES:
+            # Headless: never prompt. Read-only tags are approved before reaching here
+            return policy == POLICY_ALLOW, None
+
         if not self.require_approval or self.auto_approve_all:
             return True, None
 
-        # Print the command in bash-style format
-        print_formatted_text(HTML(f"\n<prompt>neo ></prompt> <command>{command}</command>"), style=APPROVAL_STYLE)
+        if policy is not None:
+            with tracer.span("approval_wait", forwarded=True) as span:
+                approved = bool(policy(command))
+                span.set(approved=approved)
+            return approved, None
+
+        # prompt_toolkit is only needed once the user is actually asked
+        from prompt_toolkit import print_formatted_text, HTML, prompt
+        from prompt_toolkit.styles import Style
+        approval_style = Style.from_dict(APPROVAL_STYLE_RULES)
+
+        with tracer.span("approval_wait") as span:
+            # Print the command in bash-style format
+            print_formatted_text(HTML(f"\n<prompt>neo ></prompt> <command>{command}</command>"), style=approval_style)
 
-        # Print the approval prompt with an arrow
-        print_formatted_text(HTML("  <arrow>↳</arrow> <question>Execute this command? [Enter/n]:</question>"), style=APPROVAL_STYLE)
+            # Print the approval prompt with an arrow
+            print_formatted_text(HTML("  <arrow>↳</arrow> <question>Execute this command? [Enter/n]:</question>"), style=approval_style)
 
-        # Get user input
-        user_input = prompt("").strip().lower()
+            # Get user input
+            user_input = prompt("").strip().lower()
+            span.set(approved=user_input not in ('n', 'no'))
 
         # Handle approval/rejection
         if user_input == 'n' or user_input == 'no':
-            print_formatted_text(HTML("  <error>✗</error>"), style=APPROVAL_STYLE)
+            print_formatted_text(HTML("  <error>✗</error>"), style=approval_style)
             return False, None
         else:
-            print_formatted_text(HTML("  <success>✓</success>"), style=APPROVAL_STYLE)
+            print_formatted_text(HTML("  <success>✓</success>"), style=approval_style)
             return True, None
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Chat completion backends for Neo AI.
+Each backend streams completions through the shared HTTP client and retry policy.
+Backend modules are imported when first used, so only the configured mode pays
+for its dependencies (e.g. PyJWT for DigitalOcean).
+"""
+
+import importlib
+
+from .base import Backend, BackendError, RetryPolicy
+
+# Backend classes by operation mode, as (module, class name)
+BACKENDS = {
+    "lm_studio": (".lm_studio", "LMStudioBackend"),
+    "digital_ocean": (".digital_ocean", "DigitalOceanBackend"),
+    "openai": (".openai_compat", "OpenAICompatibleBackend"),
+}
+
+# Lazily imported names: name -> (module, attribute)
+_LAZY_NAMES = {
+    "OpenAICompatibleBackend": (".openai_compat", "OpenAICompatibleBackend"),
+    "LMStudioBackend": (".lm_studio", "LMStudioBackend"),
+    "DigitalOceanBackend": (".digital_ocean", "DigitalOceanBackend"),
+    "RouterBackend": (".router", "RouterBackend"),
+    "DEFAULT_ROUTER_CONFIG": (".router", "DEFAULT_ROUTER_CONFIG"),
+}
+
+
+def _load(module, name):
+    """Import a backend module on demand and return one of its attributes."""
+    return getattr(importlib.import_module(module, __name__), name)
+
+
+def __getattr__(name):
+    # Keeps 'from src.backends import DigitalOceanBackend' working without eager imports
+    if name in _LAZY_NAMES:
+        return _load(*_LAZY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _create_single_backend(mode, config, http_client, auth_http_client, retry_policy):
+    """Create the backend of one operation mode."""
+    if mode not in BACKENDS:
+        raise ValueError(f"Unknown mode '{mode}'. Valid options: {', '.join(sorted(BACKENDS) + ['router'])}")
+    backend_class = _load(*BACKENDS[mode])
+    if mode == "digital_ocean":
+        return backend_class(config, http_client, retry_policy, auth_http_client)
+    return backend_class(config, http_client, retry_policy)
+
+
+def create_backend(config, http_client, auth_http_client=None, retry_policy=None):
+    """
+    Create the backend for the configured operation mode.
+
+    Mode 'router' routes between the backends listed in the 'router'
+    section, see RouterBackend.
+
+    Args:
+        config (dict): Full Neo AI configuration
+        http_client (httpx.AsyncClient): Shared pooled client for chat requests
+        auth_http_client (httpx.Client): Shared pooled client for token requests
+        retry_policy (RetryPolicy): Shared retry policy
+
+    Returns:
+        Backend: Backend instance
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    mode = config.get('mode', 'lm_studio')
+    retry_policy = retry_policy or RetryPolicy(config)
+
+    if mode == "router":
+        from .router import RouterBackend, DEFAULT_ROUTER_CONFIG
+        modes = (config.get('router', {}) or {}).get('backends', DEFAULT_ROUTER_CONFIG["backends"])
+        backends = [_create_single_backend(backend_mode, config, http_client, auth_http_client, retry_policy)
+                    for backend_mode in modes]
+        return RouterBackend(config, http_client, backends, retry_policy)
+
+    return _create_single_backend(mode, config, http_client, auth_http_client, retry_policy)
+
+
+__all__ = [
+    'Backend',
+    'BackendError',
+    'RetryPolicy',
+    'OpenAICompatibleBackend',
+    'LMStudioBackend',
+    'DigitalOceanBackend',
+    'RouterBackend',
+    'BACKENDS',
+    'create_backend',
+]
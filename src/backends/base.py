@@ -0,0 +1,192 @@
+"""
+Base class for the chat completion backends.
+All backends share one streaming HTTP client, one SSE decoder and one retry policy.
+"""
+
+import asyncio
+import logging
+from .sse import iter_sse_deltas
+
+# Defaults used when the 'retry' section is missing from config.yaml
+DEFAULT_RETRY_CONFIG = {
+    "max_attempts": 3,      # Attempts per request, including the first one
+    "backoff": 0.5,         # Delay before the first retry, doubled on each retry
+    "max_backoff": 4.0,     # Upper bound of the delay between retries
+}
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class BackendError(Exception):
+    """Raised when a backend cannot produce a response."""
+
+
+class RetryPolicy:
+    """Decide whether and when a failed request is retried."""
+
+    def __init__(self, config):
+        """
+        Initialize the retry policy.
+
+        Args:
+            config (dict): Full Neo AI configuration
+        """
+        settings = dict(DEFAULT_RETRY_CONFIG)
+        settings.update(config.get('retry', {}) or {})
+
+        self.max_attempts = max(1, settings["max_attempts"])
+        self.backoff = settings["backoff"]
+        self.max_backoff = settings["max_backoff"]
+
+    def should_retry(self, error, attempt):
+        """
+        Check whether a request that failed with an error should be sent again.
+
+        Args:
+            error (Exception): Error raised by the request
+            attempt (int): Number of attempts made so far
+
+        Returns:
+            bool: True if the request should be retried
+        """
+        if attempt >= self.max_attempts:
+            return False
+        import httpx
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
+
+    def delay(self, attempt):
+        """Seconds to wait before the next attempt."""
+        return min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+
+
+class Backend:
+    """
+    Base class for chat completion backends speaking the OpenAI streaming format.
+
+    Subclasses provide the endpoint, the headers and the request parameters;
+    the streaming, SSE decoding and retry logic live here.
+    """
+
+    name = "backend"
+
+    def __init__(self, config, http_client, retry_policy=None):
+        """
+        Initialize the backend.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            http_client (httpx.AsyncClient): Shared pooled client
+            retry_policy (RetryPolicy): Shared retry policy, created if not given
+        """
+        self.config = config
+        self.http_client = http_client
+        self.retry_policy = retry_policy or RetryPolicy(config)
+        self.model = None
+        self.url = None
+
+    async def prepare(self):
+        """Warm up before the first request (e.g. fetch credentials). Optional."""
+
+    async def get_headers(self):
+        """Headers sent with each request."""
+        return {"Content-Type": "application/json"}
+
+    async def on_unauthorized(self):
+        """
+        Handle a 401 response, e.g. by refreshing credentials.
+
+        Returns:
+            bool: True if the request should be retried
+        """
+        return False
+
+    def prepare_messages(self, history):
+        """
+        Build the messages sent for the given history.
+
+        Args:
+            history (list): Conversation history, the last entry being the new prompt
+
+        Returns:
+            list: Messages for the request
+        """
+        return list(history)
+
+    def request_params(self):
+        """Extra request parameters such as the temperature."""
+        return {}
+
+    def build_payload(self, messages):
+        """Build the JSON body of a streaming chat completion request."""
+        payload = {"model": self.model, "messages": messages, "stream": True}
+        payload.update(self.request_params())
+        return payload
+
+    def cache_payload(self, messages):
+        """Everything that determines the response, used as response cache key."""
+        return {"endpoint": self.url, "model": self.model, "messages": messages, **self.request_params()}
+
+    async def stream_chat(self, messages):
+        """
+        Stream a chat completion.
+
+        Failed requests are retried according to the retry policy, but only
+        until the first delta arrived, so no text is ever printed twice.
+
+        Args:
+            messages (list): Messages from prepare_messages
+
+        Yields:
+            str: Content deltas
+
+        Raises:
+            BackendError: If no response could be obtained
+        """
+        # Imported with the first request, like the HTTP client itself, see LazyHTTPClient
+        import httpx
+        payload = self.build_payload(messages)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            received = False
+
+            try:
+                headers = await self.get_headers()
+                async with self.http_client.stream("POST", self.url, json=payload, headers=headers) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        response.raise_for_status()
+
+                    async for delta in iter_sse_deltas(response.aiter_bytes()):
+                        received = True
+                        yield delta
+                return
+
+            except httpx.HTTPStatusError as e:
+                if received:
+                    raise BackendError(f"{self.name} stream interrupted: {e}") from e
+                if e.response.status_code == 401 and attempt < self.retry_policy.max_attempts \
+                        and await self.on_unauthorized():
+                    logging.info(f"{self.name}: unauthorized, retrying with fresh credentials.")
+                    continue
+                if not self.retry_policy.should_retry(e, attempt):
+                    raise BackendError(f"{self.name} request failed: {e}") from e
+
+            except httpx.TransportError as e:
+                if received or not self.retry_policy.should_retry(e, attempt):
+                    raise BackendError(f"{self.name} request failed: {e!r}") from e
+
+            delay = self.retry_policy.delay(attempt)
+            logging.info(f"{self.name}: attempt {attempt} failed, retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+    def get_stats(self):
+        """Backend specific statistics shown with the session statistics."""
+        return {}
+
+    async def aclose(self):
+        """Release backend resources. The shared HTTP client is closed by its owner."""
@@ -0,0 +1,103 @@
+"""
+DigitalOcean GenAI agent backend.
+Authenticates with short-lived access tokens obtained through TokenManager.
+"""
+
+import asyncio
+import logging
+import contextvars
+import functools
+from .base import Backend
+from src.token_manager import TokenManager, DEFAULT_REFRESH_MARGIN
+
+AUTH_API_URL = "https://cluster-api.do-ai.run/v1"
+
+
+class DigitalOceanBackend(Backend):
+    """
+    Backend for a DigitalOcean GenAI agent endpoint.
+
+    The access token is renewed by the token manager in the background, so
+    requests only wait for a token when no valid one exists at all.
+    """
+
+    name = "digital_ocean"
+
+    def __init__(self, config, http_client, retry_policy=None, auth_http_client=None):
+        """
+        Initialize the backend from the 'digital_ocean_config' section.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            http_client (httpx.AsyncClient): Shared pooled client
+            retry_policy (RetryPolicy): Shared retry policy
+            auth_http_client (httpx.Client): Pooled client for the token API
+        """
+        super().__init__(config, http_client, retry_policy)
+        settings = config['digital_ocean_config']
+        self.agent_id = settings['agent_id']
+        self.agent_key = settings['agent_key']
+        self.agent_endpoint = settings['agent_endpoint']
+        self.url = f"{self.agent_endpoint}/chat/completions"
+        self.model = settings['model']
+        self.token_refresh_margin = settings.get('token_refresh_margin', DEFAULT_REFRESH_MARGIN)
+        self.auth_api_url = settings.get('auth_api_url', AUTH_API_URL)
+
+        self.auth_http_client = auth_http_client
+        self.token_manager = self._create_token_manager()
+        # Fetched on the first request, concurrently with context gathering
+        self.access_token = None
+
+    def _create_token_manager(self):
+        """Create a token manager bound to the shared auth HTTP client."""
+        return TokenManager(
+            agent_id=self.agent_id,
+            agent_key=self.agent_key,
+            auth_api_url=self.auth_api_url,
+            http_client=self.auth_http_client,
+            refresh_margin=self.token_refresh_margin
+        )
+
+    async def _refresh_token(self, reset=False):
+        """Fetch a valid access token in a worker thread."""
+        if reset:
+            # Attempt to completely reset token management
+            self.token_manager.stop()
+            self.token_manager = self._create_token_manager()
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, self.token_manager.get_valid_access_token)
+        self.access_token = await loop.run_in_executor(None, call)
+        self.token_manager.start_background_refresh()
+
+    async def prepare(self):
+        """Make sure a valid token is available and kept renewed in the background."""
+        token = self.token_manager.current_token()
+        if token is not None:
+            self.access_token = token
+            return
+        try:
+            logging.info("No valid access token, fetching one...")
+            await self._refresh_token()
+        except Exception as e:
+            logging.error(f"Error refreshing token: {e}")
+            await self._refresh_token(reset=True)
+
+    async def get_headers(self):
+        # In-memory check, renewal happens in the background
+        await self.prepare()
+        headers = await super().get_headers()
+        headers["Authorization"] = f"Bearer {self.access_token}"
+        return headers
+
+    async def on_unauthorized(self):
+        """Force a new token after a 401 response."""
+        self.token_manager.invalidate(self.access_token)
+        await self._refresh_token()
+        return True
+
+    async def aclose(self):
+        """Stop the background token renewal."""
+        self.token_manager.stop()
+
+    def cache_payload(self, messages):
+        return {"endpoint": self.agent_endpoint, "model": self.model, "messages": messages}
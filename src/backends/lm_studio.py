@@ -0,0 +1,31 @@
+"""
+LM Studio chat completion backend.
+LM Studio serves an OpenAI-compatible API on the local network.
+"""
+
+from .openai_compat import OpenAICompatibleBackend
+
+
+class LMStudioBackend(OpenAICompatibleBackend):
+    """Backend for a local LM Studio server."""
+
+    name = "lm_studio"
+
+    def _load_settings(self, config):
+        """Read the top-level 'api_url', 'api_key' and 'model' keys."""
+        self.lm_studio_config = config.get('lm_studio_config', {})
+        return {
+            "api_url": config['api_url'],
+            "api_key": config.get('api_key'),
+            "model": config['model'],
+            "temperature": self.lm_studio_config.get('temperature', 0.7),
+        }
+
+    def prepare_messages(self, history):
+        """Send the new prompt wrapped in the model's instruction format."""
+        messages = list(history)
+        if messages and messages[-1]["role"] == "user":
+            prefix = self.lm_studio_config.get('input_prefix', '### Instruction:')
+            suffix = self.lm_studio_config.get('input_suffix', '### Response:')
+            messages[-1] = {"role": "user", "content": f"{prefix} {messages[-1]['content']} {suffix}"}
+        return messages
@@ -0,0 +1,41 @@
+"""
+Generic OpenAI-compatible chat completion backend.
+Works with any server exposing a streaming /chat/completions endpoint.
+"""
+
+from .base import Backend
+
+
+class OpenAICompatibleBackend(Backend):
+    """Backend for OpenAI-compatible APIs (OpenAI, vLLM, llama.cpp server, ...)."""
+
+    name = "openai"
+
+    def __init__(self, config, http_client, retry_policy=None):
+        """
+        Initialize the backend.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            http_client (httpx.AsyncClient): Shared pooled client
+            retry_policy (RetryPolicy): Shared retry policy
+        """
+        super().__init__(config, http_client, retry_policy)
+        settings = self._load_settings(config)
+        self.url = f"{settings['api_url'].rstrip('/')}/chat/completions"
+        self.api_key = settings.get('api_key')
+        self.model = settings['model']
+        self.temperature = settings.get('temperature', 0.7)
+
+    def _load_settings(self, config):
+        """Read the endpoint, credentials and sampling settings from the 'openai_config' section."""
+        return config.get('openai_config', {})
+
+    async def get_headers(self):
+        headers = await super().get_headers()
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def request_params(self):
+        return {"temperature": self.temperature}
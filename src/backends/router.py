@@ -0,0 +1,294 @@
+"""
+Latency-aware routing between several chat completion backends.
+Sends each request to the fastest healthy backend, fails over and optionally hedges.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+from src.tracing import percentile
+from .base import Backend, BackendError
+
+# Defaults used when the 'router' section is missing from config.yaml
+DEFAULT_ROUTER_CONFIG = {
+    "backends": ["lm_studio", "digital_ocean"],  # Modes to route between, preferred first until measured
+    "window": 20,                # Rolling samples kept per backend
+    "failure_cooldown": 30.0,    # Seconds a failed backend is only used as a last resort
+    "hedge": False,              # Start a second backend when the first token is late
+    "hedge_percentile": 95,      # Percentile of the time to first token that counts as late
+    "hedge_delay": 3.0,          # Lateness threshold (seconds) until enough samples are collected
+}
+
+# Samples needed before the percentile replaces the configured hedge delay
+MIN_HEDGE_SAMPLES = 5
+# Completion length used to weigh time to first token against tokens per second
+EXPECTED_COMPLETION_TOKENS = 200
+
+# Marks the end of a stream in an attempt queue
+_END = object()
+
+
+class BackendStats:
+    """Rolling latency and health measurements of one backend."""
+
+    def __init__(self, window):
+        """
+        Initialize the measurements.
+
+        Args:
+            window (int): Number of samples kept
+        """
+        self.ttft = deque(maxlen=window)
+        # Streamed deltas per second, close to tokens per second for chat streams
+        self.tokens_per_second = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.wins = 0
+        self.unhealthy_until = 0.0
+
+    @property
+    def measured(self):
+        return bool(self.ttft)
+
+    def healthy(self, now):
+        return now >= self.unhealthy_until
+
+    def expected_latency(self):
+        """Estimated duration of a typical turn, in seconds."""
+        latency = percentile(self.ttft, 50)
+        if self.tokens_per_second:
+            latency += EXPECTED_COMPLETION_TOKENS / percentile(self.tokens_per_second, 50)
+        return latency
+
+
+class RouterBackend(Backend):
+    """
+    Route each request to the fastest healthy backend.
+
+    Backends are ranked by their rolling median time to first token plus the
+    time to stream a typical completion at their median tokens per second.
+    Backends that have not been measured yet are tried first, so every
+    backend gets measured. A backend that fails before its first token is
+    put in cooldown and the request fails over to the next one. With hedging
+    enabled, a second backend is started when the first token is later than
+    the chosen percentile of the first backend's history; the backend that
+    answers first wins and the other request is cancelled.
+    """
+
+    name = "router"
+
+    def __init__(self, config, http_client, backends, retry_policy=None):
+        """
+        Initialize the router.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            http_client (httpx.AsyncClient): Shared pooled client
+            backends (list): Backends to route between, in order of preference
+            retry_policy (RetryPolicy): Shared retry policy
+        """
+        super().__init__(config, http_client, retry_policy)
+
+        settings = dict(DEFAULT_ROUTER_CONFIG)
+        settings.update(config.get('router', {}) or {})
+
+        if not backends:
+            raise ValueError("The router needs at least one backend.")
+
+        self.backends = list(backends)
+        self.failure_cooldown = settings["failure_cooldown"]
+        self.hedge = bool(settings["hedge"])
+        self.hedge_percentile = settings["hedge_percentile"]
+        self.hedge_delay = settings["hedge_delay"]
+        self.stats = {backend.name: BackendStats(settings["window"]) for backend in self.backends}
+        self.hedges = 0
+
+        # Token counting and history budgets follow the preferred backend
+        self.model = self.backends[0].model
+        self.url = self.backends[0].url
+
+    async def prepare(self):
+        """Prepare all backends concurrently; one failing does not block the others."""
+        results = await asyncio.gather(*(backend.prepare() for backend in self.backends),
+                                       return_exceptions=True)
+        for backend, result in zip(self.backends, results):
+            if isinstance(result, Exception):
+                logging.warning(f"router: preparing {backend.name} failed: {result}")
+
+    def prepare_messages(self, history):
+        """Keep the plain history, each backend formats it when the request is sent."""
+        return list(history)
+
+    def cache_payload(self, messages):
+        """The cache key covers every backend, whichever one answers."""
+        return {"router": [backend.cache_payload(backend.prepare_messages(messages))
+                           for backend in self.backends]}
+
+    def rank(self):
+        """
+        Order the backends for the next request.
+
+        Returns:
+            list: Healthy backends first, unmeasured then fastest, failed ones last
+        """
+        now = time.monotonic()
+
+        def key(item):
+            position, backend = item
+            stats = self.stats[backend.name]
+            if not stats.healthy(now):
+                return (2, stats.unhealthy_until, position)
+            if not stats.measured:
+                return (0, 0.0, position)
+            return (1, stats.expected_latency(), position)
+
+        return [backend for _, backend in sorted(enumerate(self.backends), key=key)]
+
+    def get_stats(self):
+        """Rolling measurements per backend."""
+        stats = {"router_hedges": self.hedges}
+        for name, backend_stats in self.stats.items():
+            ttft = percentile(backend_stats.ttft, 50)
+            tps = percentile(backend_stats.tokens_per_second, 50)
+            stats[f"{name}_requests"] = backend_stats.requests
+            stats[f"{name}_wins"] = backend_stats.wins
+            stats[f"{name}_failures"] = backend_stats.failures
+            stats[f"{name}_ttft_p50"] = f"{ttft:.2f}s" if ttft is not None else "n/a"
+            stats[f"{name}_tokens_per_second"] = f"{tps:.1f}" if tps is not None else "n/a"
+        return stats
+
+    def _lateness_threshold(self, backend):
+        """Seconds without a first token after which a request is hedged."""
+        samples = self.stats[backend.name].ttft
+        if len(samples) >= MIN_HEDGE_SAMPLES:
+            return percentile(samples, self.hedge_percentile)
+        return self.hedge_delay
+
+    async def stream_chat(self, messages):
+        """
+        Stream a chat completion from the best available backend.
+
+        Args:
+            messages (list): Messages from prepare_messages
+
+        Yields:
+            str: Content deltas
+
+        Raises:
+            BackendError: If every backend failed
+        """
+        candidates = self.rank()
+        active = {}
+        errors = []
+        winner = None
+        first = _END
+
+        try:
+            while winner is None:
+                if not active:
+                    if not candidates:
+                        raise BackendError("All backends failed: " + "; ".join(errors))
+                    self._start(candidates.pop(0), messages, active)
+
+                timeout = None
+                if self.hedge and len(active) == 1 and candidates:
+                    (attempt,) = active.values()
+                    timeout = max(0.0, self._lateness_threshold(attempt.backend) - attempt.elapsed())
+
+                done, _ = await asyncio.wait(list(active), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    backend = candidates.pop(0)
+                    logging.info(f"router: first token late, hedging with {backend.name}.")
+                    self.hedges += 1
+                    self._start(backend, messages, active)
+                    continue
+
+                for next_item in done:
+                    attempt = active.pop(next_item)
+                    item = next_item.result()
+                    if isinstance(item, BackendError):
+                        logging.warning(f"router: {attempt.backend.name} failed, failing over: {item}")
+                        errors.append(str(item))
+                        continue
+                    winner, first = attempt, item
+                    break
+        finally:
+            # Cancel the losers, and everything if no backend answered
+            for next_item, attempt in active.items():
+                next_item.cancel()
+                attempt.cancel()
+
+        winner.won()
+        try:
+            item = first
+            while item is not _END:
+                if isinstance(item, BackendError):
+                    raise item
+                yield item
+                item = await winner.queue.get()
+        finally:
+            winner.cancel()
+
+    def _start(self, backend, messages, active):
+        """Start a request on a backend and register the wait for its first item."""
+        attempt = _Attempt(backend, self.stats[backend.name], messages, self.failure_cooldown)
+        active[asyncio.ensure_future(attempt.queue.get())] = attempt
+
+    async def aclose(self):
+        """Release the resources of every backend."""
+        for backend in self.backends:
+            await backend.aclose()
+
+
+class _Attempt:
+    """One request on one backend, streaming its deltas into a queue."""
+
+    def __init__(self, backend, stats, messages, failure_cooldown):
+        self.backend = backend
+        self.stats = stats
+        self.failure_cooldown = failure_cooldown
+        self.queue = asyncio.Queue()
+        self.started = time.monotonic()
+        self.first_token_at = None
+        stats.requests += 1
+        self.task = asyncio.ensure_future(self._pump(messages))
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def won(self):
+        self.stats.wins += 1
+
+    def cancel(self):
+        self.task.cancel()
+
+    async def _pump(self, messages):
+        count = 0
+        try:
+            async for delta in self.backend.stream_chat(self.backend.prepare_messages(messages)):
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                    self.stats.ttft.append(self.first_token_at - self.started)
+                count += 1
+                self.queue.put_nowait(delta)
+
+            duration = time.monotonic() - (self.first_token_at or self.started)
+            if count > 1 and duration > 0:
+                self.stats.tokens_per_second.append((count - 1) / duration)
+            self.stats.unhealthy_until = 0.0
+            self.queue.put_nowait(_END)
+
+        except asyncio.CancelledError:
+            if self.first_token_at is None:
+                # Lost a hedge: the time waited is a lower bound of its time to first token
+                self.stats.ttft.append(self.elapsed())
+            raise
+
+        except Exception as e:
+            if not isinstance(e, BackendError):
+                e = BackendError(f"{self.backend.name} failed: {e!r}")
+            self.stats.failures += 1
+            self.stats.unhealthy_until = time.monotonic() + self.failure_cooldown
+            self.queue.put_nowait(e)
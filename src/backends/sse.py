@@ -0,0 +1,147 @@
+"""
+Server-sent events decoding for the chat completion backends.
+Turns the raw byte stream of an OpenAI-compatible endpoint into text deltas.
+"""
+
+import json
+import logging
+from typing import List, Optional
+
+try:
+    # orjson parses the small delta objects several times faster than json
+    import orjson
+    _json_loads = orjson.loads
+    JSON_PARSER = "orjson"
+except ImportError:
+    def _json_loads(data):
+        # json.loads sniffs the encoding of bytes input, decoding first is faster
+        return json.loads(data.decode("utf-8"))
+    JSON_PARSER = "json"
+
+DONE_SENTINEL = b"[DONE]"
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for server-sent events.
+
+    Works on raw byte chunks split at arbitrary positions. Handles CRLF, LF
+    and CR line endings, comments, multi-line data fields (joined with a
+    newline) and ignores the fields a chat stream does not use (event, id,
+    retry). Only the data of complete events is returned.
+    """
+
+    def __init__(self):
+        """Initialize an empty decoder."""
+        # Bytes of the event that has not been terminated by a blank line yet
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Add a chunk of the response body.
+
+        Args:
+            chunk: Raw bytes as received from the network
+
+        Returns:
+            List of event data payloads completed by this chunk
+        """
+        buffer = self._buffer + chunk if self._buffer else chunk
+
+        if b"\r" in buffer:
+            # A trailing CR may be the first half of a CRLF split across chunks
+            held = b"\r" if buffer.endswith(b"\r") else b""
+            if held:
+                buffer = buffer[:-1]
+            buffer = buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        else:
+            held = b""
+
+        blocks = buffer.split(b"\n\n")
+        self._buffer = blocks.pop() + held
+
+        events = []
+        for block in blocks:
+            if block.startswith(b"data: ") and b"\n" not in block:
+                # Fast path: the usual single-line event of a chat stream
+                events.append(block[6:])
+            elif block:
+                data = self._parse_event(block)
+                if data is not None:
+                    events.append(data)
+        return events
+
+    @staticmethod
+    def _parse_event(block):
+        """Return the joined data lines of one event, or None if it has none."""
+        data_lines = []
+        for line in block.split(b"\n"):
+            if line.startswith(b"data:"):
+                value = line[5:]
+                data_lines.append(value[1:] if value.startswith(b" ") else value)
+            # Comments (':') and other fields carry nothing for a chat stream
+        return b"\n".join(data_lines) if data_lines else None
+
+    def finish(self) -> List[bytes]:
+        """
+        Flush the decoder at the end of the stream.
+
+        Some servers close the connection without the final blank line, so a
+        pending event is dispatched anyway.
+
+        Returns:
+            List with the last event data payload, if any
+        """
+        events = self.feed(b"\n\n") if self._buffer else []
+        self._buffer = b""
+        return events
+
+
+def parse_delta(data: bytes) -> Optional[str]:
+    """
+    Extract the content delta of one chat completion chunk.
+
+    Args:
+        data: JSON payload of an SSE event
+
+    Returns:
+        Content delta, or None if the chunk carries no text
+    """
+    try:
+        chunk = _json_loads(data)
+    except ValueError:
+        logging.debug(f"Skipping malformed SSE data: {data[:80]!r}")
+        return None
+
+    choices = chunk.get("choices") if isinstance(chunk, dict) else None
+    if choices:
+        return (choices[0].get("delta") or {}).get("content") or None
+    return None
+
+
+async def iter_sse_deltas(chunks):
+    """
+    Decode an OpenAI-style SSE byte stream into content deltas.
+
+    Args:
+        chunks: Async iterator over the raw response body chunks
+
+    Yields:
+        str: Non-empty content deltas, until the [DONE] sentinel
+    """
+    decoder = SSEDecoder()
+
+    async for chunk in chunks:
+        for data in decoder.feed(chunk):
+            if data == DONE_SENTINEL:
+                return
+            content = parse_delta(data)
+            if content:
+                yield content
+
+    for data in decoder.finish():
+        if data == DONE_SENTINEL:
+            return
+        content = parse_delta(data)
+        if content:
+            yield content
@@ -0,0 +1,217 @@
+"""
+Headless batch mode for Neo AI.
+Runs independent prompts from a JSONL file concurrently, without the terminal UI,
+and writes one JSON result line per prompt.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import contextlib
+
+from src.ai_core import AsyncNeoAI
+from src.approval_handler import approval_policy, APPROVAL_POLICIES
+from src.command_executor import direct_execution
+from src.tracing import percentile
+
+# Defaults used when the 'batch' section is missing from config.yaml
+DEFAULT_BATCH_CONFIG = {
+    "concurrency": 4,           # Prompts in flight at once
+    "approval": "read_only",    # 'allow', 'deny' or 'read_only', overridable per prompt
+}
+
+
+def load_prompts(path):
+    """
+    Read a batch file.
+
+    Each non-empty line is either a JSON string (the prompt) or an object with
+    a 'prompt' and optionally an 'id' and an 'approval' policy.
+
+    Args:
+        path (str): JSONL file, '-' for stdin
+
+    Returns:
+        list: Dicts with 'index', 'id', 'prompt' and 'approval', or 'error' for invalid lines
+    """
+    entries = []
+    with (contextlib.nullcontext(sys.stdin) if path == "-" else open(path, "r", encoding="utf-8")) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            entry = {"index": len(entries), "id": str(line_number), "prompt": None, "approval": None}
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                entry["error"] = f"Invalid JSON on line {line_number}: {e}"
+                entries.append(entry)
+                continue
+
+            if isinstance(item, str):
+                item = {"prompt": item}
+            if not isinstance(item, dict) or not isinstance(item.get("prompt"), str):
+                entry["error"] = f"Line {line_number} has no 'prompt' string"
+            elif item.get("approval") not in (None,) + APPROVAL_POLICIES:
+                entry["error"] = f"Unknown approval policy on line {line_number}: {item['approval']}"
+            else:
+                entry.update(prompt=item["prompt"], approval=item.get("approval"))
+                entry["id"] = str(item.get("id", entry["id"]))
+            entries.append(entry)
+    return entries
+
+
+class BatchRunner:
+    """
+    Run prompts concurrently, each with its own conversation.
+
+    A single AsyncNeoAI engine is created for the batch and every prompt runs
+    in a session of its own from AsyncNeoAI.new_session(), so prompts never
+    see each other's conversation while connections and tokens are reused.
+    Approvals are answered by a policy set in each prompt's context,
+    and commands bypass the persistent terminal, which runs one command at a
+    time.
+    """
+
+    def __init__(self, config, concurrency=None, approval=None):
+        """
+        Initialize the runner.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            concurrency (int): Prompts in flight at once, from the 'batch' section when not given
+            approval (str): Default approval policy, from the 'batch' section when not given
+        """
+        settings = dict(DEFAULT_BATCH_CONFIG)
+        settings.update(config.get('batch', {}) or {})
+
+        self.config = config
+        self.concurrency = max(1, int(concurrency or settings["concurrency"]))
+        self.approval = approval or settings["approval"]
+        if self.approval not in APPROVAL_POLICIES:
+            raise ValueError(f"Unknown approval policy '{self.approval}', "
+                             f"expected one of: {', '.join(APPROVAL_POLICIES)}")
+
+    async def run(self, entries, write):
+        """
+        Run every prompt and hand each result to write() as soon as it is done.
+
+        Args:
+            entries (list): Prompts from load_prompts()
+            write: Callable receiving each result dict
+
+        Returns:
+            list: Result dicts, in order of the entries
+        """
+        engine = AsyncNeoAI(self.config) if any("error" not in entry for entry in entries) else None
+        slots = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+
+        async def run_entry(entry):
+            if "error" in entry:
+                result = self._result(entry, "error", error=entry["error"])
+            else:
+                async with slots:
+                    result = await self._run_prompt(engine.new_session(), entry, time.monotonic() - started)
+            write(result)
+            return result
+
+        try:
+            return await asyncio.gather(*(run_entry(entry) for entry in entries))
+        finally:
+            if engine is not None:
+                await engine.aclose()
+
+    async def _run_prompt(self, engine, entry, waited):
+        """Run one prompt in a new session (inside its own task, so context variables stay local)."""
+        approval_policy.set(entry["approval"] or self.approval)
+        direct_execution.set(True)
+
+        prompt_started = time.monotonic()
+        try:
+            run = await engine.run(entry["prompt"])
+        except Exception as e:
+            logging.error(f"Batch prompt {entry['id']} failed: {e}")
+            return self._result(entry, "error", error=str(e), waited=waited,
+                                elapsed=time.monotonic() - prompt_started)
+
+        steps = run["steps"]
+        return self._result(
+            entry, "ok",
+            response=run["response"],
+            stop_reason=run["stop_reason"],
+            steps=len(steps),
+            tags=sum(step["tags"] for step in steps),
+            tokens=run["tokens"],
+            model_time=sum(step["model_time"] for step in steps),
+            tool_time=sum(step["tool_time"] for step in steps),
+            waited=waited,
+            elapsed=time.monotonic() - prompt_started,
+        )
+
+    @staticmethod
+    def _result(entry, status, **fields):
+        """Build a result line."""
+        result = {"id": entry["id"], "index": entry["index"], "status": status}
+        for key, value in fields.items():
+            result[key] = round(value, 4) if isinstance(value, float) else value
+        return result
+
+
+def run_batch(config, path, output=None, concurrency=None, approval=None):
+    """
+    Run a batch file headlessly.
+
+    Model output and command progress are discarded; results go to the output
+    file, or to stdout, and a summary goes to stderr.
+
+    Args:
+        config (dict): Full Neo AI configuration
+        path (str): JSONL file of prompts, '-' for stdin
+        output (str): JSONL file for the results, stdout when not given
+        concurrency (int): Prompts in flight at once
+        approval (str): Default approval policy
+
+    Returns:
+        int: Process exit code, 1 if any prompt failed
+    """
+    runner = BatchRunner(config, concurrency, approval)
+    entries = load_prompts(path)
+    if not entries:
+        print(f"No prompts found in {path}.", file=sys.stderr)
+        return 1
+
+    sink = open(output, "w", encoding="utf-8") if output else sys.stdout
+    done = [0]
+
+    def write(result):
+        sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sink.flush()
+        done[0] += 1
+        print(f"\r[{done[0]}/{len(entries)}] {result['id']}: {result['status']}",
+              end="", file=sys.stderr, flush=True)
+
+    started = time.monotonic()
+    try:
+        # Streamed replies and command progress are meant for a terminal, not for the results
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = asyncio.run(runner.run(entries, write))
+    finally:
+        if output:
+            sink.close()
+    elapsed = time.monotonic() - started
+
+    failed = sum(1 for result in results if result["status"] != "ok")
+    latencies = [result["elapsed"] for result in results if "elapsed" in result]
+    print(file=sys.stderr)
+    summary = (f"{len(results)} prompts, {failed} failed, {elapsed:.1f}s "
+               f"({len(results) / elapsed:.2f} prompts/s, concurrency {runner.concurrency}, "
+               f"approval {runner.approval})")
+    if latencies:
+        summary += f", latency p50 {percentile(latencies, 50):.2f}s p95 {percentile(latencies, 95):.2f}s"
+    print(summary, file=sys.stderr)
+    return 1 if failed else 0
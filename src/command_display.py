@@ -80,6 +80,10 @@ class CommandDisplay:
         print_formatted_text(HTML(formatted_cmd), style=OUTPUT_STYLE)
         print_formatted_text(HTML("<s>Executing command...</s>"), style=OUTPUT_STYLE)
 
+    def print_output_chunk(self, chunk):
+        """Print output of a running command as it arrives, without formatting it."""
+        print_formatted_text(FormattedText([('class:output', chunk)]), style=OUTPUT_STYLE, end="", flush=True)
+
     def print_command_output(self, output, command):
         """Print the formatted output of a command."""
         formatted_output = self.format_output(output, command)
@@ -4,43 +4,243 @@ Uses a single reusable terminal window for all commands.
 """
 
 import subprocess
+import contextvars
 import os
 import time
 import logging
 import tempfile
 import shlex
+import shutil
 import signal
 import atexit
-from prompt_toolkit import print_formatted_text, HTML
+import codecs
+import select
+import itertools
+import threading
+from src.shell_backends import create_shell_backend
+from src.tracing import tracer
+
+# Set while MCP tags run concurrently: the persistent terminal runs one command at a time
+direct_execution = contextvars.ContextVar("direct_execution", default=False)
+# Directory commands run in when they bypass the persistent terminal, None for the current one
+working_directory = contextvars.ContextVar("working_directory", default=None)
+# Seconds the commands of the running tag may take, None for the configured command_timeout
+command_timeout = contextvars.ContextVar("command_timeout", default=None)
+# threading.Event set to stop the commands of the running tags, e.g. on Ctrl+C
+command_cancelled = contextvars.ContextVar("command_cancelled", default=None)
+
+def print_formatted_text(*args, **kwargs):
+    """prompt_toolkit's print_formatted_text, imported on first use only."""
+    from prompt_toolkit import print_formatted_text as _print_formatted_text
+    _print_formatted_text(*args, **kwargs)
+
+def HTML(text):
+    """prompt_toolkit's HTML, imported on first use only."""
+    from prompt_toolkit import HTML as _HTML
+    return _HTML(text)
+
+# Defaults used when the 'executor' section is missing from config.yaml
+DEFAULT_EXECUTOR_CONFIG = {
+    "backend": "auto",          # Host of the persistent shell: 'window', 'pty', or 'auto' for a window when there is a display
+    "pool_size": 4,             # Persistent shells running commands side by side, 0 for one process per command
+    "max_output_bytes": 65536,  # Output kept per command: the first and last halves, the middle is dropped
+    "command_timeout": 180,     # Seconds a command may run before its process group is stopped
+    "protocol_timeouts": {},    # Per-protocol overrides, e.g. {"network": 60}
+    "kill_grace": 2,            # Seconds between SIGTERM and SIGKILL when a command is stopped
+}
+
+# Bytes read from an output file at once
+READ_BLOCK_SIZE = 65536
+
+_settings = dict(DEFAULT_EXECUTOR_CONFIG)
+
+def configure_executor(config):
+    """
+    Apply the 'executor' section of the configuration.
+
+    Args:
+        config (dict): Full Neo AI configuration
+    """
+    _settings.update(DEFAULT_EXECUTOR_CONFIG)
+    _settings.update(config.get('executor', {}) or {})
+
+def protocol_timeout(protocol, default=None):
+    """
+    Timeout of the commands of an MCP protocol.
+
+    Args:
+        protocol (str): Protocol name
+        default (float): Timeout when executor.protocol_timeouts has none for the protocol
+
+    Returns:
+        float: Seconds, None for the executor's command_timeout
+    """
+    return (_settings["protocol_timeouts"] or {}).get(protocol, default)
+
+def resolve_timeout(timeout=None):
+    """
+    Timeout of a command: the one given, else the one of the running tag, else the configured one.
+
+    Returns:
+        float: Seconds the command may run
+    """
+    return timeout or command_timeout.get() or _settings["command_timeout"]
+
+class OutputCapture:
+    """
+    Output of a command, bounded to its first and last bytes.
+
+    The first half of the cap is kept as the head, the newest bytes past it go
+    to a tail ring buffer holding the other half, and the bytes in between are
+    only counted. Readers of an output file ask next_read() where to continue,
+    so the dropped middle of a large file is never read.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Initialize an empty capture.
+
+        Args:
+            max_bytes (int): Bytes kept at most, from the 'executor' section when not given
+        """
+        max_bytes = max(2, int(max_bytes or _settings["max_output_bytes"]))
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+
+    @property
+    def truncated(self):
+        """True if bytes were dropped between the head and the tail."""
+        return self.total_bytes > len(self.head) + len(self.tail)
+
+    def feed(self, data):
+        """Add the next bytes of the output."""
+        self.total_bytes += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    def skip(self, count):
+        """Count bytes of the output that were not read."""
+        self.total_bytes += count
+
+    def next_read(self, position, size):
+        """
+        Offset to read from next in a file, skipping bytes the capture would drop.
+
+        Args:
+            position (int): Offset up to which the file was captured
+            size (int): Current size of the file
+
+        Returns:
+            int: Offset to continue from, position or later
+        """
+        if len(self.head) < self.head_limit:
+            return position
+        return max(position, size - self.tail_limit)
+
+    def read_file(self, f):
+        """
+        Capture a whole file with ranged reads of its head and tail.
+
+        Args:
+            f: File opened in binary mode
+        """
+        size = os.fstat(f.fileno()).st_size
+        position = 0
+        while position < size:
+            start = self.next_read(position, size)
+            self.skip(start - position)
+            f.seek(start)
+            data = f.read(min(READ_BLOCK_SIZE, size - start))
+            if not data:
+                break
+            self.feed(data)
+            position = start + len(data)
+
+    def text(self):
+        """
+        Decoded output, with a marker where bytes were dropped.
+
+        Returns:
+            str: Command output
+        """
+        head = self.head.decode(errors="replace")
+        tail = self.tail.decode(errors="replace")
+        if not self.truncated:
+            return head + tail
+        omitted = self.total_bytes - len(self.head) - len(self.tail)
+        return f"{head}\n[... {omitted} bytes of output omitted ...]\n{tail}"
 
 class PersistentTerminalExecutor:
-    """Execute commands using a single persistent terminal window."""
+    """
+    Execute commands using a single persistent shell, in a terminal window or
+    on a pseudo-terminal, see src.shell_backends.
+
+    Neo and the shell talk over two FIFOs: each command is sent on the command
+    FIFO as a NUL-terminated id, working directory and command, and the shell
+    answers on the status FIFO with one tab-separated line per finished
+    command (id, exit code, output size, final directory and output file).
+    Both sides block on their FIFO, so a completion is noticed as soon as it
+    happens instead of on the next poll.
+    """
+
+    def __init__(self, directory=None, backend=None):
+        """
+        Initialize the persistent terminal executor.
 
-    def __init__(self):
-        """Initialize the persistent terminal executor."""
-        self.temp_dir = tempfile.gettempdir()
+        Args:
+            directory (str): Directory of the FIFOs and output file, the temporary directory when not given
+            backend (ShellBackend): Host of the shell, the configured one when not given
+        """
+        if backend is None:
+            try:
+                backend = create_shell_backend(_settings["backend"])
+            except ValueError as e:
+                logging.error(f"{e}, using 'auto'")
+                backend = create_shell_backend()
+        self.backend = backend
+        self.temp_dir = directory or tempfile.gettempdir()
         self.output_file = os.path.join(self.temp_dir, "neo_command_output.txt")
-        self.lock_file = os.path.join(self.temp_dir, "neo_command_lock")
+        self.state_file = os.path.join(self.temp_dir, "neo_terminal_state")
         self.pid_file = os.path.join(self.temp_dir, "neo_terminal_pid.txt")
+        self.script_path = os.path.join(self.temp_dir, "neo_terminal_script.sh")
         self.fifo_path = os.path.join(self.temp_dir, "neo_terminal_fifo")
-        self.terminal_type = self._detect_terminal_type()
-        self.terminal_process = None
+        self.status_fifo_path = os.path.join(self.temp_dir, "neo_terminal_status")
         self.terminal_initialized = False
-
-        # Set up logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            filename=os.path.join(self.temp_dir, "neo_command.log"),
-            filemode='a'
-        )
-
-        # Create FIFO if it doesn't exist
-        if not os.path.exists(self.fifo_path):
-            try:
-                os.mkfifo(self.fifo_path)
-            except Exception as e:
-                logging.error(f"Failed to create FIFO: {e}")
+        # Set when the shell could not be started: commands then run directly
+        self.terminal_unavailable = False
+        self.status_fd = None
+        self._status_buffer = b""
+        self._command_ids = itertools.count(1)
+        # Id of the command sent to the terminal and not reported done yet
+        self._pending_id = None
+        # Process group of that command, reported by the shell when it starts
+        self._process_group = None
+        # Exit code, output size, final directory and output file of the last command reported
+        # done, and why it was stopped if it was
+        self.last_completion = None
+
+        # Create the FIFOs if they don't exist
+        for fifo in (self.fifo_path, self.status_fifo_path):
+            if not os.path.exists(fifo):
+                try:
+                    os.mkfifo(fifo, 0o600)
+                except Exception as e:
+                    logging.error(f"Failed to create FIFO: {e}")
+        try:
+            # Opened read-write so the open does not wait for the shell, and
+            # reads block instead of hitting EOF while the shell restarts
+            self.status_fd = os.open(self.status_fifo_path, os.O_RDWR)
+        except OSError as e:
+            logging.error(f"Failed to open the terminal status FIFO: {e}")
 
         # Check if there's an existing terminal running
         if self._is_terminal_running():
@@ -50,34 +250,6 @@ class PersistentTerminalExecutor:
         # Register cleanup on exit
         atexit.register(self._cleanup)
 
-    def _detect_terminal_type(self):
-        """Detect the available terminal emulator."""
-        terminals = [
-            ("gnome-terminal", "gnome-terminal --"),
-            ("konsole", "konsole -e"),
-            ("xfce4-terminal", "xfce4-terminal -e"),
-            ("mate-terminal", "mate-terminal -e"),
-            ("terminator", "terminator -e"),
-            ("tilix", "tilix -e"),
-            ("kitty", "kitty -e"),
-            ("alacritty", "alacritty -e"),
-            ("x-terminal-emulator", "x-terminal-emulator -e")
-        ]
-
-        for terminal_cmd, launch_cmd in terminals:
-            try:
-                result = subprocess.run(["which", terminal_cmd],
-                                      stdout=subprocess.PIPE,
-                                      stderr=subprocess.PIPE,
-                                      check=False)
-                if result.returncode == 0:
-                    return launch_cmd
-            except Exception:
-                continue
-
-        # Default fallback
-        return "x-terminal-emulator -e"
-
     def _is_terminal_running(self):
         """Check if the terminal process is still running."""
         if not os.path.exists(self.pid_file):
@@ -104,150 +276,200 @@ class PersistentTerminalExecutor:
             # Process doesn't exist or invalid PID
             return False
 
-    def _initialize_terminal(self):
-        """Initialize the persistent terminal if not already running."""
-        if self._is_terminal_running():
-            logging.info("Persistent terminal is already running.")
-            return
-
-        try:
-            # Create the terminal script
-            script_path = os.path.join(self.temp_dir, "neo_terminal_script.sh")
-            with open(script_path, 'w') as f:
-                f.write('''#!/bin/bash
-echo $$ > %s
-echo "Neo AI Terminal - DO NOT CLOSE THIS WINDOW"
+    def _write_script(self):
+        """Write the script run by the persistent shell."""
+        paths = {
+            "pid_file": shlex.quote(self.pid_file),
+            "fifo": shlex.quote(self.fifo_path),
+            "status_fifo": shlex.quote(self.status_fifo_path),
+            "output_file": shlex.quote(self.output_file),
+            "state_file": shlex.quote(self.state_file),
+        }
+        if not self.backend.shows_output:
+            paths["banner"] = ""
+            # Commands read from the shell's terminal only if someone types there
+            paths["stdin"] = "" if self.backend.interactive_stdin else "< /dev/null "
+            paths["run"] = "%(stdin)s> %(output_file)s 2>&1\n    EXIT_CODE=$?" % paths
+            paths["show"] = ":"
+        else:
+            paths["banner"] = '''echo "Neo AI Terminal - DO NOT CLOSE THIS WINDOW"
 echo "This terminal will be used for all Neo AI commands."
-echo "---------------------------------------------------"
-
-# Function to handle commands
-process_command() {
-    # Read command from FIFO
-    command=$(cat %s)
-    
-    # Create lock file to indicate we're running a command
-    rm -f %s
-    
+echo "---------------------------------------------------"'''
+            paths["run"] = "2>&1 | tee %(output_file)s 3<&- 4>&-\n    EXIT_CODE=${PIPESTATUS[0]}" % paths
+            paths["show"] = "echo"
+        with open(self.script_path, 'w') as f:
+            f.write('''#!/bin/bash
+# Command and status channels, opened read-write so they never see EOF
+exec 3<> %(fifo)s
+exec 4<> %(status_fifo)s
+state_file=%(state_file)s
+# Job control: each command runs in its own process group, stopped as a whole on timeout
+set -m
+echo $$ > %(pid_file)s
+%(banner)s
+printf 'ready\\t%%s\\n' "$$" >&4
+
+# Block until the next command: NUL-terminated id, working directory and command
+while IFS= read -r -d '' -u 3 command_id && IFS= read -r -d '' -u 3 command_cwd \\
+        && IFS= read -r -d '' -u 3 command; do
     # Display command
-    echo ""
-    echo "---------------------------------------------------"
-    echo "Executing: $command"
-    echo "---------------------------------------------------"
-    
-    # Execute the command and capture output
-    eval "$command" 2>&1 | tee %s
-    EXIT_CODE=${PIPESTATUS[0]}
-    
-    # Add exit code to output
-    echo "" >> %s
-    echo "---------------------------------------------------" >> %s
-    echo "Command completed with exit code: $EXIT_CODE" >> %s
-    
-    # Create lock file to indicate completion
-    touch %s
-    
-    echo "---------------------------------------------------"
-    echo "Command completed. Waiting for next command..."
-    echo "---------------------------------------------------"
-}
+    %(show)s ""
+    %(show)s "---------------------------------------------------"
+    %(show)s "Executing: $command"
+    %(show)s "---------------------------------------------------"
+
+    # Execute the command in a subshell, so 'exit' cannot end this loop, and
+    # keep the directory and environment it ends with in the state file
+    (
+        trap 'printf "%%s\\0" "$PWD" > "$state_file"; env -0 >> "$state_file"' EXIT
+        # The subshell leads the process group of the command
+        printf 'started\\t%%s\\t%%s\\n' "$command_id" "$BASHPID" >&4
+        exec 3<&- 4>&-
+        if [ -n "$command_cwd" ]; then cd -- "$command_cwd" || exit; fi
+        eval "$command"
+    ) %(run)s
 
-# Main loop - keep reading commands
-while true; do
-    if [ -e %s ]; then
-        process_command
-    else
-        sleep 0.5
-    fi
+    # Add exit code to output
+    {
+        echo ""
+        echo "---------------------------------------------------"
+        echo "Command completed with exit code: $EXIT_CODE"
+    } >> %(output_file)s
+
+    # Report completion: id, exit code, output size, final directory and output file
+    IFS= read -r -d '' final_cwd < "$state_file" 2> /dev/null
+    printf 'done\\t%%s\\t%%s\\t%%s\\t%%s\\t%%s\\n' "$command_id" "$EXIT_CODE" \\
+        "$(( $(wc -c < %(output_file)s) ))" "$final_cwd" %(output_file)s >&4
+
+    %(show)s "---------------------------------------------------"
+    %(show)s "Command completed. Waiting for next command..."
+    %(show)s "---------------------------------------------------"
 done
-''' % (self.pid_file, self.fifo_path, self.lock_file,
-       self.output_file, self.output_file, self.output_file,
-       self.output_file, self.lock_file, self.fifo_path))
-
-            # Make script executable
-            os.chmod(script_path, 0o755)
-
-            # Launch terminal more reliably - determine based on desktop environment
-            desktop_env = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
-            term_cmd = ""
-
-            if "gnome" in desktop_env or "unity" in desktop_env:
-                term_cmd = f"gnome-terminal -- bash {script_path}"
-            elif "kde" in desktop_env or "plasma" in desktop_env:
-                term_cmd = f"konsole -e bash {script_path}"
-            elif "xfce" in desktop_env:
-                term_cmd = f"xfce4-terminal -e 'bash {script_path}'"
-            else:
-                # Use detected terminal with explicit bash
-                term_cmd = f"{self.terminal_type} bash {script_path}"
+''' % paths)
 
-            # Log the command we're about to run
-            logging.info(f"Launching persistent terminal with: {term_cmd}")
-            #print_formatted_text(HTML(f"<ansiblue>Launching terminal: {term_cmd}</ansiblue>"))
+        # Make script executable
+        os.chmod(self.script_path, 0o755)
 
-            # Launch the terminal with nohup to ensure it stays running
-            subprocess.Popen(term_cmd, shell=True,
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL,
-                           start_new_session=True)
-
-            # Wait for terminal to initialize
-            wait_count = 0
-            while not os.path.exists(self.pid_file) and wait_count < 20:
-                time.sleep(0.5)
-                wait_count += 1
-                print(f"\rWaiting for terminal to initialize... {wait_count}/20", end="")
-
-            print()  # New line after waiting
+    def _initialize_terminal(self):
+        """Initialize the persistent terminal if not already running."""
+        if self._is_terminal_running():
+            logging.info("Persistent terminal is already running.")
+            return
 
-            if os.path.exists(self.pid_file):
+        try:
+            ready = self._start_shell()
+            if not ready and self.backend.name == "window":
+                # No terminal emulator could open a window, a pseudo-terminal needs none
+                logging.warning("Failed to open a terminal window, using a pseudo-terminal.")
+                self.backend.close()
+                self.backend = create_shell_backend("pty")
+                ready = self._start_shell()
+
+            if ready:
                 with open(self.pid_file, 'r') as f:
                     pid = f.read().strip()
-                logging.info(f"Persistent terminal initialized successfully. PID: {pid}")
-                #print_formatted_text(HTML(f"<ansigreen>Persistent terminal initialized successfully. PID: {pid}</ansigreen>"))
+                logging.info(f"Persistent terminal initialized successfully "
+                             f"({self.backend.name} backend). PID: {pid}")
                 self.terminal_initialized = True
             else:
                 logging.error("Failed to initialize persistent terminal.")
-                print_formatted_text(HTML("<ansired>Failed to initialize persistent terminal. Using fallback method.</ansired>"))
-                self._initialize_fallback()
+                print_formatted_text(HTML("<ansired>Failed to initialize persistent terminal. Running commands directly.</ansired>"))
+                self.terminal_unavailable = True
 
         except Exception as e:
             logging.error(f"Error initializing persistent terminal: {e}")
             print_formatted_text(HTML(f"<ansired>Error initializing persistent terminal: {e}</ansired>"))
-            self._initialize_fallback()
-
-    def _initialize_fallback(self):
-        """Initialize a fallback terminal method."""
-        # Create a simple script that just writes the PID to file
-        script_path = os.path.join(self.temp_dir, "neo_fallback_script.sh")
-        with open(script_path, 'w') as f:
-            f.write(f'''#!/bin/bash
-echo $$ > {self.pid_file}
-echo "Neo AI Fallback Terminal"
-while true; do
-    sleep 1
-done
-''')
-        # Make executable
-        os.chmod(script_path, 0o755)
-
-        # Start a background process
-        subprocess.Popen(['bash', script_path],
-                       stdout=subprocess.DEVNULL,
-                       stderr=subprocess.DEVNULL,
-                       start_new_session=True)
-
-        # Wait a moment
-        time.sleep(1)
-        if os.path.exists(self.pid_file):
-            logging.info("Fallback terminal method initialized.")
-            self.terminal_initialized = True
+            self.terminal_unavailable = True
+
+    def _start_shell(self):
+        """
+        Start the shell with the backend.
+
+        Returns:
+            bool: True if the shell is ready for commands
+        """
+        self._write_script()
+        return self._wait_until_ready(self.backend.start(self.script_path))
+
+    def _wait_until_ready(self, launcher, timeout=10):
+        """
+        Wait for the shell to announce itself on the status FIFO.
+
+        Args:
+            launcher (subprocess.Popen): Process started by the backend
+            timeout (float): Maximum wait in seconds
+
+        Returns:
+            bool: True if the shell is ready for commands
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # Wakes up on the ready message, or every 0.1s to notice a launcher that failed
+            message = self._read_status(min(remaining, 0.1))
+            if message and message[0] == "ready":
+                return True
+            if message is None and launcher.poll() not in (None, 0):
+                return False
+
+    def _read_status(self, timeout):
+        """
+        Read the next message of the shell from the status FIFO.
+
+        Args:
+            timeout (float): Maximum wait in seconds
+
+        Returns:
+            list: Message fields, or None if no message arrived in time
+        """
+        deadline = time.monotonic() + timeout
+        while b"\n" not in self._status_buffer:
+            # What the shell writes to its terminal is drained meanwhile, see PtyBackend
+            readable, _, _ = select.select([self.status_fd, *self.backend.wait_fds()], [], [],
+                                           max(0.0, deadline - time.monotonic()))
+            if not readable:
+                return None
+            if self.status_fd in readable:
+                self._status_buffer += os.read(self.status_fd, 4096)
+            else:
+                self.backend.drain()
+        line, self._status_buffer = self._status_buffer.split(b"\n", 1)
+        return line.decode(errors="replace").split("\t")
+
+    def _send_command(self, command_id, command, cwd=None):
+        """
+        Send a command to the shell.
+
+        Args:
+            command_id (str): Id reported back with the completion
+            command (str): Command to execute
+            cwd (str): Directory to run it in, the shell's own when not given
+
+        Returns:
+            bool: False if no shell is reading the command FIFO
+        """
+        try:
+            # Fails with ENXIO instead of blocking when no shell has the FIFO open
+            fd = os.open(self.fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            return False
+        os.set_blocking(fd, True)
+        with os.fdopen(fd, "wb") as fifo:
+            fifo.write(f"{command_id}\0{cwd or ''}\0{command}\0".encode())
+        return True
 
     def _cleanup(self):
         """Clean up resources on exit."""
         try:
-            # Remove FIFO
-            if os.path.exists(self.fifo_path):
-                os.unlink(self.fifo_path)
+            # Remove FIFOs
+            for fifo in (self.fifo_path, self.status_fifo_path):
+                if os.path.exists(fifo):
+                    os.unlink(fifo)
+            if self.status_fd is not None:
+                os.close(self.status_fd)
+                self.status_fd = None
 
             # Terminal will auto-close when its script exits
             if os.path.exists(self.pid_file):
@@ -258,6 +480,7 @@ done
                 except Exception:
                     pass
                 os.unlink(self.pid_file)
+            self.backend.close()
         except Exception as e:
             logging.error(f"Error during cleanup: {e}")
 
@@ -271,157 +494,340 @@ done
         Returns:
             str: Path to the output file
         """
-        # Remove any existing lock file
-        if os.path.exists(self.lock_file):
-            os.unlink(self.lock_file)
+        with tracer.span("executor_dispatch"):
+            self._pending_id = None
+            self._process_group = None
+            self.last_completion = None
 
-        # Clear the output file
-        with open(self.output_file, 'w') as f:
-            f.write("")
+            # Clear the output file
+            with open(self.output_file, 'w') as f:
+                f.write("")
 
-        try:
-            # Make sure terminal is running - lazy initialization
-            if not self._is_terminal_running():
-                if not self.terminal_initialized:
-                    logging.info("First command detected, initializing terminal...")
-                    #print_formatted_text(HTML("<ansigreen>Initializing persistent terminal for command execution...</ansigreen>"))
-                    self.terminal_initialized = True
-                else:
-                    logging.info("Terminal not running, restarting...")
-
-                self._initialize_terminal()
-                # Give it a moment to start
-                time.sleep(2)
-
-                # Verify it's running after initialization
-                if not self._is_terminal_running():
-                    logging.error("Terminal failed to initialize properly. Using direct execution.")
-                    # Execute directly as fallback
-                    try:
-                        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-                        with open(self.output_file, 'w') as f:
-                            f.write(result.stdout + "\n" + result.stderr)
-                        # Create lock file to signal completion
-                        with open(self.lock_file, 'w') as f:
-                            pass
-                        return self.output_file
-                    except Exception as direct_exec_error:
-                        logging.error(f"Direct execution also failed: {direct_exec_error}")
-                        with open(self.output_file, 'w') as f:
-                            f.write(f"Error: {direct_exec_error}")
-                        with open(self.lock_file, 'w') as f:
-                            pass
-                        return self.output_file
-
-            logging.info(f"Sending command to persistent terminal: {command}")
-           # print_formatted_text(HTML(f"<ansiyellow>Executing in persistent terminal:</ansiyellow> <ansiblue>{command}</ansiblue>"))
-
-            # Send command to terminal via FIFO
-            with open(self.fifo_path, 'w') as f:
-                f.write(command)
-
-            # Return the output file path
-            return self.output_file
+            try:
+                # Make sure terminal is running - lazy initialization
+                if self.status_fd is not None and not self.terminal_unavailable \
+                        and not self._is_terminal_running():
+                    if not self.terminal_initialized:
+                        logging.info("First command detected, initializing terminal...")
+                        self.terminal_initialized = True
+                    else:
+                        logging.info("Terminal not running, restarting...")
+
+                    self._initialize_terminal()
+
+                command_id = str(next(self._command_ids))
+                if self.status_fd is not None and self._is_terminal_running() \
+                        and self._send_command(command_id, command, working_directory.get()):
+                    logging.info(f"Sent command {command_id} to persistent terminal: {command}")
+                    self._pending_id = command_id
+                    return self.output_file
+
+                logging.info("Persistent terminal unavailable. Using direct execution.")
+                output = run_command_direct(command)
 
-        except Exception as e:
-            logging.error(f"Error sending command to persistent terminal: {e}")
-            print_formatted_text(HTML(f"<ansired>Error: {e}</ansired>"))
+            except Exception as e:
+                logging.error(f"Error sending command to persistent terminal: {e}")
+                print_formatted_text(HTML(f"<ansired>Error: {e}</ansired>"))
+                output = f"Error executing command: {e}\n"
 
-            # Create error output
+            # Already done: wait_for_command_completion() only reads the output
             with open(self.output_file, "w") as f:
-                f.write(f"Error executing command: {e}\n")
-
-            # Create lock file to indicate completion
-            with open(self.lock_file, "w") as f:
-                pass
-
+                f.write(output)
             return self.output_file
 
-    def wait_for_command_completion(self):
+    @property
+    def command_pending(self):
+        """True while a command sent to the shell has not been reported done."""
+        return self._pending_id is not None
+
+    def state(self):
         """
-        Wait for the command to complete by checking for the lock file.
+        Directory and environment the last command ended with.
 
         Returns:
-            str: Command output
+            dict: 'cwd' and 'env' (dict), None before the first command
         """
-        max_wait_time = 180  # 3 minutes max wait
-        start_time = time.time()
-        animation_frames = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
-        frame_index = 0
+        try:
+            with open(self.state_file, "rb") as f:
+                fields = f.read().decode(errors="replace").split("\0")
+        except OSError:
+            return None
+        env = dict(item.split("=", 1) for item in fields[1:] if "=" in item)
+        return {"cwd": fields[0], "env": env}
+
+    def stream_output(self, timeout=None, capture=None):
+        """
+        Yield the output of the command sent to the terminal while it is written,
+        until the shell reports the command done.
 
-        #print_formatted_text(HTML("<ansicyan>Waiting for command to complete...</ansicyan>"))
+        The output file is followed from the last read position with bounded
+        reads, so each byte is read at most once however long the command
+        runs, and bytes the capture would drop are skipped without being read.
 
-        while not os.path.exists(self.lock_file):
-            elapsed_time = time.time() - start_time
+        The command's process group is stopped (SIGTERM, then SIGKILL) when it
+        runs past its timeout, when the command_cancelled event is set, or on
+        KeyboardInterrupt; the shell then reports it done and is free again.
 
-            if elapsed_time > max_wait_time:
-                print_formatted_text(HTML("<ansired>Command timed out after 3 minutes</ansired>"))
-                # Create an empty lock file to prevent further hangs
-                with open(self.lock_file, "w") as f:
-                    pass
+        Args:
+            timeout (float): Seconds the command may run, see resolve_timeout()
+            capture (OutputCapture): Receives the output, a default one when not given
+
+        Yields:
+            str: New output, empty when nothing was written for 0.1s, with a
+                 marker where bytes were skipped
+        """
+        timeout = resolve_timeout(timeout)
+        deadline = time.monotonic() + timeout
+        cancelled = command_cancelled.get()
+        stop_reason = None
+        capture = capture if capture is not None else OutputCapture()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            output = open(self.output_file, "rb")
+        except OSError:
+            message = "No output was captured. The command may have failed to execute properly."
+            capture.feed(message.encode())
+            yield message
+            return
+
+        with output:
+            try:
+                while self._pending_id is not None:
+                    if time.monotonic() > deadline:
+                        stop_reason = f"timed out after {timeout:g}s"
+                    elif cancelled is not None and cancelled.is_set():
+                        stop_reason = "was cancelled"
+                    if stop_reason:
+                        self._stop_command()
+                        break
+
+                    # Wakes up as soon as the shell reports completion, otherwise every 0.1s for new output
+                    if self._handle_status(self._read_status(0.1)):
+                        break
+                    yield self._read_new_output(output, decoder, capture)
+            except KeyboardInterrupt:
+                self._stop_command()
+                raise
+
+            # The rest of the output and the exit code line
+            with tracer.span("output_read"):
+                rest = self._read_new_output(output, decoder, capture) + decoder.decode(b"", final=True)
+            if stop_reason:
+                logging.warning(f"Command {stop_reason}, its process group was stopped")
+                notice = f"\nThe command {stop_reason} and was stopped.\n"
+                capture.feed(notice.encode())
+                rest += notice
+                if self.last_completion is not None:
+                    self.last_completion["stopped"] = stop_reason
+            if rest:
+                yield rest
+
+    def _handle_status(self, message):
+        """
+        Handle a message of the shell about the pending command.
+
+        Args:
+            message (list): Message fields from _read_status(), or None
+
+        Returns:
+            bool: True if the pending command is done
+        """
+        if not message or len(message) < 2 or message[1] != self._pending_id:
+            return False
+        if message[0] == "started" and len(message) == 3:
+            self._process_group = int(message[2])
+        elif message[0] == "done" and len(message) == 6:
+            self._pending_id = None
+            self._process_group = None
+            self.last_completion = {"exit_code": int(message[2]), "bytes": int(message[3]),
+                                    "cwd": message[4], "path": message[5], "stopped": None}
+            return True
+        return False
+
+    def _stop_command(self):
+        """
+        Stop the pending command: SIGTERM to its process group, then SIGKILL if
+        it is still running after the grace period. A command that cannot be
+        stopped is given up on.
+
+        Returns:
+            bool: True if the shell reported the command done
+        """
+        grace = _settings["kill_grace"]
+        for signum in (signal.SIGTERM, signal.SIGKILL):
+            if self._process_group is None:
                 break
+            try:
+                os.killpg(self._process_group, signum)
+            except ProcessLookupError:
+                pass
+            except OSError as e:
+                logging.error(f"Failed to stop command: {e}")
+                break
+            deadline = time.monotonic() + grace
+            while time.monotonic() < deadline:
+                if self._handle_status(self._read_status(deadline - time.monotonic())):
+                    return True
+        self._pending_id = None
+        self._process_group = None
+        return False
+
+    @staticmethod
+    def _read_new_output(output, decoder, capture):
+        """Read what was written to the output file since the last call."""
+        size = os.fstat(output.fileno()).st_size
+        position = output.tell()
+        text = ""
+        while position < size:
+            start = capture.next_read(position, size)
+            if start > position:
+                capture.skip(start - position)
+                output.seek(start)
+                decoder.reset()
+                text += f"\n[... {start - position} bytes of output omitted ...]\n"
+            data = output.read(min(READ_BLOCK_SIZE, size - start))
+            if not data:
+                break
+            capture.feed(data)
+            text += decoder.decode(data)
+            position = start + len(data)
+        return text
 
-            # Every 0.2 seconds, update the animation
-            if int(elapsed_time * 5) % len(animation_frames) != frame_index:
-                frame_index = int(elapsed_time * 5) % len(animation_frames)
-                print(f"\r{animation_frames[frame_index]} Waiting for command to complete... ({int(elapsed_time)}s)", end="")
+    def wait_for_command_completion(self, on_output=None, capture=None, timeout=None):
+        """
+        Wait for the shell to report the command done and return its output.
 
-            time.sleep(0.1)
+        Args:
+            on_output: Callable receiving each output chunk while the command
+                       runs; a spinner is shown instead when not given
+            capture (OutputCapture): Receives the output, a default one when not given
+            timeout (float): Seconds the command may run, see resolve_timeout()
+
+        Returns:
+            str: Command output, its middle dropped past the capture's cap
+        """
+        animation_frames = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
+        frame_index = 0
+        start_time = time.monotonic()
+        capture = capture if capture is not None else OutputCapture()
+
+        with tracer.span("command_runtime") as span:
+            for chunk in self.stream_output(timeout, capture):
+                if chunk:
+                    if on_output is not None:
+                        on_output(chunk)
+                elif on_output is None:
+                    # Every 0.2 seconds, update the animation
+                    elapsed_time = time.monotonic() - start_time
+                    if int(elapsed_time * 5) % len(animation_frames) != frame_index:
+                        frame_index = int(elapsed_time * 5) % len(animation_frames)
+                        print(f"\r{animation_frames[frame_index]} Waiting for command to complete... ({int(elapsed_time)}s)", end="")
+            if self.last_completion:
+                span.set(exit_code=self.last_completion["exit_code"], bytes=self.last_completion["bytes"])
 
         print()  # New line after waiting animation
+        return capture.text()
 
-        # Read the output file
+def _stop_process_group(process):
+    """
+    Stop a process started in its own session and everything it spawned:
+    SIGTERM to its process group, then SIGKILL after the grace period.
+
+    Args:
+        process (subprocess.Popen): Process started with start_new_session=True
+    """
+    for signum in (signal.SIGTERM, signal.SIGKILL):
         try:
-            if os.path.exists(self.output_file):
-                with open(self.output_file, "r") as f:
-                    return f.read()
-            else:
-                return "No output was captured. The command may have failed to execute properly."
-        except Exception as e:
-            return f"Error reading command output: {str(e)}"
+            os.killpg(process.pid, signum)
+        except ProcessLookupError:
+            pass
+        try:
+            process.wait(_settings["kill_grace"])
+            return
+        except subprocess.TimeoutExpired:
+            continue
+    process.wait()
 
-# Function for simple command execution (without terminal)
-def execute_command(command):
+def run_command_direct(command, timeout=None, capture=None):
     """
-    Execute a command and return its output.
+    Run a command in a subprocess, bypassing the persistent terminal.
+    The output has the same layout as the persistent terminal output:
+    stdout and stderr interleaved, followed by the exit code.
+
+    The command runs in its own process group, stopped as a whole when it runs
+    past its timeout, when the command_cancelled event is set, or on
+    KeyboardInterrupt.
 
     Args:
         command (str): Command to execute
+        timeout (float): Seconds the command may run, see resolve_timeout()
+        capture (OutputCapture): Receives the output, a default one when not given
 
     Returns:
-        str: Command output or error message
+        str: Command output, its middle dropped past the capture's cap
     """
+    capture = capture if capture is not None else OutputCapture()
+    timeout = resolve_timeout(timeout)
+    cancelled = command_cancelled.get()
+    stop_reason = None
     try:
-        # Log the command
-        logging.debug(f"Executing simple command: {command}")
+        logging.debug(f"Executing direct command: {command}")
+        # The output goes to a file, only its head and tail are read back
+        with tempfile.TemporaryFile() as output_file:
+            with tracer.span("command_runtime", direct=True):
+                process = subprocess.Popen(command, shell=True, executable=shutil.which("bash"),
+                                           stdin=subprocess.DEVNULL, stdout=output_file,
+                                           stderr=subprocess.STDOUT, cwd=working_directory.get(),
+                                           start_new_session=True)
+                deadline = time.monotonic() + timeout
+                try:
+                    while True:
+                        try:
+                            # Short waits so a cancellation is noticed quickly
+                            process.wait(min(0.1, max(0.0, deadline - time.monotonic())))
+                            break
+                        except subprocess.TimeoutExpired:
+                            if time.monotonic() >= deadline:
+                                stop_reason = f"timed out after {timeout:g}s"
+                            elif cancelled is not None and cancelled.is_set():
+                                stop_reason = "was cancelled"
+                            if stop_reason:
+                                _stop_process_group(process)
+                                break
+                except KeyboardInterrupt:
+                    _stop_process_group(process)
+                    raise
+            capture.read_file(output_file)
+        if stop_reason:
+            logging.warning(f"Command {stop_reason}, its process group was stopped")
+            capture.feed(f"\nThe command {stop_reason} and was stopped.\n".encode())
+        output = capture.text()
+        # Reported like the shell does: 128 + signal for a command killed by a signal
+        exit_code = process.returncode if process.returncode >= 0 else 128 - process.returncode
+    except Exception as e:
+        return f"Error executing command: {e}\n"
 
-        # Determine if command needs shell
-        needs_shell = any(char in command for char in ['|', '>', '<', '&', ';', '*', '`'])
+    separator = "-" * 51
+    return f"{output}\n{separator}\nCommand completed with exit code: {exit_code}\n"
 
-        # Execute the command
-        if needs_shell:
-            result = subprocess.run(command, capture_output=True, text=True, shell=True, timeout=30)
-        else:
-            args = shlex.split(command)
-            result = subprocess.run(args, capture_output=True, text=True, timeout=30)
+# Singleton created on the first command sent to the persistent terminal:
+# creating it makes the FIFO and registers the exit cleanup
+_terminal_executor = None
+_terminal_executor_lock = threading.Lock()
 
-        # Return the result
-        if result.returncode == 0:
-            return result.stdout
-        else:
-            return f"Error: Command failed with exit code {result.returncode}\n{result.stderr}"
-
-    except subprocess.TimeoutExpired:
-        return "Error: Command execution timed out after 30 seconds"
-    except FileNotFoundError:
-        return f"Error: Command not found: {command.split()[0]}"
-    except PermissionError:
-        return f"Error: Permission denied when executing: {command}"
-    except Exception as e:
-        return f"Error: {str(e)}"
+def get_terminal_executor():
+    """
+    Return the persistent terminal executor, creating it on first use.
 
-# Create a singleton instance
-terminal_executor = PersistentTerminalExecutor()
+    Returns:
+        PersistentTerminalExecutor: Shared executor
+    """
+    global _terminal_executor
+    if _terminal_executor is None:
+        with _terminal_executor_lock:
+            if _terminal_executor is None:
+                _terminal_executor = PersistentTerminalExecutor()
+    return _terminal_executor
 
 def execute_command_in_terminal(command):
     """
@@ -433,16 +839,19 @@ def execute_command_in_terminal(command):
     Returns:
         str: Path to the output file
     """
-    return terminal_executor.execute_command(command)
+    return get_terminal_executor().execute_command(command)
 
-def wait_for_command_completion(temp_file):
+def wait_for_command_completion(temp_file, on_output=None, capture=None, timeout=None):
     """
     Wait for a command to complete and read its output.
 
     Args:
         temp_file (str): Path to the output file
+        on_output: Callable receiving each output chunk while the command runs
+        capture (OutputCapture): Receives the output, a default one when not given
+        timeout (float): Seconds the command may run, see resolve_timeout()
 
     Returns:
         str: Command output
     """
-    return terminal_executor.wait_for_command_completion()
\ No newline at end of file
+    return get_terminal_executor().wait_for_command_completion(on_output, capture, timeout)
\ No newline at end of file
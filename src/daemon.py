@@ -0,0 +1,306 @@
+"""
+Long-running Neo AI daemon.
+Keeps a warm engine (imports, pooled connections, valid token) behind a Unix
+socket, so a thin client can ask questions without paying the startup cost.
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import asyncio
+import logging
+import itertools
+from collections import OrderedDict
+
+from src.ai_core import AsyncNeoAI
+from src.approval_handler import approval_policy
+from src.command_executor import direct_execution, working_directory
+from src.daemon_protocol import default_socket_path, encode, decode
+
+# Defaults used when the 'daemon' section is missing from config.yaml
+DEFAULT_DAEMON_CONFIG = {
+    "socket": "",               # Unix socket path, empty for $XDG_RUNTIME_DIR/neo.sock
+    "session_ttl": 3600,        # Conversations idle for longer are forgotten (seconds)
+    "max_sessions": 32,         # Least recently used conversations are dropped above this
+}
+
+
+class _Session:
+    """One conversation, usually one client terminal."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # One prompt at a time per conversation
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class _ClientStream:
+    """File-like sink sending streamed reply text to a client."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write(self, text):
+        if text:
+            self.connection.send("output", text=text)
+
+    def flush(self):
+        pass
+
+    async def drain(self):
+        """Wait until the client has read enough of the reply, awaited by the engine between deltas."""
+        await self.connection.drain()
+
+
+class _Connection:
+    """A connected client: sends messages and tracks its pending approvals."""
+
+    def __init__(self, writer, loop):
+        self.writer = writer
+        self.loop = loop
+        self.closed = False
+        self._approvals = {}
+        self._ids = itertools.count(1)
+
+    def send(self, message_type, **fields):
+        if not self.closed:
+            self.writer.write(encode(message_type, **fields))
+
+    async def drain(self):
+        """Wait while the socket buffer is above its high-water mark."""
+        if self.closed:
+            return
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            # The client is gone, its prompt is cancelled by _handle_client
+            pass
+
+    def ask_approval(self, command):
+        """Approval policy forwarding the request to the client (called from worker threads)."""
+        if self.closed:
+            return False
+        future = asyncio.run_coroutine_threadsafe(self._request_approval(command), self.loop)
+        return future.result()
+
+    async def _request_approval(self, command):
+        request_id = next(self._ids)
+        answer = self.loop.create_future()
+        self._approvals[request_id] = answer
+        self.send("approval_request", id=request_id, command=command)
+        try:
+            return await answer
+        finally:
+            self._approvals.pop(request_id, None)
+
+    def answer_approval(self, request_id, approved):
+        answer = self._approvals.get(request_id)
+        if answer is not None and not answer.done():
+            answer.set_result(bool(approved))
+
+    def close(self):
+        """Deny whatever is still waiting for this client."""
+        self.closed = True
+        for answer in list(self._approvals.values()):
+            if not answer.done():
+                answer.set_result(False)
+
+
+class NeoDaemon:
+    """
+    Neo AI served over a Unix socket.
+
+    A single engine is created and warmed up at startup. Each client session
+    gets its own conversation through AsyncNeoAI.new_session(), sharing the
+    engine's connections and token, and is kept between invocations so a
+    terminal can ask follow-up questions. Commands run directly in the
+    client's working directory, and approval requests are forwarded to the
+    client.
+    """
+
+    def __init__(self, config, socket_path=None):
+        """
+        Initialize the daemon.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            socket_path (str): Unix socket, from the 'daemon' section when not given
+        """
+        settings = dict(DEFAULT_DAEMON_CONFIG)
+        settings.update(config.get('daemon', {}) or {})
+
+        self.config = config
+        self.socket_path = os.path.expanduser(socket_path or settings["socket"] or default_socket_path())
+        self.session_ttl = settings["session_ttl"]
+        self.max_sessions = max(1, settings["max_sessions"])
+        self.engine = None
+        self.sessions = OrderedDict()
+        self.started = time.monotonic()
+        self._stopped = None
+
+    async def serve(self):
+        """Warm up, then serve clients until shutdown."""
+        self._stopped = asyncio.Event()
+        self._claim_socket()
+
+        self.engine = AsyncNeoAI(self.config)
+        try:
+            await self.engine.backend.prepare()
+        except Exception as e:
+            # Not fatal: the token is fetched again on the first request
+            logging.warning(f"Daemon warm-up failed: {e}")
+
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        finally:
+            os.umask(old_umask)
+
+        print(f"Neo daemon ready on {self.socket_path} ({time.monotonic() - self.started:.2f}s)",
+              file=sys.stderr)
+        try:
+            await self._stopped.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            await self.engine.aclose()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def stop(self):
+        """Stop serving."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def _claim_socket(self):
+        """Remove a stale socket, refuse to start if another daemon answers on it."""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A Neo daemon is already running on {self.socket_path}")
+
+    def _session(self, session_id):
+        """Get or create a conversation, dropping idle and least recently used ones."""
+        now = time.monotonic()
+        for key in [key for key, session in self.sessions.items()
+                    if now - session.last_used > self.session_ttl and not session.lock.locked()]:
+            del self.sessions[key]
+
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = _Session(self.engine.new_session())
+            self.sessions[session_id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        self.sessions.move_to_end(session_id)
+        session.last_used = now
+        return session
+
+    async def _handle_client(self, reader, writer):
+        connection = _Connection(writer, asyncio.get_running_loop())
+        query = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = decode(line)
+                if message is None:
+                    connection.send("error", message="Malformed message")
+                    continue
+
+                message_type = message.get("type")
+                if message_type == "query":
+                    if query is not None and not query.done():
+                        connection.send("error", message="A prompt is already running on this connection")
+                    else:
+                        query = asyncio.ensure_future(self._run_query(connection, message))
+                elif message_type == "approval":
+                    connection.answer_approval(message.get("id"), message.get("approved"))
+                elif message_type == "reset":
+                    self.sessions.pop(str(message.get("session")), None)
+                    connection.send("done", stop_reason="reset", notice=None)
+                elif message_type == "ping":
+                    connection.send("pong", sessions=len(self.sessions),
+                                    uptime=round(time.monotonic() - self.started, 1))
+                elif message_type == "shutdown":
+                    connection.send("done", stop_reason="shutdown", notice=None)
+                    self.stop()
+                else:
+                    connection.send("error", message=f"Unknown message type: {message_type}")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Client gone, or connection cancelled when the daemon shuts down
+            pass
+        finally:
+            # The client went away: deny its approvals and cancel its prompt
+            connection.close()
+            if query is not None and not query.done():
+                query.cancel()
+            writer.close()
+
+    async def _run_query(self, connection, message):
+        """Run a prompt for a client, in its own task so the context variables stay local."""
+        session = self._session(str(message.get("session", "default")))
+        async with session.lock:
+            engine = session.engine
+            approval_policy.set(connection.ask_approval)
+            # The persistent terminal window belongs to the daemon, not to the client
+            direct_execution.set(True)
+            cwd = message.get("cwd")
+            working_directory.set(cwd if cwd and os.path.isdir(cwd) else None)
+            engine.output = _ClientStream(connection)
+
+            try:
+                run = await engine.run(str(message.get("prompt", "")))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Daemon query failed: {e}")
+                connection.send("error", message=str(e))
+                return
+            finally:
+                engine.output = None
+                session.last_used = time.monotonic()
+
+            connection.send("done", stop_reason=run["stop_reason"],
+                            notice=engine.agent_loop.describe_stop(run["stop_reason"]))
+
+
+def run_daemon(config, socket_path=None):
+    """
+    Run the daemon in the foreground until SIGINT or SIGTERM.
+
+    Args:
+        config (dict): Full Neo AI configuration
+        socket_path (str): Unix socket, from the 'daemon' section when not given
+
+    Returns:
+        int: Process exit code
+    """
+    daemon = NeoDaemon(config, socket_path)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, daemon.stop)
+        await daemon.serve()
+
+    try:
+        asyncio.run(main())
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
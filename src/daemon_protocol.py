@@ -0,0 +1,70 @@
+"""
+Wire protocol between the Neo daemon and its clients.
+Standard library only, so the client starts without importing the Neo engine.
+
+Messages are JSON objects, one per line, with a 'type' field.
+
+Client to daemon:
+    query      {"prompt", "session", "cwd"}   Run a prompt in a conversation
+    approval   {"id", "approved"}             Answer an approval request
+    reset      {"session"}                    Forget a conversation
+    ping       {}                             Check the daemon is alive
+    shutdown   {}                             Stop the daemon
+
+Daemon to client:
+    output            {"text"}                     Streamed reply text
+    approval_request  {"id", "command"}            A command waits for approval
+    done              {"stop_reason", "notice"}    The prompt is answered
+    error             {"message"}                  The request failed
+    pong              {"sessions", "uptime"}       Answer to ping
+"""
+
+import os
+import json
+import tempfile
+
+
+def default_socket_path():
+    """
+    Socket used when none is configured: in the per-user runtime directory when
+    there is one, otherwise a per-user name in the temporary directory.
+
+    Returns:
+        str: Unix socket path
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "neo.sock")
+    return os.path.join(tempfile.gettempdir(), f"neo-{os.getuid()}.sock")
+
+
+def encode(message_type, **fields):
+    """
+    Serialize a message.
+
+    Args:
+        message_type (str): Message type
+        **fields: Message fields
+
+    Returns:
+        bytes: One JSON line
+    """
+    fields["type"] = message_type
+    return (json.dumps(fields, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def decode(line):
+    """
+    Parse a message line.
+
+    Args:
+        line (bytes): One JSON line
+
+    Returns:
+        dict: Message, or None if the line is not a JSON object
+    """
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
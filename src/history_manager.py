@@ -0,0 +1,230 @@
+"""
+Conversation history management for Neo AI.
+Keeps the history sent with every request within a per-model token budget.
+"""
+
+import re
+import logging
+from collections import deque
+from src.token_counter import TokenCounter, TOKENS_PER_MESSAGE
+
+# Defaults used when the 'history' section is missing from config.yaml
+DEFAULT_HISTORY_CONFIG = {
+    "token_budget": None,           # Budget for the history sent with each request, None for the prompt limit
+    "model_budgets": {},            # Per-model overrides, e.g. {"my-model": 4000}
+    "keep_recent": 6,               # Most recent messages always kept verbatim
+    "max_tool_output_chars": 1500,  # Size old command outputs are truncated to
+    "summarize": True,              # Replace dropped messages with a short summary
+}
+
+# Header of the follow-up messages carrying command output
+TOOL_RESULT_PATTERN = re.compile(r"The (\w+) command '(.*?)' was executed\. Here is the result:\n", re.DOTALL)
+
+SUMMARY_PREFIX = "[Summary of earlier conversation]"
+# Separates the context prefix from the summary appended to it
+SUMMARY_SEPARATOR = "\n\n" + SUMMARY_PREFIX + "\n"
+SUMMARY_MAX_LINES = 30
+ELISION_MARKER = "\n[... {count} characters of output elided ...]\n"
+ELISION_PATTERN = re.compile(r"\n\[\.\.\. \d+ characters of output elided \.\.\.\]\n")
+
+
+def format_tool_result(protocol, command, output):
+    """
+    Format the follow-up message for an executed MCP command.
+
+    Args:
+        protocol (str): Name of the protocol
+        command (str): Command that was executed
+        output (str): Command output
+
+    Returns:
+        str: Follow-up message
+    """
+    return f"The {protocol} command '{command}' was executed. Here is the result:\n{output}"
+
+
+class HistoryManager:
+    """
+    Compact the conversation history to fit a token budget.
+
+    The context prefix (system messages and the first message carrying the
+    <context> block) and the most recent messages are kept verbatim. Older
+    command outputs are truncated first; if that is not enough, the oldest
+    messages are dropped and optionally replaced by a short summary. The
+    summary is appended to the last message of the prefix rather than sent
+    as a message of its own, since strict chat templates reject two user
+    turns in a row and accept a system message only at the start.
+
+    The budget never exceeds the token counter's prompt limit, so a compacted
+    history also passes the preflight check before sending.
+    """
+
+    def __init__(self, config, model, token_counter=None):
+        """
+        Initialize the history manager.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            model (str): Model the history is sent to
+            token_counter (TokenCounter): Shared counter, created if not given
+        """
+        self.token_counter = token_counter or TokenCounter(config, model)
+
+        settings = dict(DEFAULT_HISTORY_CONFIG)
+        settings.update(config.get('history', {}) or {})
+
+        prompt_limit = self.token_counter.prompt_limit
+        budget = (settings["model_budgets"] or {}).get(model, settings["token_budget"])
+        self.token_budget = min(budget, prompt_limit) if budget else prompt_limit
+        # The latest message is the prompt being sent, it is never dropped
+        self.keep_recent = max(1, settings["keep_recent"])
+        self.max_tool_output_chars = settings["max_tool_output_chars"]
+        self.summarize = settings["summarize"]
+
+    def count_tokens(self, messages):
+        """
+        Count the number of tokens in a list of messages.
+
+        Args:
+            messages (list): Chat messages
+
+        Returns:
+            int: Token count
+        """
+        return self.token_counter.count_messages(messages)
+
+    def compact(self, history, token_budget=None, aggressive=False):
+        """
+        Compact the history in place so it fits the token budget.
+
+        Args:
+            history (list): Chat messages, modified in place
+            token_budget (int): Budget to use instead of the configured one
+            aggressive (bool): Also truncate command outputs in the recent messages
+
+        Returns:
+            bool: True if the history was modified
+        """
+        budget = token_budget if token_budget is not None else self.token_budget
+        if self.count_tokens(history) <= budget:
+            return False
+
+        prefix_end = self._prefix_length(history)
+        recent_start = max(prefix_end, len(history) - self.keep_recent)
+
+        # First pass: truncate old command outputs
+        truncate_end = len(history) if aggressive else recent_start
+        for index in range(prefix_end, truncate_end):
+            history[index] = self._truncate_tool_output(history[index])
+
+        if self.count_tokens(history) > budget:
+            # Second pass: drop the oldest messages between the prefix and the recent turns
+            summary = deque(maxlen=SUMMARY_MAX_LINES)
+            if self.summarize:
+                summary.extend(self._take_summary(history, prefix_end))
+            # Running counts: each dropped message is subtracted, each summary line counted once
+            total = self.count_tokens(history)
+            line_tokens = deque((self.token_counter.count_text(line) for line in summary), maxlen=SUMMARY_MAX_LINES)
+            end = prefix_end
+            while end < recent_start and (total + self._summary_tokens(line_tokens, prefix_end) > budget
+                                          or end > prefix_end and self._repeats_role(history, prefix_end, end)):
+                total -= self.token_counter.count_message(history[end])
+                if self.summarize:
+                    # Keep the summary itself bounded, the most recent entries matter most
+                    for line in self._summary_lines(history[end]):
+                        summary.append(line)
+                        line_tokens.append(self.token_counter.count_text(line))
+                end += 1
+            del history[prefix_end:end]
+
+            if summary:
+                self._attach_summary(history, prefix_end, summary)
+
+            logging.info(f"History compacted: dropped {end - prefix_end} old messages.")
+
+        if self.count_tokens(history) > budget:
+            logging.warning("History still exceeds the token budget after compaction.")
+
+        return True
+
+    def _summary_tokens(self, line_tokens, prefix_end):
+        """Tokens the summary adds to the history, a message of its own without a prefix."""
+        if not line_tokens:
+            return 0
+        tokens = self.token_counter.count_text(SUMMARY_SEPARATOR) + sum(line_tokens)
+        return tokens if prefix_end else tokens + TOKENS_PER_MESSAGE
+
+    def _repeats_role(self, history, prefix_end, end):
+        """Whether the first kept message follows one of its own role, e.g. two user turns in a row."""
+        previous = history[prefix_end - 1]["role"] if prefix_end else ("user" if self.summarize else None)
+        return history[end]["role"] == previous
+
+    def _take_summary(self, history, prefix_end):
+        """Remove the summary of an earlier compaction from the prefix and return its lines."""
+        if not prefix_end:
+            return []
+        message = history[prefix_end - 1]
+        content, separator, summary = message["content"].rpartition(SUMMARY_SEPARATOR)
+        if not separator:
+            return []
+        history[prefix_end - 1] = {"role": message["role"], "content": content}
+        return summary.splitlines()
+
+    def _attach_summary(self, history, prefix_end, lines):
+        """Append the summary to the last message of the prefix, or insert it first without a prefix."""
+        summary = "\n".join(lines)
+        if prefix_end:
+            message = history[prefix_end - 1]
+            history[prefix_end - 1] = {"role": message["role"],
+                                       "content": message["content"] + SUMMARY_SEPARATOR + summary}
+        else:
+            history.insert(0, {"role": "user", "content": SUMMARY_PREFIX + "\n" + summary})
+
+    def _prefix_length(self, history):
+        """Number of leading messages that must be kept verbatim."""
+        index = 0
+        while index < len(history) and history[index]["role"] == "system":
+            index += 1
+        if index < len(history) and "<context>" in history[index]["content"] \
+                and not history[index]["content"].startswith(SUMMARY_PREFIX):
+            index += 1
+        return index
+
+    def _truncate_tool_output(self, message):
+        """Return the message with each command output cut to its head and tail."""
+        content = message["content"]
+        headers = list(TOOL_RESULT_PATTERN.finditer(content))
+        if message["role"] != "user" or not headers:
+            return message
+
+        limit = self.max_tool_output_chars
+        parts = [content[:headers[0].start()]]
+        changed = False
+
+        for number, header in enumerate(headers):
+            end = headers[number + 1].start() if number + 1 < len(headers) else len(content)
+            output = content[header.end():end]
+            if len(output) > limit and not ELISION_PATTERN.search(output):
+                half = limit // 2
+                output = output[:half] + ELISION_MARKER.format(count=len(output) - limit) + output[-half:]
+                changed = True
+            parts.append(header.group(0) + output)
+
+        if not changed:
+            return message
+        return {"role": message["role"], "content": "".join(parts)}
+
+    def _summary_lines(self, message):
+        """Build the extractive summary lines of a dropped message."""
+        content = message["content"]
+        if content.startswith(SUMMARY_PREFIX):
+            # Fold a previous summary into the new one
+            return content[len(SUMMARY_PREFIX):].strip().splitlines()
+
+        headers = TOOL_RESULT_PATTERN.findall(content) if message["role"] == "user" else []
+        if headers:
+            return [f"- Ran {protocol} command: {command[:100]}" for protocol, command in headers]
+
+        first_line = content.strip().split("\n", 1)[0][:100]
+        speaker = "User" if message["role"] == "user" else "Neo"
+        return [f"- {speaker}: {first_line}"]
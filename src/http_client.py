@@ -0,0 +1,139 @@
+"""
+Shared HTTP client for Neo AI.
+Builds long-lived, pooled keep-alive httpx clients from the configuration.
+httpx is imported when the first client is built, not at import time.
+"""
+
+import logging
+import threading
+import importlib.util
+
+# Defaults used when the 'http' section is missing from config.yaml
+DEFAULT_HTTP_CONFIG = {
+    "timeout": 30.0,                    # Read/write timeout in seconds
+    "connect_timeout": 10.0,            # TCP/TLS connect timeout in seconds
+    "max_connections": 10,              # Upper bound of open connections
+    "max_keepalive_connections": 5,     # Idle connections kept in the pool
+    "keepalive_expiry": 120.0,          # Seconds an idle connection is kept
+    "http2": False,                     # Requires the optional 'h2' package
+}
+
+
+def load_http_config(config):
+    """
+    Merge the user's 'http' configuration section with the defaults.
+
+    Args:
+        config (dict): Full Neo AI configuration
+
+    Returns:
+        dict: HTTP client settings
+    """
+    settings = dict(DEFAULT_HTTP_CONFIG)
+    settings.update(config.get('http', {}) or {})
+    return settings
+
+
+def http2_available():
+    """Check whether the optional HTTP/2 dependency is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _client_options(config):
+    """Build the keyword arguments shared by the sync and async clients."""
+    import httpx
+    settings = load_http_config(config)
+
+    use_http2 = bool(settings["http2"])
+    if use_http2 and not http2_available():
+        logging.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1.")
+        use_http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+    timeout = httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"])
+
+    return {"limits": limits, "timeout": timeout, "http2": use_http2, "trust_env": False}
+
+
+def create_http_client(config):
+    """
+    Create a pooled HTTP client for blocking requests such as token refresh.
+
+    Proxy environment variables are ignored (trust_env=False), matching the
+    behaviour of the previous per-request calls.
+
+    Args:
+        config (dict): Full Neo AI configuration
+
+    Returns:
+        httpx.Client: Configured client
+    """
+    import httpx
+    return httpx.Client(**_client_options(config))
+
+
+def create_async_http_client(config):
+    """
+    Create a pooled asyncio HTTP client for the streaming chat requests.
+
+    Uses the same 'http' settings as create_http_client.
+
+    Args:
+        config (dict): Full Neo AI configuration
+
+    Returns:
+        httpx.AsyncClient: Configured client
+    """
+    import httpx
+    return httpx.AsyncClient(**_client_options(config))
+
+
+class LazyHTTPClient:
+    """
+    HTTP client built on first use.
+
+    Stands in for the client returned by a factory such as
+    create_async_http_client: attribute access builds the client once and
+    forwards to it, so an engine that never sends a request never imports
+    httpx or loads the TLS certificates. Closing a client that was never
+    built does nothing.
+    """
+
+    def __init__(self, factory, config):
+        """
+        Initialize the placeholder.
+
+        Args:
+            factory: create_http_client or create_async_http_client
+            config (dict): Full Neo AI configuration
+        """
+        self._factory = factory
+        self._config = config
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The underlying client, built on first access."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory(self._config)
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def close(self):
+        """Close the sync client if it was built."""
+        if self._client is not None:
+            self._client.close()
+
+    async def aclose(self):
+        """Close the async client if it was built."""
+        if self._client is not None:
+            await self._client.aclose()
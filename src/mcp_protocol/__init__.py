@@ -6,6 +6,8 @@ This module initializes the MCP protocol framework.
 import logging
 from .core import MCPProtocol
 from .registry import ProtocolRegistry
+from .stream_parser import MCPStreamParser
+from .batch import MCPBatch
 
 # Import only the required protocol handlers
 from .handlers import (
@@ -16,8 +18,6 @@ from .handlers import (
     security_protocol
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("mcp_protocol")
 
 # Create the global MCP protocol instance
@@ -43,4 +43,4 @@ def register_all_protocols():
 register_all_protocols()
 
 # Export the MCP instance
-__all__ = ['mcp']
\ No newline at end of file
+__all__ = ['mcp', 'MCPStreamParser', 'MCPBatch']
\ No newline at end of file
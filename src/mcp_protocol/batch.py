@@ -0,0 +1,160 @@
+"""
+Concurrent execution of the MCP tags of one response.
+Read-only tags run side by side on a bounded worker pool, any other tag runs alone.
+"""
+
+import logging
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Tuple
+
+from src.approval_handler import ApprovalHandler, approval_policy, POLICY_READ_ONLY
+from src.command_executor import direct_execution, command_timeout, command_cancelled, protocol_timeout
+from src.tracing import tracer
+
+logger = logging.getLogger("mcp_protocol")
+
+DEFAULT_MAX_PARALLEL_TAGS = 4
+
+
+class MCPBatch:
+    """
+    The MCP tags of one response, executed as they are added.
+
+    Approvals are requested one at a time, in order of appearance, on a single
+    coordinator thread. An approved read-only tag is handed to the worker pool
+    right away, so the next approval can be collected while it runs. Any other
+    tag is a barrier: it waits for every earlier tag to finish, then asks its
+    approval and runs alone. Results keep the order of the tags. An interrupted
+    approval (Ctrl+C) cancels the batch and raises the interrupt to whoever
+    waits for the tag's result.
+    """
+
+    def __init__(self, protocol, require_approval: bool = True, auto_approve: bool = False,
+                 max_workers: int = DEFAULT_MAX_PARALLEL_TAGS):
+        """
+        Initialize the batch.
+
+        Args:
+            protocol: MCPProtocol whose handlers execute the tags
+            require_approval: Whether commands require user approval
+            auto_approve: Whether to auto-approve all commands
+            max_workers: Maximum number of read-only tags running at once
+        """
+        self.protocol = protocol
+        self.require_approval = require_approval
+        self.auto_approve = auto_approve
+        self._coordinator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-coordinator")
+        self._workers = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="mcp-worker")
+        self._tags = []
+        # Read-only tags handed to the pool since the last barrier (coordinator thread only)
+        self._running = []
+        self._cancelled = False
+        # Set by cancel() to stop the commands of the running tags
+        self._stop = threading.Event()
+
+    def add(self, protocol: str, content: str) -> Future:
+        """
+        Schedule a tag after the ones already added.
+
+        Args:
+            protocol: Name of the protocol
+            content: Command content of the tag
+
+        Returns:
+            Future resolving to the result dictionary of the tag
+        """
+        result = Future()
+        self._tags.append((protocol, result))
+        # Run with the caller's context variables, e.g. an approval policy
+        context = contextvars.copy_context()
+        context.run(command_cancelled.set, self._stop)
+        self._coordinator.submit(context.run, self._dispatch, protocol, content, result)
+        return result
+
+    def results(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Wait for all tags.
+
+        Returns:
+            Ordered list of (protocol, result) tuples, without cancelled tags
+        """
+        ordered = []
+        for protocol, future in self._tags:
+            if not future.cancelled():
+                ordered.append((protocol, future.result()))
+        return ordered
+
+    def cancel(self):
+        """Cancel the tags that have not started yet and stop the commands of the running ones."""
+        self._cancelled = True
+        self._stop.set()
+        for _, future in self._tags:
+            future.cancel()
+
+    def close(self):
+        """Release the threads once the running tags are done."""
+        self._coordinator.shutdown(wait=False)
+        self._workers.shutdown(wait=False)
+
+    def _dispatch(self, protocol: str, content: str, result: Future):
+        """Approve and start one tag (coordinator thread)."""
+        if self._cancelled:
+            # Added after the batch was cancelled, e.g. by an interrupted approval
+            result.cancel()
+        if not result.set_running_or_notify_cancel():
+            return
+
+        try:
+            registry = self.protocol.registry
+            handler = registry.get_handler(protocol) if registry.has_handler(protocol) else None
+
+            if handler is not None and handler.is_read_only(content):
+                if not self._approve(handler, content):
+                    result.set_result(handler.denied_result(content))
+                    return
+                context = contextvars.copy_context()
+                self._running.append(self._workers.submit(context.run, self._execute, handler, content, result))
+            else:
+                # Barrier: side effects must not overlap with the earlier tags
+                wait(self._running)
+                self._running = []
+                result.set_result(
+                    self.protocol.execute_tag(protocol, content, self.require_approval, self.auto_approve)
+                )
+
+        except Exception as e:
+            logger.error(f"Error executing {protocol} tag: {e}")
+            result.set_result({"error": str(e)})
+        except BaseException as e:
+            # E.g. Ctrl+C at the approval prompt: drop the remaining tags and hand
+            # the interrupt to whoever waits for the results
+            self.cancel()
+            result.set_exception(e)
+
+    def _approve(self, handler, content: str) -> bool:
+        """Ask approval for a read-only tag before it is handed to the pool."""
+        description = handler.describe(content)
+        if description is None or approval_policy.get() == POLICY_READ_ONLY:
+            return True
+
+        approval_handler = ApprovalHandler(self.require_approval, self.auto_approve)
+        approved, _ = approval_handler.request_approval(description)
+        return approved
+
+    def _execute(self, handler, content: str, result: Future):
+        """Run an approved read-only tag (worker thread)."""
+        # Bypass the persistent terminal, which runs a single command at a time
+        direct_execution.set(True)
+        command_timeout.set(protocol_timeout(handler.name, handler.timeout))
+        try:
+            with tracer.span("tag_execute", protocol=handler.name, parallel=True):
+                output = handler.handle(content, False, True)
+            result.set_result(output)
+        except Exception as e:
+            logger.error(f"Error executing {handler.name} tag: {e}")
+            result.set_result({"error": str(e)})
+        except BaseException as e:
+            self.cancel()
+            result.set_exception(e)
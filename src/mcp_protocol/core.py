@@ -3,10 +3,13 @@ Core implementation of the Machine Communication Protocol (MCP).
 This module provides the main protocol parser and executor.
 """
 
-import re
 import logging
 from typing import List, Tuple, Dict, Any, Optional
 from .registry import ProtocolRegistry
+from .stream_parser import MCPStreamParser
+from .batch import MCPBatch, DEFAULT_MAX_PARALLEL_TAGS
+from src.command_executor import command_timeout, protocol_timeout
+from src.tracing import tracer
 
 logger = logging.getLogger("mcp_protocol")
 
@@ -22,18 +25,35 @@ class MCPProtocol:
         # Registry for protocol handlers
         self.registry = ProtocolRegistry()
 
-        # Main pattern for extracting MCP tags
-        self.mcp_pattern = re.compile(r'<mcp:(\w+)>(.*?)</mcp:\1>', re.DOTALL)
+    def create_stream_parser(self) -> MCPStreamParser:
+        """
+        Create an incremental parser for a response that is still streaming.
+
+        Returns:
+            A new MCPStreamParser
+        """
+        return MCPStreamParser()
+
+    def create_batch(self, require_approval: bool = True,
+                     auto_approve: bool = False,
+                     max_workers: int = DEFAULT_MAX_PARALLEL_TAGS) -> MCPBatch:
+        """
+        Create a batch executing the tags of one response.
+
+        Args:
+            require_approval: Whether commands require user approval
+            auto_approve: Whether to auto-approve all commands
+            max_workers: Maximum number of read-only tags running at once
 
-        # Legacy patterns for backward compatibility
-        self.legacy_patterns = [
-            re.compile(r'<system>(.*?)</system>', re.DOTALL),
-            re.compile(r'<s>(.*?)</s>', re.DOTALL)
-        ]
+        Returns:
+            A new MCPBatch
+        """
+        return MCPBatch(self, require_approval, auto_approve, max_workers)
 
     def parse_mcp_tags(self, text: str) -> List[Tuple[str, str]]:
         """
         Parse all MCP protocol tags in the provided text.
+        MCP tags and legacy <system>/<s> tags are found in a single pass.
 
         Args:
             text: The text to parse for MCP tags
@@ -41,27 +61,51 @@ class MCPProtocol:
         Returns:
             List of tuples containing (protocol_name, command_content)
         """
-        mcp_tags = []
+        with tracer.span("tag_parse", chars=len(text)):
+            parser = self.create_stream_parser()
+            return parser.feed(text) + parser.finish()
 
-        # Extract MCP tags
-        mcp_matches = self.mcp_pattern.findall(text)
-        for protocol, content in mcp_matches:
-            mcp_tags.append((protocol.lower(), content.strip()))
+    def execute_tag(self, protocol: str, content: str,
+                    require_approval: bool = True,
+                    auto_approve: bool = False) -> Dict[str, Any]:
+        """
+        Execute a single MCP tag with its protocol handler.
 
-        # Extract legacy tags (for backward compatibility)
-        for pattern in self.legacy_patterns:
-            legacy_matches = pattern.findall(text)
-            for content in legacy_matches:
-                # Map legacy tags to the terminal protocol
-                mcp_tags.append(("terminal", content.strip()))
+        Args:
+            protocol: Name of the protocol
+            content: Command content of the tag
+            require_approval: Whether commands require user approval
+            auto_approve: Whether to auto-approve all commands
 
-        return mcp_tags
+        Returns:
+            Dictionary with the execution result
+        """
+        logger.debug(f"Processing {protocol} protocol with content: {content[:50]}...")
+
+        if not self.registry.has_handler(protocol):
+            logger.warning(f"Unknown protocol '{protocol}'. Ignoring command: {content}")
+            return {"error": f"Unknown protocol '{protocol}'"}
+
+        # Get the handler for this protocol
+        handler = self.registry.get_handler(protocol)
+
+        # Execute the handler with the content, its commands bounded by the protocol's timeout
+        token = command_timeout.set(protocol_timeout(protocol, handler.timeout))
+        try:
+            with tracer.span("tag_execute", protocol=protocol):
+                result = handler.handle(content, require_approval, auto_approve)
+        finally:
+            command_timeout.reset(token)
+
+        logger.debug(f"Protocol {protocol} execution completed")
+        return result
 
     def process_response(self, response: str,
                          require_approval: bool = True,
-                         auto_approve: bool = False) -> Dict[str, Any]:
+                         auto_approve: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
         """
         Process a response text containing MCP tags.
+        Independent read-only tags run concurrently, see MCPBatch.
 
         Args:
             response: Text containing MCP protocol tags
@@ -69,34 +113,26 @@ class MCPProtocol:
             auto_approve: Whether to auto-approve all commands
 
         Returns:
-            Dictionary with execution results for each protocol
+            Ordered list of (protocol, result) tuples, one per tag
         """
-        results = {}
+        results = []
+        batch = self.create_batch(require_approval, auto_approve)
 
         try:
             # Extract all MCP tags
-            mcp_tags = self.parse_mcp_tags(response)
-
-            for protocol, content in mcp_tags:
-                logger.debug(f"Processing {protocol} protocol with content: {content[:50]}...")
+            for protocol, content in self.parse_mcp_tags(response):
+                batch.add(protocol, content)
 
-                if self.registry.has_handler(protocol):
-                    # Get the handler for this protocol
-                    handler = self.registry.get_handler(protocol)
-
-                    # Execute the handler with the content
-                    result = handler.handle(content, require_approval, auto_approve)
-                    results[protocol] = result
-
-                    logger.debug(f"Protocol {protocol} execution completed")
-                else:
-                    logger.warning(f"Unknown protocol '{protocol}'. Ignoring command: {content}")
-                    results[protocol] = {"error": f"Unknown protocol '{protocol}'"}
+            results = batch.results()
 
         except Exception as e:
             logger.error(f"Error processing MCP tags: {str(e)}")
             import traceback
             logger.debug(traceback.format_exc())
-            results["error"] = str(e)
+            batch.cancel()
+            results.append(("error", {"error": str(e)}))
+
+        finally:
+            batch.close()
 
-        return results
\ No newline at end of file
+        return results
@@ -4,7 +4,7 @@ This protocol handles comprehensive system analysis operations in one command.
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..registry import ProtocolHandler
 import sys
 import os
@@ -18,6 +18,30 @@ from .terminal_protocol import handler as terminal_handler
 
 logger = logging.getLogger("mcp_protocol.analyze")
 
+# Comprehensive system analysis command
+ANALYSIS_COMMAND = (
+    "echo '===== SYSTEM OVERVIEW ====='\n"
+    "echo '• System:' && uname -a\n"
+    "echo '• Kernel:' && uname -r\n"
+    "echo '• Hostname:' && hostname\n"
+    "echo '• Current User:' && whoami\n"
+    "echo '• Uptime:' && uptime\n"
+    "echo\n"
+    "echo '===== RESOURCES ====='\n"
+    "echo '• Memory:' && free -h\n"
+    "echo '• Disk:' && df -h\n"
+    "echo '• CPU Load:' && top -bn1 | head -3\n"
+    "echo '• Top CPU Processes:' && ps aux --sort=-%cpu | head -5\n"
+    "echo '• Top Memory Processes:' && ps aux --sort=-%mem | head -5\n"
+    "echo\n"
+    "echo '===== NETWORK ====='\n"
+    "echo '• Network Interfaces:' && ip -br addr 2>/dev/null || ifconfig\n"
+    "echo '• Listening Ports:' && ss -tuln 2>/dev/null || netstat -tuln | head -10\n"
+    "echo\n"
+    "echo '===== SERVICES ====='\n"
+    "echo '• Running Services:' && systemctl list-units --type=service --state=running 2>/dev/null | head -5 || service --status-all 2>/dev/null | grep ' + ' | head -5\n"
+)
+
 
 class AnalyzeProtocolHandler(ProtocolHandler):
     """Handler for analyze protocol commands."""
@@ -26,6 +50,14 @@ class AnalyzeProtocolHandler(ProtocolHandler):
         """Initialize the analyze protocol handler."""
         super().__init__("analyze")
 
+    def is_read_only(self, content: str) -> bool:
+        """The analysis only reads system state."""
+        return True
+
+    def describe(self, content: str) -> Optional[str]:
+        """Show the analysis command that will run."""
+        return ANALYSIS_COMMAND
+
     def handle(self, command: str, require_approval: bool, auto_approve: bool) -> Dict[str, Any]:
         """
         Handle analyze protocol commands - always performs a full system analysis.
@@ -47,33 +79,9 @@ class AnalyzeProtocolHandler(ProtocolHandler):
         try:
             logger.debug("Processing full system analysis command")
 
-            # Build a comprehensive system analysis command
-            analysis_command = (
-                "echo '===== SYSTEM OVERVIEW ====='\n"
-                "echo '• System:' && uname -a\n"
-                "echo '• Kernel:' && uname -r\n"
-                "echo '• Hostname:' && hostname\n"
-                "echo '• Current User:' && whoami\n"
-                "echo '• Uptime:' && uptime\n"
-                "echo\n"
-                "echo '===== RESOURCES ====='\n"
-                "echo '• Memory:' && free -h\n"
-                "echo '• Disk:' && df -h\n"
-                "echo '• CPU Load:' && top -bn1 | head -3\n"
-                "echo '• Top CPU Processes:' && ps aux --sort=-%cpu | head -5\n"
-                "echo '• Top Memory Processes:' && ps aux --sort=-%mem | head -5\n"
-                "echo\n"
-                "echo '===== NETWORK ====='\n"
-                "echo '• Network Interfaces:' && ip -br addr 2>/dev/null || ifconfig\n"
-                "echo '• Listening Ports:' && ss -tuln 2>/dev/null || netstat -tuln | head -10\n"
-                "echo\n"
-                "echo '===== SERVICES ====='\n"
-                "echo '• Running Services:' && systemctl list-units --type=service --state=running 2>/dev/null | head -5 || service --status-all 2>/dev/null | grep ' + ' | head -5\n"
-            )
-
             # Execute the analysis command using terminal protocol
             terminal_result = terminal_handler.handle(
-                analysis_command, require_approval, auto_approve
+                ANALYSIS_COMMAND, require_approval, auto_approve
             )
 
             terminal_result["analysis_type"] = "full"
@@ -5,7 +5,7 @@ This protocol handles file operations.
 
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..registry import ProtocolHandler
 import sys
 
@@ -25,6 +25,26 @@ class FilesProtocolHandler(ProtocolHandler):
         """Initialize the files protocol handler."""
         super().__init__("files")
 
+    def is_read_only(self, content: str) -> bool:
+        """Reading and listing are read-only, writing and appending are not."""
+        return content.startswith(("read:", "list:"))
+
+    def describe(self, content: str) -> Optional[str]:
+        """Reading asks approval, listing a directory does not."""
+        if content.startswith("read:"):
+            return f"Read file: {content[5:].strip()}"
+        if content.startswith("list:"):
+            return None
+        return content
+
+    def denied_result(self, content: str) -> Dict[str, Any]:
+        """Result of a denied file operation."""
+        return {
+            "command": content,
+            "executed": False,
+            "output": "File reading was denied." if content.startswith("read:") else "File operation was denied."
+        }
+
     def handle(self, command: str, require_approval: bool, auto_approve: bool) -> Dict[str, Any]:
         """
         Handle files protocol commands (read/write files).
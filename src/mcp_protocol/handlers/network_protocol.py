@@ -5,7 +5,7 @@ This protocol handles network operations.
 
 import logging
 import shlex
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from ..registry import ProtocolHandler
 import sys
 import os
@@ -22,6 +22,9 @@ logger = logging.getLogger("mcp_protocol.network")
 class NetworkProtocolHandler(ProtocolHandler):
     """Handler for network protocol commands."""
 
+    # Probes such as traceroute or iftop can hang on an unreachable network
+    timeout = 120
+
     def __init__(self):
         """Initialize the network protocol handler."""
         super().__init__("network")
@@ -43,6 +46,44 @@ class NetworkProtocolHandler(ProtocolHandler):
             "listening": "lsof -i -P -n | grep LISTEN || netstat -tuln | grep LISTEN || ss -tuln | grep LISTEN"
         }
 
+        # Commands taking a target, e.g. ping:example.com
+        self.special_commands = {
+            "ping": "ping -c 4 {target}",
+            "trace": "traceroute {target} 2>/dev/null || tracepath {target}",
+            "scan": "nmap -F {target} 2>/dev/null",
+            "lookup": "host {target} || nslookup {target} || dig {target}",
+            "whois": "whois {target} 2>/dev/null || echo 'whois command not installed'"
+        }
+
+    def resolve_command(self, command: str) -> Optional[Tuple[str, str]]:
+        """
+        Translate a network command into the shell command that implements it.
+
+        Args:
+            command: The network command
+
+        Returns:
+            Tuple of (shell command, operation name), or None for an unknown command
+        """
+        for operation, template in self.special_commands.items():
+            if command.startswith(operation + ":"):
+                target = shlex.quote(command[len(operation) + 1:].strip())
+                return template.format(target=target), operation
+
+        if command in self.network_commands:
+            return self.network_commands[command], command
+
+        return None
+
+    def is_read_only(self, content: str) -> bool:
+        """Local lookups are read-only; commands taking a target, such as scan:, probe other hosts."""
+        return content in self.network_commands
+
+    def describe(self, content: str) -> Optional[str]:
+        """Show the underlying shell command; unknown commands run nothing."""
+        resolved = self.resolve_command(content)
+        return resolved[0] if resolved else None
+
     def handle(self, command: str, require_approval: bool, auto_approve: bool) -> Dict[str, Any]:
         """
         Handle network protocol commands (network operations).
@@ -62,69 +103,15 @@ class NetworkProtocolHandler(ProtocolHandler):
         }
 
         try:
-            # Handle special commands
-            if command.startswith("ping:"):
-                logger.debug(f"Processing network ping command: {command}")
-                host = command[5:].strip()
-                host = shlex.quote(host)
-                terminal_result = terminal_handler.handle(
-                    f"ping -c 4 {host}", require_approval, auto_approve
-                )
-                terminal_result["network_operation"] = "ping"
-                return terminal_result
-
-            elif command.startswith("trace:"):
-                logger.debug(f"Processing network trace command: {command}")
-                host = command[6:].strip()
-                host = shlex.quote(host)
-                terminal_result = terminal_handler.handle(
-                    f"traceroute {host} 2>/dev/null || tracepath {host}",
-                    require_approval, auto_approve
-                )
-                terminal_result["network_operation"] = "trace"
-                return terminal_result
-
-            elif command.startswith("scan:"):
-                logger.debug(f"Processing network scan command: {command}")
-                target = command[5:].strip()
-                target = shlex.quote(target)
-                terminal_result = terminal_handler.handle(
-                    f"nmap -F {target} 2>/dev/null",
-                    require_approval, auto_approve
-                )
-                terminal_result["network_operation"] = "scan"
-                return terminal_result
-
-            elif command.startswith("lookup:"):
-                logger.debug(f"Processing network lookup command: {command}")
-                host = command[7:].strip()
-                host = shlex.quote(host)
-                terminal_result = terminal_handler.handle(
-                    f"host {host} || nslookup {host} || dig {host}",
-                    require_approval, auto_approve
-                )
-                terminal_result["network_operation"] = "lookup"
-                return terminal_result
-
-            elif command.startswith("whois:"):
-                logger.debug(f"Processing network whois command: {command}")
-                domain = command[6:].strip()
-                domain = shlex.quote(domain)
-                terminal_result = terminal_handler.handle(
-                    f"whois {domain} 2>/dev/null || echo 'whois command not installed'",
-                    require_approval, auto_approve
-                )
-                terminal_result["network_operation"] = "whois"
-                return terminal_result
+            resolved = self.resolve_command(command)
 
-            # Handle standard commands
-            elif command in self.network_commands:
-                logger.debug(f"Processing network command: {command}")
-                network_command = self.network_commands[command]
+            if resolved:
+                network_command, operation = resolved
+                logger.debug(f"Processing network {operation} command: {command}")
                 terminal_result = terminal_handler.handle(
                     network_command, require_approval, auto_approve
                 )
-                terminal_result["network_operation"] = command
+                terminal_result["network_operation"] = operation
                 return terminal_result
 
             else:
@@ -4,7 +4,7 @@ This protocol handles security-related operations.
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from ..registry import ProtocolHandler
 import sys
 import os
@@ -47,6 +47,45 @@ class SecurityProtocolHandler(ProtocolHandler):
             "failed-logins": "grep 'Failed password' /var/log/auth.log 2>/dev/null || journalctl -u sshd 2>/dev/null | grep 'Failed password'"
         }
 
+    def resolve_command(self, command: str) -> Optional[Tuple[str, str]]:
+        """
+        Translate a security command into the shell command that implements it.
+
+        Args:
+            command: The security command
+
+        Returns:
+            Tuple of (shell command, operation name), or None for an unknown command
+        """
+        if command in self.security_commands:
+            return self.security_commands[command], command
+
+        if command.startswith("check:"):
+            # Custom security check - format: check:file or directory
+            target = shlex.quote(command[6:].strip())
+            # Check permissions, owner, and other security attributes
+            return (f"ls -la {target} 2>/dev/null && find {target} -type f -perm -o+w -ls 2>/dev/null | head -10",
+                    "check")
+
+        if command.startswith("vulnerabilities:"):
+            # Check for known vulnerabilities - format: vulnerabilities:package
+            package = shlex.quote(command[16:].strip())
+            # Try to check using available tools
+            return (f"apt list --installed 2>/dev/null | grep {package} || rpm -q {package} 2>/dev/null "
+                    f"|| pacman -Qi {package} 2>/dev/null",
+                    "vulnerabilities")
+
+        return None
+
+    def is_read_only(self, content: str) -> bool:
+        """Security checks only read system state, except 'sudo' which may prompt for a password."""
+        return content != "sudo"
+
+    def describe(self, content: str) -> Optional[str]:
+        """Show the underlying shell command; unknown commands run nothing."""
+        resolved = self.resolve_command(content)
+        return resolved[0] if resolved else None
+
     def handle(self, command: str, require_approval: bool, auto_approve: bool) -> Dict[str, Any]:
         """
         Handle security protocol commands (security operations).
@@ -66,9 +105,11 @@ class SecurityProtocolHandler(ProtocolHandler):
         }
 
         try:
-            if command in self.security_commands:
-                logger.debug(f"Processing security command: {command}")
-                security_command = self.security_commands[command]
+            resolved = self.resolve_command(command)
+
+            if resolved:
+                security_command, operation = resolved
+                logger.debug(f"Processing security {operation} command: {command}")
 
                 # Execute the security command using terminal protocol
                 terminal_result = terminal_handler.handle(
@@ -76,39 +117,7 @@ class SecurityProtocolHandler(ProtocolHandler):
                 )
 
                 # Add security operation type to result
-                terminal_result["security_operation"] = command
-                return terminal_result
-
-            elif command.startswith("check:"):
-                # Custom security check - format: check:file or directory
-                logger.debug(f"Processing custom security check: {command}")
-                target = command[6:].strip()
-                target = shlex.quote(target)
-
-                # Check permissions, owner, and other security attributes
-                check_command = f"ls -la {target} 2>/dev/null && find {target} -type f -perm -o+w -ls 2>/dev/null | head -10"
-
-                terminal_result = terminal_handler.handle(
-                    check_command, require_approval, auto_approve
-                )
-
-                terminal_result["security_operation"] = "check"
-                return terminal_result
-
-            elif command.startswith("vulnerabilities:"):
-                # Check for known vulnerabilities - format: vulnerabilities:package
-                logger.debug(f"Processing vulnerabilities check: {command}")
-                package = command[16:].strip()
-                package = shlex.quote(package)
-
-                # Try to check using available tools
-                check_command = f"apt list --installed 2>/dev/null | grep {package} || rpm -q {package} 2>/dev/null || pacman -Qi {package} 2>/dev/null"
-
-                terminal_result = terminal_handler.handle(
-                    check_command, require_approval, auto_approve
-                )
-
-                terminal_result["security_operation"] = "vulnerabilities"
+                terminal_result["security_operation"] = operation
                 return terminal_result
 
             else:
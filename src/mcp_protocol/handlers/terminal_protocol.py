@@ -14,8 +14,11 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"
 sys.path.append(parent_dir)
 
 # Now we can import from src
-from src.command_executor import execute_command_in_terminal, wait_for_command_completion
+from src.command_executor import (
+    execute_command_in_terminal, wait_for_command_completion, direct_execution, OutputCapture
+)
 from src.approval_handler import ApprovalHandler
+from src.shell_pool import shell_pool
 
 logger = logging.getLogger("mcp_protocol.terminal")
 
@@ -37,7 +40,8 @@ class TerminalProtocolHandler(ProtocolHandler):
             auto_approve: Whether to auto-approve
 
         Returns:
-            Dictionary with execution results
+            Dictionary with execution results, with the output's 'total_bytes'
+            and whether it was 'truncated' once executed
         """
         result = {
             "command": command,
@@ -59,12 +63,27 @@ class TerminalProtocolHandler(ProtocolHandler):
                 result["output"] = "Command execution was denied."
                 return result
 
-            # Execute the approved command
+            # Only the head and tail of a large output are kept
+            capture = OutputCapture()
+
+            if direct_execution.get():
+                # Running alongside other tags, the persistent terminal may be busy
+                result["output"] = shell_pool.run(command, capture=capture)
+                result["executed"] = True
+                result["total_bytes"] = capture.total_bytes
+                result["truncated"] = capture.truncated
+                return result
+
+            # Execute the approved command, its output is shown while it runs
             temp_file = execute_command_in_terminal(command)
             if temp_file:
-                command_output = wait_for_command_completion(temp_file)
+                from src.command_display import CommandDisplay
+                command_output = wait_for_command_completion(temp_file, CommandDisplay().print_output_chunk,
+                                                             capture)
                 result["output"] = command_output
                 result["executed"] = True
+                result["total_bytes"] = capture.total_bytes
+                result["truncated"] = capture.truncated
                 logger.debug("Command executed successfully")
             else:
                 result["output"] = "Failed to execute command."
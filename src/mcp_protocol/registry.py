@@ -4,7 +4,7 @@ This module manages the registration and retrieval of protocol handlers.
 """
 
 import logging
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Optional
 
 logger = logging.getLogger("mcp_protocol")
 
@@ -12,6 +12,10 @@ logger = logging.getLogger("mcp_protocol")
 class ProtocolHandler:
     """Base class for protocol handlers."""
 
+    # Seconds the commands of one tag may run, None for the executor's command_timeout.
+    # executor.protocol_timeouts in the configuration overrides it.
+    timeout: Optional[float] = None
+
     def __init__(self, name: str):
         """
         Initialize a protocol handler.
@@ -35,6 +39,50 @@ class ProtocolHandler:
         """
         raise NotImplementedError("Protocol handlers must implement handle method")
 
+    def is_read_only(self, content: str) -> bool:
+        """
+        Tell whether a command only reads system state.
+
+        Read-only commands of one response may run concurrently; any other
+        command runs alone, after everything before it has completed.
+
+        Args:
+            content: Command content
+
+        Returns:
+            True if the command has no side effects
+        """
+        return False
+
+    def describe(self, content: str) -> Optional[str]:
+        """
+        Text shown when asking approval for a command.
+
+        Args:
+            content: Command content
+
+        Returns:
+            Text of the approval prompt, or None if the command needs no approval
+        """
+        return content
+
+    def denied_result(self, content: str) -> Dict[str, Any]:
+        """
+        Result of a command whose approval was denied.
+
+        Args:
+            content: Command content
+
+        Returns:
+            Dictionary with execution results
+        """
+        return {
+            "command": content,
+            "executed": False,
+            "output": "Command execution was denied.",
+            "approved": False
+        }
+
 
 class ProtocolRegistry:
     """Registry for MCP protocol handlers."""
@@ -0,0 +1,150 @@
+"""
+Incremental parser for MCP protocol tags.
+Detects complete tags chunk by chunk while a response is still streaming.
+"""
+
+import re
+from typing import List, Tuple, Optional
+
+# Complete opening tags: <mcp:name>, and the legacy <system> and <s> tags
+OPEN_TAG_PATTERN = re.compile(r'<(?:mcp:(\w+)|(system)|(s))>')
+
+# Text that may still grow into an opening tag once more chunks arrive
+PARTIAL_OPEN_TAG_PATTERN = re.compile(
+    r'<(?:m(?:c(?:p(?::\w*)?)?)?|s(?:y(?:s(?:t(?:e(?:m)?)?)?)?)?)?\Z'
+)
+
+
+class MCPStreamParser:
+    """
+    Incremental MCP tag detector.
+
+    Feed it the response chunk by chunk; every call returns the tags whose
+    closing tag arrived in that chunk, in order of appearance. Text outside
+    tags is discarded as soon as it can no longer start a tag, so each
+    character is scanned once.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self._buffer = ""
+        # Protocol and closing tag of the tag currently open, if any
+        self._protocol: Optional[str] = None
+        self._closing_tag: Optional[str] = None
+        # Offset in the buffer where the content of the open tag starts
+        self._content_start = 0
+        # Offset from which to resume searching for the closing tag
+        self._search_from = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            List of tuples (protocol_name, command_content) completed by this chunk
+        """
+        self._buffer += chunk
+        tags = []
+
+        while True:
+            if self._protocol is None:
+                if not self._find_opening_tag():
+                    break
+            else:
+                tag = self._find_closing_tag()
+                if tag is None:
+                    break
+                tags.append(tag)
+
+        return tags
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """
+        Flush the parser at the end of the stream.
+
+        An opening tag that was never closed is skipped and the text after it
+        is scanned again, matching the behaviour of the non-incremental parser.
+
+        Returns:
+            List of tuples (protocol_name, command_content) found in the remainder
+        """
+        tags = []
+
+        while self._protocol is not None:
+            remainder = self._buffer[self._content_start:]
+            self._reset()
+            tags.extend(self.feed(remainder))
+
+        self._reset()
+        return tags
+
+    def _reset(self):
+        """Forget any buffered text and open tag."""
+        self._buffer = ""
+        self._protocol = None
+        self._closing_tag = None
+        self._content_start = 0
+        self._search_from = 0
+
+    def _find_opening_tag(self) -> bool:
+        """
+        Look for the next opening tag in the buffer.
+
+        Returns:
+            True if a tag was opened, False if more input is needed
+        """
+        position = self._buffer.find("<")
+
+        while position != -1:
+            match = OPEN_TAG_PATTERN.match(self._buffer, position)
+            if match:
+                name, system, legacy = match.groups()
+                if name:
+                    self._protocol = name.lower()
+                    self._closing_tag = f"</mcp:{name}>"
+                else:
+                    # Map legacy tags to the terminal protocol
+                    self._protocol = "terminal"
+                    self._closing_tag = "</system>" if system else "</s>"
+
+                # Drop the text before the tag, it can no longer contain tags
+                self._buffer = self._buffer[match.end():]
+                self._content_start = 0
+                self._search_from = 0
+                return True
+
+            if PARTIAL_OPEN_TAG_PATTERN.match(self._buffer, position):
+                # Keep the possible start of a tag until the next chunk
+                self._buffer = self._buffer[position:]
+                return False
+
+            position = self._buffer.find("<", position + 1)
+
+        self._buffer = ""
+        return False
+
+    def _find_closing_tag(self) -> Optional[Tuple[str, str]]:
+        """
+        Look for the closing tag of the open tag.
+
+        Returns:
+            Completed (protocol_name, command_content) tuple, or None if more input is needed
+        """
+        end = self._buffer.find(self._closing_tag, self._search_from)
+
+        if end == -1:
+            # The closing tag may be split across chunks, overlap the next search
+            self._search_from = max(self._content_start, len(self._buffer) - len(self._closing_tag) + 1)
+            return None
+
+        tag = (self._protocol, self._buffer[self._content_start:end].strip())
+
+        self._buffer = self._buffer[end + len(self._closing_tag):]
+        self._protocol = None
+        self._closing_tag = None
+        self._content_start = 0
+        self._search_from = 0
+        return tag
@@ -0,0 +1,154 @@
+"""
+Disk-backed response cache for Neo AI.
+Replays identical requests to deterministic backends without touching the network.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+
+# Defaults used when the 'cache' section is missing from config.yaml
+DEFAULT_CACHE_CONFIG = {
+    "enabled": False,                           # Opt-in
+    "directory": "~/.cache/neo/responses",      # Where cached responses are stored
+    "max_bytes": 50 * 1024 * 1024,              # Least recently used entries are evicted above this size
+    "ttl": 24 * 3600,                           # Entries older than this (seconds) are ignored
+}
+
+
+class ResponseCache:
+    """
+    Cache of streamed completions keyed by a hash of the request payload.
+
+    Each entry is one JSON file holding the streamed deltas, so a hit can be
+    replayed through the normal streaming path. The file modification time
+    records the last use and drives the LRU eviction.
+    """
+
+    def __init__(self, config):
+        """
+        Initialize the response cache.
+
+        Args:
+            config (dict): Full Neo AI configuration
+        """
+        settings = dict(DEFAULT_CACHE_CONFIG)
+        settings.update(config.get('cache', {}) or {})
+
+        self.enabled = bool(settings["enabled"])
+        self.directory = os.path.expanduser(settings["directory"])
+        self.max_bytes = settings["max_bytes"]
+        self.ttl = settings["ttl"]
+
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(payload):
+        """
+        Build a stable key for a request payload.
+
+        Args:
+            payload (dict): Everything that determines the response (endpoint, model, messages, settings)
+
+        Returns:
+            str: Hex digest of the canonical JSON serialization
+        """
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            list: Streamed deltas, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            self._remove(path)
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("chunks")
+
+    def put(self, key, chunks):
+        """
+        Store a response and evict the least recently used entries if needed.
+
+        Args:
+            key (str): Key from make_key
+            chunks (list): Streamed deltas of the response
+        """
+        if not self.enabled:
+            return
+
+        temp_path = None
+        try:
+            # Write atomically so a concurrent reader never sees a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"created": time.time(), "chunks": chunks}, f)
+            os.replace(temp_path, self._path(key))
+            temp_path = None
+        except OSError as e:
+            logging.error(f"Failed to write response cache entry: {e}")
+            return
+        finally:
+            # Eviction only looks at entries, a failed write must not leave its temporary file
+            if temp_path is not None:
+                self._remove(temp_path)
+
+        self._evict()
+
+    def _evict(self):
+        """Remove expired entries, then the least recently used ones above the size limit."""
+        entries = []
+        now = time.time()
+
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._remove(entry.path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,116 @@
+"""
+Streaming response handling for Neo AI.
+Prints a completion as it streams and executes MCP tags as soon as they close.
+"""
+
+import time
+import asyncio
+from src.mcp_protocol import mcp
+from src.stream_renderer import StreamRenderer
+from src.tracing import tracer
+
+
+class ResponseStream:
+    """
+    One streamed completion.
+
+    Every delta is sent to the renderer and fed to an incremental MCP tag
+    parser. When a closing tag arrives, the tag is added to an MCP batch
+    right away (approval prompt and command execution) while the rest of the
+    response keeps streaming. The batch runs independent read-only tags
+    concurrently and keeps the results in order of appearance. The renderer
+    is paused while tags are running, so text received meanwhile does not
+    interleave with the approval prompts or the command output.
+    """
+
+    def __init__(self, batch, clear_thinking=False, renderer=None):
+        """
+        Initialize the stream.
+
+        Args:
+            batch (MCPBatch): Batch executing the tags of this response
+            clear_thinking (bool): Clear the "Thinking..." line before the first delta
+            renderer (StreamRenderer): Output sink, a terminal renderer when not given
+        """
+        self.batch = batch
+        self.renderer = renderer or StreamRenderer(clear_thinking=clear_thinking)
+        self.parser = mcp.create_stream_parser()
+        self.text = ""
+        self.deltas = []
+        self.results = []
+        self._tags_running = 0
+        self._tag_futures = []
+        # Time spent looking for tags, traced once per response
+        self._parse_time = 0.0
+
+    def feed(self, content):
+        """
+        Handle one streamed delta.
+
+        Args:
+            content (str): Text delta from the backend
+        """
+        if not content:
+            return
+
+        self.text += content
+        self.deltas.append(content)
+        self.renderer.write(content)
+
+        if tracer.enabled:
+            started = time.perf_counter()
+            tags = self.parser.feed(content)
+            self._parse_time += time.perf_counter() - started
+        else:
+            tags = self.parser.feed(content)
+
+        for protocol, tag_content in tags:
+            self._schedule_tag(protocol, tag_content)
+
+    async def finish(self):
+        """
+        Wait for the scheduled tags once the stream has ended.
+
+        Returns:
+            list: Ordered list of (protocol, result) tuples
+        """
+        for protocol, tag_content in self.parser.finish():
+            self._schedule_tag(protocol, tag_content)
+        tracer.record("tag_parse", self._parse_time, deltas=len(self.deltas), tags=len(self._tag_futures))
+
+        try:
+            if self._tag_futures:
+                await asyncio.wait([future for _, future in self._tag_futures])
+        except BaseException:
+            # Interrupted, e.g. Ctrl+C or a client gone: stop the commands still running
+            self.batch.cancel()
+            raise
+        finally:
+            self.batch.close()
+
+        self.results = [(protocol, future.result()) for protocol, future in self._tag_futures
+                        if not future.cancelled()]
+        self.renderer.close()
+        return self.results
+
+    def cancel(self):
+        """Cancel tags that have not started yet and stop running commands, e.g. after a failed request."""
+        self.batch.cancel()
+        self.batch.close()
+        self.renderer.resume()
+
+    def _schedule_tag(self, protocol, tag_content):
+        """Add a completed tag to the batch."""
+        if not self._tags_running:
+            self.renderer.pause()
+        self._tags_running += 1
+
+        future = asyncio.wrap_future(self.batch.add(protocol, tag_content))
+        future.add_done_callback(self._tag_done)
+        self._tag_futures.append((protocol, future))
+
+    def _tag_done(self, future):
+        """Resume the output once no tag is running anymore."""
+        self._tags_running -= 1
+        if not self._tags_running:
+            self.renderer.resume()
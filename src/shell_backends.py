@@ -0,0 +1,242 @@
+"""
+Backends hosting the persistent shell of Neo AI.
+The shell runs the same script and speaks the same FIFO protocol whatever hosts
+it: a terminal window on a desktop, a pseudo-terminal owned by Neo on a machine
+without one, or plain pipes for the shells of the pool.
+"""
+
+import os
+import fcntl
+import shlex
+import shutil
+import struct
+import termios
+import logging
+import subprocess
+
+# Terminal emulators tried in order, with the option that runs a command
+TERMINALS = [
+    ("gnome-terminal", "gnome-terminal --"),
+    ("konsole", "konsole -e"),
+    ("xfce4-terminal", "xfce4-terminal -e"),
+    ("mate-terminal", "mate-terminal -e"),
+    ("terminator", "terminator -e"),
+    ("tilix", "tilix -e"),
+    ("kitty", "kitty -e"),
+    ("alacritty", "alacritty -e"),
+    ("x-terminal-emulator", "x-terminal-emulator -e")
+]
+
+# Bytes of what the pseudo-terminal showed that are kept, the newest ones
+TRANSCRIPT_BYTES = 16384
+
+
+class ShellBackend:
+    """
+    Starts and hosts the persistent shell of an executor.
+
+    The commands' output always goes to the executor's output file; a backend
+    only decides where the shell runs and what its commands get as a terminal.
+    """
+
+    name = None
+    # The terminal shows each command and a copy of its output
+    shows_output = False
+    # Someone types at the shell's terminal, so commands read their stdin from it instead of /dev/null
+    interactive_stdin = False
+
+    def __init__(self):
+        self.process = None
+
+    def start(self, script_path):
+        """
+        Start the shell running a script.
+
+        Args:
+            script_path (str): Script of the persistent shell
+
+        Returns:
+            subprocess.Popen: Process to poll while the shell starts
+        """
+        raise NotImplementedError("Shell backends must implement start")
+
+    def wait_fds(self):
+        """File descriptors to drain() while waiting for the shell."""
+        return ()
+
+    def drain(self):
+        """Read what the shell wrote to a file descriptor of wait_fds()."""
+
+    def close(self):
+        """Release the backend once the shell was told to stop."""
+        if self.process is not None:
+            try:
+                self.process.wait(1)
+            except subprocess.TimeoutExpired:
+                pass
+            self.process = None
+
+
+class WindowBackend(ShellBackend):
+    """The shell runs in a terminal emulator window, where the user sees each command."""
+
+    name = "window"
+    shows_output = True
+    interactive_stdin = True
+
+    def __init__(self):
+        super().__init__()
+        # Detected when the terminal is first launched
+        self._terminal_type = None
+
+    @property
+    def terminal_type(self):
+        """Launch command of the terminal emulator, detected on first use."""
+        if self._terminal_type is None:
+            self._terminal_type = self._detect_terminal_type()
+        return self._terminal_type
+
+    def _detect_terminal_type(self):
+        """Detect the available terminal emulator with an in-process PATH lookup."""
+        for terminal_cmd, launch_cmd in TERMINALS:
+            if shutil.which(terminal_cmd):
+                return launch_cmd
+
+        # Default fallback
+        return "x-terminal-emulator -e"
+
+    def launch_command(self, script_path):
+        """Shell command opening a terminal window running the script."""
+        script_path = shlex.quote(script_path)
+
+        # Launch terminal more reliably - determine based on desktop environment
+        desktop_env = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
+        if "gnome" in desktop_env or "unity" in desktop_env:
+            return f"gnome-terminal -- bash {script_path}"
+        elif "kde" in desktop_env or "plasma" in desktop_env:
+            return f"konsole -e bash {script_path}"
+        elif "xfce" in desktop_env:
+            return f"xfce4-terminal -e 'bash {script_path}'"
+        # Use detected terminal with explicit bash
+        return f"{self.terminal_type} bash {script_path}"
+
+    def start(self, script_path):
+        term_cmd = self.launch_command(script_path)
+        logging.info(f"Launching persistent terminal with: {term_cmd}")
+        # The emulator usually returns at once, the window outlives it
+        self.process = subprocess.Popen(term_cmd, shell=True,
+                                        stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL,
+                                        start_new_session=True)
+        return self.process
+
+
+class PtyBackend(ShellBackend):
+    """
+    The shell runs on a pseudo-terminal owned by Neo, no X or Wayland needed.
+
+    The pseudo-terminal is the controlling terminal of the shell, so each
+    command runs as its foreground job with a terminal to report to. Nobody
+    types on it, so commands read their stdin from /dev/null and a command
+    reading stdin gets end of file at once. A program opening /dev/tty itself
+    to ask something still waits, until its command times out. Neo reads its
+    side without blocking whenever it waits for the shell, keeping the last
+    bytes shown as a transcript, so a program writing to its terminal never
+    blocks on a full buffer. Closing Neo's side hangs the shell up, so it
+    does not outlive Neo.
+    """
+
+    name = "pty"
+
+    def __init__(self):
+        super().__init__()
+        self.master_fd = None
+        self.transcript = bytearray()
+
+    def start(self, script_path):
+        self._close_master()
+        self.master_fd, slave_fd = os.openpty()
+        try:
+            # Programs asking their terminal for its size get a usual one
+            fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack("HHHH", 24, 80, 0, 0))
+            logging.info(f"Launching persistent shell on {os.ttyname(slave_fd)}")
+            # A new session, so the shell takes the pseudo-terminal as its controlling terminal
+            self.process = subprocess.Popen(["bash", script_path], stdin=slave_fd, stdout=slave_fd,
+                                            stderr=slave_fd, start_new_session=True)
+        finally:
+            os.close(slave_fd)
+        os.set_blocking(self.master_fd, False)
+        return self.process
+
+    def wait_fds(self):
+        return () if self.master_fd is None else (self.master_fd,)
+
+    def drain(self):
+        while self.master_fd is not None:
+            try:
+                data = os.read(self.master_fd, 65536)
+            except BlockingIOError:
+                return
+            except OSError:
+                # EIO once the shell and everything it started closed the terminal
+                self._close_master()
+                return
+            if not data:
+                self._close_master()
+                return
+            self.transcript += data
+            if len(self.transcript) > TRANSCRIPT_BYTES:
+                del self.transcript[:len(self.transcript) - TRANSCRIPT_BYTES]
+
+    def close(self):
+        self._close_master()
+        super().close()
+
+    def _close_master(self):
+        if self.master_fd is not None:
+            os.close(self.master_fd)
+            self.master_fd = None
+
+
+class PipeBackend(ShellBackend):
+    """The shell runs without a terminal and its commands read /dev/null, see ShellWorker."""
+
+    name = "pipe"
+
+    def start(self, script_path):
+        self.process = subprocess.Popen(["bash", script_path], stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        start_new_session=True)
+        return self.process
+
+
+# Shell backends by name, as used in the 'executor' section
+SHELL_BACKENDS = {
+    "window": WindowBackend,
+    "pty": PtyBackend,
+    "pipe": PipeBackend,
+}
+
+
+def create_shell_backend(name="auto"):
+    """
+    Create a shell backend.
+
+    Backend 'auto' is a terminal window when there is a display to open it
+    on ($DISPLAY or $WAYLAND_DISPLAY), a pseudo-terminal otherwise.
+
+    Args:
+        name (str): 'auto' or a name of SHELL_BACKENDS
+
+    Returns:
+        ShellBackend: Backend instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name in (None, "", "auto"):
+        name = "window" if os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY") else "pty"
+    if name not in SHELL_BACKENDS:
+        raise ValueError(f"Unknown executor backend '{name}'. "
+                         f"Valid options: {', '.join(['auto'] + sorted(SHELL_BACKENDS))}")
+    return SHELL_BACKENDS[name]()
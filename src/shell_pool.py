@@ -0,0 +1,179 @@
+"""
+Pool of persistent shells for Neo AI.
+Runs the commands of concurrent MCP tags side by side, each in a warm headless
+shell with its own command channel and output file.
+"""
+
+import atexit
+import shutil
+import logging
+import tempfile
+import threading
+
+from src.command_executor import (
+    PersistentTerminalExecutor, OutputCapture, run_command_direct, DEFAULT_EXECUTOR_CONFIG
+)
+from src.shell_backends import PipeBackend
+from src.tracing import tracer
+
+
+class ShellWorker(PersistentTerminalExecutor):
+    """
+    A persistent shell without a terminal window.
+
+    Speaks the same FIFO protocol as the persistent terminal, from a private
+    directory, and its commands read /dev/null.
+    """
+
+    def __init__(self, index):
+        """
+        Initialize the worker, its shell starts with the first command.
+
+        Args:
+            index (int): Position of the worker in its pool
+        """
+        self.index = index
+        self.commands = 0
+        super().__init__(tempfile.mkdtemp(prefix=f"neo-shell-{index}-"), PipeBackend())
+
+    def _cleanup(self):
+        """Stop the shell and remove its directory."""
+        super()._cleanup()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def close(self):
+        """Stop the shell, a retired worker is then no longer kept alive by its exit cleanup."""
+        atexit.unregister(self._cleanup)
+        self._cleanup()
+
+
+class ShellPool:
+    """
+    Persistent shells running commands concurrently.
+
+    Shells are started on demand, up to the pool size, and a command is
+    handed to an idle one, waiting for one to become idle when they are all
+    busy. Each shell reports the directory and environment its last command
+    ended with. A command running past its timeout is stopped with its process
+    group and the shell is reused right away; only a shell that never reported
+    the command done is stopped and replaced.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool with the default size."""
+        self.size = DEFAULT_EXECUTOR_CONFIG["pool_size"]
+        self._workers = []
+        self._idle = []
+        self._condition = threading.Condition()
+
+    def configure(self, config):
+        """
+        Apply the 'executor' section of the configuration.
+
+        Args:
+            config (dict): Full Neo AI configuration
+        """
+        settings = dict(DEFAULT_EXECUTOR_CONFIG)
+        settings.update(config.get('executor', {}) or {})
+        with self._condition:
+            self.size = max(0, int(settings["pool_size"]))
+            self._condition.notify_all()
+
+    def run(self, command, on_output=None, capture=None, timeout=None):
+        """
+        Run a command on an idle shell, in the current working_directory.
+
+        Args:
+            command (str): Command to execute
+            on_output: Callable receiving each output chunk while the command runs
+            capture (OutputCapture): Receives the output, a default one when not given
+            timeout (float): Seconds the command may run, see resolve_timeout()
+
+        Returns:
+            str: Command output followed by its exit code like the persistent
+                 terminal's, its middle dropped past the capture's cap
+        """
+        capture = capture if capture is not None else OutputCapture()
+        if self.size == 0:
+            return run_command_direct(command, timeout, capture)
+
+        worker = self._acquire()
+        lost = False
+        try:
+            worker.execute_command(command)
+            sent = worker.command_pending
+            with tracer.span("command_runtime", worker=worker.index) as span:
+                for chunk in worker.stream_output(timeout, capture):
+                    if chunk and on_output is not None:
+                        on_output(chunk)
+                if worker.last_completion:
+                    span.set(exit_code=worker.last_completion["exit_code"],
+                             stopped=worker.last_completion["stopped"])
+            lost = sent and worker.last_completion is None
+            worker.commands += 1
+        except KeyboardInterrupt:
+            # The command was stopped, the shell is lost if it did not report it done
+            lost = worker.last_completion is None
+            raise
+        finally:
+            self._release(worker, retire=lost)
+        return capture.text()
+
+    def state(self):
+        """
+        State of the shells, for display and debugging.
+
+        Returns:
+            list: Dicts with 'index', 'busy', 'commands', 'cwd', 'exit_code' and 'env' per shell
+        """
+        with self._condition:
+            workers = list(self._workers)
+            idle = set(id(worker) for worker in self._idle)
+        states = []
+        for worker in workers:
+            state = worker.state() or {"cwd": None, "env": {}}
+            completion = worker.last_completion or {}
+            states.append({"index": worker.index, "busy": id(worker) not in idle,
+                           "commands": worker.commands, "cwd": state["cwd"],
+                           "exit_code": completion.get("exit_code"), "env": state["env"]})
+        return states
+
+    def close(self):
+        """Stop the idle shells, busy ones are stopped when released."""
+        with self._condition:
+            self.size = 0
+            idle, self._idle = self._idle, []
+            for worker in idle:
+                self._workers.remove(worker)
+        for worker in idle:
+            worker.close()
+
+    def _acquire(self):
+        """Take an idle shell, starting one if the pool is not full."""
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._workers) < max(1, self.size):
+                    used = set(worker.index for worker in self._workers)
+                    worker = ShellWorker(min(set(range(len(self._workers) + 1)) - used))
+                    self._workers.append(worker)
+                    return worker
+                self._condition.wait()
+
+    def _release(self, worker, retire=False):
+        """Give a shell back to the pool, or stop it."""
+        with self._condition:
+            if retire or len(self._workers) > self.size:
+                self._workers.remove(worker)
+            else:
+                self._idle.append(worker)
+                worker = None
+            self._condition.notify()
+        if worker is not None:
+            logging.info(f"Stopping shell {worker.index}")
+            worker.close()
+
+
+# Shared by every engine of the process, sized by the last configuration applied
+shell_pool = ShellPool()
@@ -0,0 +1,143 @@
+"""
+Terminal rendering of streamed completions for Neo AI.
+Coalesces deltas into frames so printing never limits generation throughput.
+"""
+
+import sys
+import time
+import asyncio
+
+# Defaults used when the 'renderer' section is missing from config.yaml
+DEFAULT_RENDERER_CONFIG = {
+    "frame_rate": 30,       # Maximum number of writes per second, 0 writes every delta
+}
+
+RESPONSE_HEADER = "\033[1;34mNeo:\033[0m "
+# Overwrites the "Thinking..." line printed by the terminal UI
+CLEAR_THINKING = "\r" + " " * 30 + "\r"
+
+
+class StreamRenderer:
+    """
+    Single output sink for the text of a streamed response.
+
+    Deltas are buffered and written at most once per frame. A delta holding a
+    newline is written right away, and pending text is flushed once the frame
+    interval has elapsed without a newer write, so a stalled stream never
+    leaves text behind. The response header and the clearing of the
+    "Thinking..." line go out with the first write.
+    """
+
+    def __init__(self, config=None, clear_thinking=False, stream=None):
+        """
+        Initialize the renderer.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            clear_thinking (bool): Clear the "Thinking..." line before the first write
+            stream: File object to write to, sys.stdout when not given
+        """
+        settings = dict(DEFAULT_RENDERER_CONFIG)
+        settings.update((config or {}).get('renderer', {}) or {})
+
+        frame_rate = settings["frame_rate"]
+        self.frame_interval = 1.0 / frame_rate if frame_rate and frame_rate > 0 else 0.0
+        self.clear_thinking = clear_thinking
+        self.stream = stream
+
+        self._buffer = []
+        self._started = False
+        self._paused = False
+        self._at_line_start = True
+        self._last_flush = 0.0
+        self._flush_handle = None
+
+    def write(self, text):
+        """
+        Queue text for output.
+
+        Args:
+            text (str): Streamed delta
+        """
+        if not text:
+            return
+
+        self._buffer.append(text)
+        if self._paused:
+            return
+
+        if "\n" in text or time.monotonic() - self._last_flush >= self.frame_interval:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def flush(self):
+        """Write the buffered text now, unless output is paused."""
+        self._cancel_scheduled_flush()
+        if self._paused or not self._buffer:
+            return
+
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._emit(text)
+
+    def pause(self):
+        """
+        Flush and hold further text back, e.g. while an MCP tag runs.
+
+        The cursor is moved to the start of a line so an approval prompt or
+        command output does not continue the streamed text.
+        """
+        self.flush()
+        self._paused = True
+        if self._started and not self._at_line_start:
+            self._emit("\n")
+
+    def resume(self):
+        """Write the text held back while paused and go back to frame-based output."""
+        self._paused = False
+        self.flush()
+
+    def close(self):
+        """Flush everything and end the response line."""
+        self._paused = False
+        self.flush()
+        self._get_stream().write("\n")
+        self._get_stream().flush()
+
+    def _emit(self, text):
+        if not self._started:
+            text = (CLEAR_THINKING if self.clear_thinking else "") + RESPONSE_HEADER + text
+            self._started = True
+
+        stream = self._get_stream()
+        stream.write(text)
+        stream.flush()
+        self._at_line_start = text.endswith("\n")
+        self._last_flush = time.monotonic()
+
+    def _get_stream(self):
+        # Resolved on every write so a redirected sys.stdout is honoured
+        return self.stream if self.stream is not None else sys.stdout
+
+    def _schedule_flush(self):
+        """Flush the pending text at the end of the current frame."""
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to schedule on, e.g. when used from synchronous code
+            self.flush()
+            return
+        delay = max(0.0, self.frame_interval - (time.monotonic() - self._last_flush))
+        self._flush_handle = loop.call_later(delay, self._scheduled_flush)
+
+    def _scheduled_flush(self):
+        self._flush_handle = None
+        self.flush()
+
+    def _cancel_scheduled_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
@@ -4,7 +4,7 @@ class TerminalInterface:
     def __init__(self, neo_ai, config):
         self.neo_ai = neo_ai
         self.config = config
-        self.commands = ['history','exit']
+        self.commands = ['history','stats','exit']
 
     def completer(self, text, state):
         options = [i for i in self.commands if i.startswith(text)]
@@ -26,6 +26,8 @@ class TerminalInterface:
                 elif user_input.lower() == 'history':
                     print("\033[1;33mDisplaying conversation history\033[0m")
                     self.display_history()
+                elif user_input.lower() == 'stats':
+                    self.display_stats()
                 else:
                     self.neo_ai.query(user_input)
             except KeyboardInterrupt:
@@ -37,4 +39,8 @@ class TerminalInterface:
     def display_history(self):
         for entry in self.neo_ai.get_conversation_history():
             role = "\033[1;32mYou:\033[0m" if entry["role"] == "user" else "\033[1;34mNeo:\033[0m"
-            print(f"{role} {entry['content']}")
\ No newline at end of file
+            print(f"{role} {entry['content']}")
+
+    def display_stats(self):
+        for name, value in self.neo_ai.get_stats().items():
+            print(f"\033[1;33m{name.replace('_', ' ').capitalize()}:\033[0m {value}")
\ No newline at end of file
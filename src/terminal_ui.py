@@ -44,7 +44,7 @@ class ImprovedTerminalUI:
         """Initialize the terminal UI with Neo AI instance and config."""
         self.neo_ai = neo_ai
         self.config = config
-        self.commands = ['help', 'history', 'clear', 'exit']
+        self.commands = ['help', 'history', 'stats', 'clear', 'exit']
 
         # Create history file in user's home directory
         history_file = os.path.expanduser('~/.neo_history.txt')
@@ -98,6 +98,7 @@ class ImprovedTerminalUI:
 <info>Available commands:</info>
   • <highlight>help</highlight>    - Show this help menu
   • <highlight>history</highlight> - Show conversation history
+  • <highlight>stats</highlight>   - Show request, token and cache statistics
   • <highlight>clear</highlight>   - Clear the screen
   • <highlight>exit</highlight>    - Exit Neo AI
 
@@ -153,6 +154,14 @@ class ImprovedTerminalUI:
             if i < len(history):
                 print_formatted_text(HTML('<ansigray>─────────────────────────────────────</ansigray>'), style=NEO_STYLE)
 
+    def display_stats(self):
+        """Display request, token and response cache statistics."""
+        print_formatted_text(HTML('<b><u>Session Statistics:</u></b>'), style=NEO_STYLE)
+
+        for name, value in self.neo_ai.get_stats().items():
+            label = name.replace('_', ' ').capitalize()
+            print_formatted_text(HTML(f'  • <highlight>{label}</highlight>: {value}'), style=NEO_STYLE)
+
     def highlight_command(self, command):
         """Format command for improved visibility."""
         return HTML(f'<ansiyellow>Command:</ansiyellow> <ansicyan>{command}</ansicyan>')
@@ -185,6 +194,9 @@ class ImprovedTerminalUI:
                 elif user_input.lower() == 'history':
                     self.display_history()
 
+                elif user_input.lower() == 'stats':
+                    self.display_stats()
+
                 elif user_input.lower() == 'clear':
                     clear()
                     self.print_banner()
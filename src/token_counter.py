@@ -0,0 +1,220 @@
+"""
+Token counting for Neo AI requests.
+Uses an exact tokenizer when one is available locally and a heuristic otherwise.
+"""
+
+import re
+import logging
+from collections import OrderedDict
+
+# Defaults used when the 'tokens' section is missing from config.yaml
+DEFAULT_TOKENS_CONFIG = {
+    "tokenizer": "auto",              # 'auto', 'heuristic', 'tiktoken' or a path to a tokenizer.json
+    "context_window": 8192,           # Context window of the model, in tokens
+    "model_context_windows": {},      # Per-model overrides, e.g. {"my-model": 32768}
+    "reserve_completion_tokens": 1024,  # Room left for the answer
+}
+
+# Overhead of the chat format around each message and each request (OpenAI convention)
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REQUEST = 3
+
+# Words, numbers, and single punctuation characters
+HEURISTIC_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+MAX_CACHED_MESSAGES = 4096
+
+
+def heuristic_token_count(text):
+    """
+    Estimate tokens without a tokenizer.
+
+    Words are counted as one token per four letters (rounded up), digits as
+    one token per three digits and every punctuation character as one token,
+    which is close to BPE tokenizers on both prose and command output.
+
+    Args:
+        text (str): Text to count
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    count = 0
+    for piece in HEURISTIC_PATTERN.findall(text):
+        if piece[0].isdigit():
+            count += (len(piece) + 2) // 3
+        elif piece[0].isalpha():
+            count += (len(piece) + 3) // 4
+        else:
+            count += 1
+    return count
+
+
+def _load_tiktoken(model):
+    """
+    Load a tiktoken encoding for the model.
+
+    Models tiktoken does not know, local ones included, get cl100k_base,
+    whose counts are only an estimate for them.
+
+    Args:
+        model (str): Model the messages are sent to
+
+    Returns:
+        tuple: (counting function or None if unavailable, True if the encoding is the model's own)
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None, False
+    try:
+        try:
+            encoding, known = tiktoken.encoding_for_model(model), True
+        except KeyError:
+            encoding, known = tiktoken.get_encoding("cl100k_base"), False
+        return lambda text: len(encoding.encode(text, disallowed_special=())), known
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline
+        logging.warning(f"tiktoken encoding unavailable: {e}")
+        return None, False
+
+
+def _load_tokenizer_file(path):
+    """Load a Hugging Face tokenizer.json file, or None if unavailable."""
+    try:
+        from tokenizers import Tokenizer
+    except ImportError:
+        logging.warning("The 'tokenizers' package is required to load a tokenizer file.")
+        return None
+    try:
+        tokenizer = Tokenizer.from_file(path)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    except Exception as e:
+        logging.warning(f"Could not load tokenizer file '{path}': {e}")
+        return None
+
+
+class TokenCounter:
+    """
+    Count tokens of chat messages.
+
+    Counts are cached per message object, so re-sending a long history only
+    costs the messages that were added or changed since the last request.
+    The tokenizer is loaded with the first count, as loading an encoding may
+    read or even download files.
+    """
+
+    def __init__(self, config, model):
+        """
+        Initialize the token counter.
+
+        Args:
+            config (dict): Full Neo AI configuration
+            model (str): Model the messages are sent to
+        """
+        settings = dict(DEFAULT_TOKENS_CONFIG)
+        settings.update(config.get('tokens', {}) or {})
+
+        self.context_window = (settings["model_context_windows"] or {}).get(model, settings["context_window"])
+        self.reserve_completion_tokens = settings["reserve_completion_tokens"]
+
+        self.tokenizer = settings["tokenizer"]
+        self.model = model
+        # Selected on first use
+        self._encode_count = None
+        self._exact = False
+
+        # id(message) -> (content, token count)
+        self._cache = OrderedDict()
+
+    def _select_tokenizer(self, tokenizer, model):
+        """
+        Pick the counting function.
+
+        Returns:
+            tuple: (counting function or None to use the heuristic, True if its counts are exact)
+        """
+        if tokenizer == "heuristic":
+            return None, False
+        if tokenizer == "auto":
+            # The cl100k_base fallback is only an estimate for a model tiktoken does not know
+            return _load_tiktoken(model)
+        if tokenizer == "tiktoken":
+            count, _ = _load_tiktoken(model)
+            return count, count is not None
+        count = _load_tokenizer_file(tokenizer)
+        return count, count is not None
+
+    def _load_tokenizer(self):
+        """Select the tokenizer, falling back to the heuristic."""
+        count, self._exact = self._select_tokenizer(self.tokenizer, self.model)
+        self._encode_count = count or heuristic_token_count
+
+    @property
+    def exact(self):
+        """True if counts come from the model's own tokenizer, False for estimates."""
+        if self._encode_count is None:
+            self._load_tokenizer()
+        return self._exact
+
+    @property
+    def prompt_limit(self):
+        """Maximum number of prompt tokens that still leaves room for the answer."""
+        return self.context_window - self.reserve_completion_tokens
+
+    def count_text(self, text):
+        """
+        Count the tokens of a piece of text.
+
+        Args:
+            text (str): Text to count
+
+        Returns:
+            int: Number of tokens
+        """
+        if not text:
+            return 0
+        if self._encode_count is None:
+            self._load_tokenizer()
+        return self._encode_count(text)
+
+    def count_message(self, message):
+        """
+        Count the tokens of one chat message, using the cache when possible.
+
+        Args:
+            message (dict): Chat message with 'role' and 'content'
+
+        Returns:
+            int: Number of tokens including the chat format overhead
+        """
+        key = id(message)
+        content = message["content"]
+
+        cached = self._cache.get(key)
+        # The content identity check guards against reused ids and edited messages
+        if cached is not None and cached[0] is content:
+            self._cache.move_to_end(key)
+            return cached[1]
+
+        count = self.count_text(content) + TOKENS_PER_MESSAGE
+        self._cache[key] = (content, count)
+        if len(self._cache) > MAX_CACHED_MESSAGES:
+            self._cache.popitem(last=False)
+        return count
+
+    def count_messages(self, messages):
+        """
+        Count the tokens of a full request.
+
+        Args:
+            messages (list): Chat messages
+
+        Returns:
+            int: Number of prompt tokens
+        """
+        return sum(self.count_message(message) for message in messages) + TOKENS_PER_REQUEST
+
+    def fits(self, messages):
+        """Check whether the messages fit in the context window with room for the answer."""
+        return self.count_messages(messages) <= self.prompt_limit
@@ -1,27 +1,74 @@
-import httpx
-import jwt
 import json
 import os
+import time
 import logging
 import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, refreshes are then only coordinated in-process
+    fcntl = None
+
+# Renew the access token this many seconds before it expires
+DEFAULT_REFRESH_MARGIN = 120
+# Tokens are not used during the last seconds of their lifetime, to absorb clock skew
+EXPIRY_SKEW = 10
+# Lifetime assumed for tokens without an 'exp' claim
+NO_EXPIRY_LIFETIME = 900
+# Delay before the background thread retries a failed renewal
+RETRY_DELAY = 30
 
-logging.disable(logging.CRITICAL)  # Disable logging
 
 class TokenManager:
-    def __init__(self, agent_id, agent_key, auth_api_url):
+    """
+    Access tokens for the DigitalOcean agent API.
+
+    The current tokens and their expiry are kept in memory, so getting a
+    valid token normally costs no I/O. A background thread renews the
+    access token a configurable margin before it expires. Renewals are
+    coordinated across Neo processes with a file lock on the shared token
+    cache, which is written atomically.
+    """
+
+    def __init__(self, agent_id, agent_key, auth_api_url, http_client=None, refresh_margin=DEFAULT_REFRESH_MARGIN):
         self.agent_id = agent_id
         self.agent_key = agent_key
         self.auth_api_url = auth_api_url
+        # Optional pooled client shared with the chat completion requests
+        self.http_client = http_client
+        self.refresh_margin = refresh_margin
 
         self.cache_file = os.path.join(tempfile.gettempdir(), "token_cache.json")
-        logging.basicConfig(level=logging.INFO)
+        self.lock_file = self.cache_file + ".lock"
+
+        # In-memory tokens with their expiry timestamps
+        self._access_token = None
+        self._access_expiry = 0.0
+        self._cached_refresh_token = None
+        self._refresh_expiry = 0.0
+        # When the background thread renews the access token
+        self._renew_at = 0.0
+        # Access token rejected by the API, never reused from the cache
+        self._rejected_token = None
+
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
 
     def _request(self, method, endpoint, headers=None, params=None, data=None):
+        # httpx and PyJWT are imported on first use, creating the engine does not need them
+        import httpx
         try:
             url = f"{self.auth_api_url}{endpoint}"
-            # Using httpx.request directly instead of creating a client
-            # This method helps bypass proxy usage
-            response = httpx.request(method, url, headers=headers, params=params, json=data)
+            if self.http_client is not None:
+                # Reuse the pooled keep-alive connection to the auth API
+                response = self.http_client.request(method, url, headers=headers, params=params, json=data)
+            else:
+                # Using httpx.request directly instead of creating a client
+                # This method helps bypass proxy usage
+                response = httpx.request(method, url, headers=headers, params=params, json=data)
             response.raise_for_status()
             return response.json()
         except httpx.RequestError as e:
@@ -50,55 +97,171 @@ class TokenManager:
         )
         return response["access_token"]
 
-    def _is_token_expired(self, token):
+    def _token_expiry(self, token):
+        """Expiry timestamp of a token, decoded once when the token is stored."""
+        if not token:
+            return 0.0
+        import jwt
         try:
-            jwt.decode(token, options={"verify_signature": False, "verify_exp": True})
-            return False
-        except jwt.ExpiredSignatureError:
-            logging.info("Token has expired.")
-            return True
+            claims = jwt.decode(token, options={"verify_signature": False, "verify_exp": False})
         except Exception as e:
-            logging.error(f"Error while validating token: {e}")
-            return True
+            logging.error(f"Error while decoding token: {e}")
+            return 0.0
+        expiry = claims.get("exp")
+        return float(expiry) if expiry is not None else time.time() + NO_EXPIRY_LIFETIME
+
+    def _store_tokens(self, access_token, refresh_token):
+        """Keep tokens in memory and schedule the next renewal."""
+        now = time.time()
+        self._access_token = access_token
+        self._access_expiry = self._token_expiry(access_token)
+        self._cached_refresh_token = refresh_token
+        self._refresh_expiry = self._token_expiry(refresh_token)
+        # Short-lived tokens are renewed halfway through their lifetime at the latest
+        margin = min(self.refresh_margin, max(0.0, self._access_expiry - now) / 2)
+        self._renew_at = self._access_expiry - margin
 
     def _load_tokens_from_cache(self):
-        if os.path.exists(self.cache_file):
+        try:
+            with open(self.cache_file, "r") as f:
+                tokens = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logging.warning("Cache file is corrupted. Ignoring it.")
+            return None
+
+        if not isinstance(tokens, dict) or tokens.get("access_token") == self._rejected_token:
+            return None
+        return tokens
+
+    def _save_tokens_to_cache(self, access_token, refresh_token):
+        # Write atomically so a concurrent process never reads a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.cache_file), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"access_token": access_token, "refresh_token": refresh_token}, f)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.cache_file)
+        except OSError as e:
+            logging.error(f"Failed to write token cache: {e}")
             try:
-                with open(self.cache_file, "r") as f:
-                    tokens = json.load(f)
-                    if self._is_token_expired(tokens.get("access_token")) and self._is_token_expired(
-                            tokens.get("refresh_token")):
-                        logging.warning("Both access and refresh tokens are expired. Clearing cache.")
-                        os.remove(self.cache_file)
-                        return None
-                    return tokens
-            except json.JSONDecodeError:
-                logging.warning("Cache file is corrupted. Ignoring it.")
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    @contextmanager
+    def _cache_lock(self):
+        """Hold an exclusive lock on the token cache, shared by all Neo processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def current_token(self):
+        """
+        Return the in-memory access token if it is still valid, without any I/O.
+
+        Returns:
+            str: Access token, or None if there is no valid one
+        """
+        token = self._access_token
+        if token and time.time() < self._access_expiry - EXPIRY_SKEW:
+            return token
         return None
 
-    def _save_tokens_to_cache(self, access_token, refresh_token):
-        with open(self.cache_file, "w") as f:
-            json.dump({"access_token": access_token, "refresh_token": refresh_token}, f)
+    def _renew(self, proactive):
+        """
+        Renew the tokens, unless another process already did. Called with the refresh lock held.
 
-    def get_valid_access_token(self):
-        try:
+        Args:
+            proactive (bool): Renew a token that is still valid but close to its expiry
+
+        Returns:
+            str: Valid access token
+        """
+        import httpx
+        with self._cache_lock():
+            # Another process may have renewed the tokens while we waited for the lock
             tokens = self._load_tokens_from_cache()
+            if tokens and tokens.get("access_token") != self._access_token:
+                self._store_tokens(tokens.get("access_token"), tokens.get("refresh_token"))
 
-            if tokens and not self._is_token_expired(tokens["access_token"]):
-                logging.info("Using valid cached access token.")
-                return tokens["access_token"]
+            token = self.current_token()
+            if token and (not proactive or time.time() < self._renew_at):
+                return token
 
-            if tokens and not self._is_token_expired(tokens["refresh_token"]):
-                logging.info("Cached access token expired. Refreshing...")
-                refresh_token = tokens["refresh_token"]
-            else:
+            access_token = None
+            refresh_token = self._cached_refresh_token
+            if refresh_token and time.time() < self._refresh_expiry - EXPIRY_SKEW:
+                logging.info("Access token expiring. Refreshing...")
+                try:
+                    access_token = self._get_access_token(refresh_token)
+                except httpx.HTTPStatusError:
+                    logging.info("Refresh token rejected. Requesting a new one...")
+
+            if access_token is None:
                 logging.info("No valid refresh token found. Requesting a new one...")
                 refresh_token = self._get_refresh_token()
+                access_token = self._get_access_token(refresh_token)
 
-            access_token = self._get_access_token(refresh_token)
+            self._store_tokens(access_token, refresh_token)
             self._save_tokens_to_cache(access_token, refresh_token)
             return access_token
 
+    def get_valid_access_token(self):
+        try:
+            token = self.current_token()
+            if token:
+                return token
+
+            with self._refresh_lock:
+                # Another thread may have renewed the token while we waited
+                return self.current_token() or self._renew(proactive=False)
+
         except Exception as e:
             logging.error(f"Failed to get a valid access token: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def invalidate(self, token):
+        """
+        Forget an access token rejected by the API, so the next call fetches a new one.
+
+        Args:
+            token (str): Rejected access token
+        """
+        with self._refresh_lock:
+            self._rejected_token = token
+            if self._access_token == token:
+                self._access_token = None
+                self._access_expiry = 0.0
+
+    def start_background_refresh(self):
+        """Renew the access token in a daemon thread before it expires."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name="neo-token-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background renewal."""
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            if self._stop_event.wait(max(0.0, self._renew_at - time.time())):
+                return
+            try:
+                with self._refresh_lock:
+                    if time.time() >= self._renew_at:
+                        self._renew(proactive=True)
+            except Exception as e:
+                # The current token stays in use until it expires
+                logging.error(f"Background token refresh failed: {e}")
+                if self._stop_event.wait(RETRY_DELAY):
+                    return
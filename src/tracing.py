@@ -0,0 +1,304 @@
+"""
+Per-turn tracing for Neo AI.
+Times the phases of a turn as spans written to a rotating JSONL file, and summarizes them.
+
+Usage:
+    python -m src.tracing [trace.jsonl]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import contextvars
+
+# Defaults used when the 'trace' section is missing from config.yaml
+DEFAULT_TRACE_CONFIG = {
+    "enabled": False,                           # Also enabled by the --trace switch
+    "path": "~/.cache/neo/trace.jsonl",         # Trace file, rotated files get a .1, .2... suffix
+    "max_bytes": 5 * 1024 * 1024,               # Size at which the file is rotated
+    "backups": 3,                               # Rotated files kept
+}
+
+# Phases of a turn, in the order the summary lists them
+PHASES = [
+    "turn",
+    "context_init",
+    "request_build",
+    "ttft",
+    "stream",
+    "tag_parse",
+    "approval_wait",
+    "tag_execute",
+    "executor_dispatch",
+    "command_runtime",
+    "output_read",
+    "follow_up",
+]
+
+# Turn the spans recorded in the current context belong to
+current_turn = contextvars.ContextVar("current_turn", default=None)
+
+
+class _Span:
+    """A running span, written when its block exits."""
+
+    __slots__ = ("tracer", "name", "attrs", "started")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.started = None
+
+    def set(self, **attrs):
+        """Attach attributes known only once the span is running."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self.name, time.perf_counter() - self.started, **self.attrs)
+        return False
+
+
+class _NullSpan:
+    """Span used while tracing is disabled: costs one attribute lookup."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Writer of timing spans.
+
+    Spans are tagged with the turn of the context that records them; the turn
+    follows the work into worker threads because MCP tags and blocking calls
+    run with a copy of the caller's context. Each span is one JSON line with
+    its start time, duration, turn, thread and attributes. Lines are handed
+    straight to a logging RotatingFileHandler, which serializes concurrent
+    writers, so neither the log level nor logging.disable() silences them.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._handler = None
+
+    def configure(self, config):
+        """
+        Enable or disable tracing from the configuration.
+
+        Args:
+            config (dict): Full Neo AI configuration
+        """
+        settings = dict(DEFAULT_TRACE_CONFIG)
+        settings.update(config.get('trace', {}) or {})
+
+        self.close()
+        if not settings["enabled"]:
+            return
+
+        from logging.handlers import RotatingFileHandler
+
+        self.path = os.path.expanduser(settings["path"])
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            handler = RotatingFileHandler(self.path, maxBytes=settings["max_bytes"],
+                                          backupCount=settings["backups"], encoding="utf-8")
+        except OSError as e:
+            logging.error(f"Tracing disabled, cannot open {self.path}: {e}")
+            return
+
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._handler = handler
+        self.enabled = True
+        logging.info(f"Tracing turns to {self.path}")
+
+    def span(self, name, **attrs):
+        """
+        Time a block of code.
+
+        Args:
+            name (str): Phase name, see PHASES
+            **attrs: Attributes stored with the span
+
+        Returns:
+            Context manager whose set() adds attributes while the block runs
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def record(self, name, duration, **attrs):
+        """
+        Write a span measured by the caller.
+
+        Args:
+            name (str): Phase name, see PHASES
+            duration (float): Duration in seconds
+            **attrs: Attributes stored with the span
+        """
+        if not self.enabled:
+            return
+        entry = {
+            "ts": round(time.time() - duration, 6),
+            "turn": current_turn.get(),
+            "span": name,
+            "ms": round(duration * 1000.0, 3),
+            "thread": threading.current_thread().name,
+        }
+        entry.update(attrs)
+        try:
+            self._handler.handle(logging.makeLogRecord({"msg": json.dumps(entry, default=str)}))
+        except Exception as e:
+            logging.debug(f"Failed to write trace span: {e}")
+
+    def start_turn(self):
+        """
+        Open a new turn in the current context.
+
+        Returns:
+            contextvars.Token: Pass to end_turn()
+        """
+        return current_turn.set(os.urandom(6).hex() if self.enabled else None)
+
+    def end_turn(self, token):
+        """Close the turn opened by start_turn()."""
+        current_turn.reset(token)
+
+    def close(self):
+        """Flush and close the trace file."""
+        self.enabled = False
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+
+
+# Shared tracer, configured by AsyncNeoAI
+tracer = Tracer()
+
+
+def percentile(samples, percent):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        samples (iterable): Measured values
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        float: Percentile, or None without samples
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def load_spans(path, backups=DEFAULT_TRACE_CONFIG["backups"]):
+    """
+    Read the spans of a trace file and of its rotated backups, oldest first.
+
+    Args:
+        path (str): Trace file
+        backups (int): Rotated files to look for
+
+    Returns:
+        list: Span dictionaries; unreadable lines are skipped
+    """
+    files = [f"{path}.{index}" for index in range(backups, 0, -1)] + [path]
+    spans = []
+    for file_path in files:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        spans.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return spans
+
+
+def summarize(spans):
+    """
+    Per-phase latency statistics.
+
+    Args:
+        spans (list): Span dictionaries from load_spans()
+
+    Returns:
+        dict: Phase name -> {'count', 'p50', 'p95', 'max', 'total'} in milliseconds,
+            known phases first
+    """
+    durations = {}
+    for span in spans:
+        if "span" in span and "ms" in span:
+            durations.setdefault(span["span"], []).append(float(span["ms"]))
+
+    order = [name for name in PHASES if name in durations]
+    order += sorted(name for name in durations if name not in PHASES)
+
+    summary = {}
+    for name in order:
+        values = sorted(durations[name])
+        summary[name] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1],
+            "total": sum(values),
+        }
+    return summary
+
+
+def print_summary(summary, turns=None):
+    """Print the per-phase statistics as a table."""
+    if turns is not None:
+        print(f"{turns} turns traced\n")
+    print(f"{'phase':<20}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}{'total s':>10}")
+    for name, stats in summary.items():
+        print(f"{name:<20}{stats['count']:>8}{stats['p50']:>12.2f}{stats['p95']:>12.2f}"
+              f"{stats['max']:>12.2f}{stats['total'] / 1000.0:>10.2f}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a Neo AI trace file")
+    parser.add_argument("path", nargs="?", default=DEFAULT_TRACE_CONFIG["path"], help="Trace file")
+    args = parser.parse_args()
+
+    path = os.path.expanduser(args.path)
+    spans = load_spans(path)
+    if not spans:
+        print(f"No spans found in {path}. Run Neo with --trace first.")
+        sys.exit(1)
+
+    turns = len({span.get("turn") for span in spans if span.get("turn")})
+    print_summary(summarize(spans), turns)
+
+
+if __name__ == "__main__":
+    main()
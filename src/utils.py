@@ -1,7 +1,14 @@
 import re
 import os
+import getpass
 from src.mcp_protocol import mcp  # Import the MCP singleton
 
+# Defaults used when the 'context' section is missing from config.yaml
+DEFAULT_CONTEXT_CONFIG = {
+    "prefetch": True,           # Gather the first turn's context in the background at startup
+    "max_entries": 200,         # Directory entries listed at most in the context
+}
+
 
 def load_persistent_memory():
     """
@@ -14,17 +21,71 @@ def load_persistent_memory():
     memory_file = "/tmp/persistent_memory.txt"
     if not os.path.exists(memory_file):
         # Creating persistent memory file with system information
+        system = os.uname()
         with open(memory_file, "w") as f:
-            f.write(f"Kernel Version: {os.uname().release}\n")
-            f.write(f"OS Info: {os.uname().sysname}\n")
-            f.write(f"Architecture: {os.uname().machine}\n")
-            f.write(f"Hostname: {os.uname().nodename}\n")
-            f.write(f"User: {os.getlogin()}\n")
+            f.write(f"Kernel Version: {system.release}\n")
+            f.write(f"OS Info: {system.sysname}\n")
+            f.write(f"Architecture: {system.machine}\n")
+            f.write(f"Hostname: {system.nodename}\n")
+            # getlogin() fails without a controlling terminal (daemon, batch, cron)
+            f.write(f"User: {getpass.getuser()}\n")
 
     with open(memory_file, "r") as f:
         return f.read()
 
 
+def list_directory(directory, max_entries=200):
+    """
+    List a directory like 'ls', without starting a process.
+    Hidden entries are skipped and huge directories are cut at max_entries.
+
+    Args:
+        directory (str): Directory to list
+        max_entries (int): Entries listed at most
+
+    Returns:
+        str: One name per line, sorted
+    """
+    names = []
+    truncated = False
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if len(names) >= max_entries:
+                    truncated = True
+                    break
+                names.append(entry.name)
+    except OSError as e:
+        return f"ls: cannot open directory '{directory}': {e.strerror}"
+
+    listing = "\n".join(sorted(names))
+    if truncated:
+        listing += f"\n... (listing cut at {max_entries} entries)"
+    return listing
+
+
+def gather_context(directory=None, max_entries=200):
+    """
+    Build the context sent with the first prompt of a conversation: the
+    persistent memory, the working directory and its listing.
+
+    Args:
+        directory (str): Working directory, the process one when not given
+        max_entries (int): Directory entries listed at most
+
+    Returns:
+        str: Context block
+    """
+    directory = directory or os.getcwd()
+    context_data = load_persistent_memory()
+    initial_context = "<context>\n"
+    initial_context += f"Command: pwd\nResult:\n{directory}\n"
+    initial_context += f"Command: ls\nResult:\n{list_directory(directory, max_entries)}\n"
+    return f"{context_data}\n\n{initial_context}</context>"
+
+
 def parse_hooks(text):
     """
     Parse hooks like <mcp:protocol> tags and legacy <system> or <s> tags in text.
@@ -0,0 +1,66 @@
+"""
+Tests of HistoryManager: a compacted history keeps alternating roles.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from src.history_manager import HistoryManager, SUMMARY_PREFIX
+
+CONFIG = {"tokens": {"tokenizer": "heuristic"}, "history": {"token_budget": 1500, "keep_recent": 4}}
+
+
+def conversation(turns):
+    """A context prompt followed by question and answer turns."""
+    history = [{"role": "user", "content": "<context>\ncwd: /tmp\n</context>\n\nFirst question"}]
+    for turn in range(turns):
+        history.append({"role": "assistant", "content": f"Answer number {turn} " + "word " * 40})
+        history.append({"role": "user", "content": f"Question number {turn} " + "word " * 40})
+    return history
+
+
+class CompactionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = HistoryManager(CONFIG, "model")
+
+    def assert_alternating(self, history):
+        roles = [message["role"] for message in history]
+        for previous, current in zip(roles, roles[1:]):
+            self.assertNotEqual(previous, current, roles)
+
+    def test_summary_is_merged_into_the_context_message(self):
+        history = conversation(20)
+        self.assertTrue(self.manager.compact(history))
+
+        self.assertLessEqual(self.manager.count_tokens(history), 1500)
+        self.assert_alternating(history)
+        self.assertIn("<context>", history[0]["content"])
+        self.assertIn(SUMMARY_PREFIX, history[0]["content"])
+        self.assertEqual(sum(SUMMARY_PREFIX in message["content"] for message in history), 1)
+
+    def test_summary_of_an_earlier_compaction_is_folded(self):
+        history = conversation(20)
+        self.manager.compact(history)
+        first_summary = history[0]["content"].split(SUMMARY_PREFIX)[1]
+
+        history.extend(conversation(10)[1:])
+        self.manager.compact(history)
+
+        self.assert_alternating(history)
+        self.assertEqual(history[0]["content"].count(SUMMARY_PREFIX), 1)
+        # The oldest entries make room for the new ones, the latest earlier one is kept
+        self.assertIn(first_summary.strip().splitlines()[-1], history[0]["content"])
+        self.assertLessEqual(self.manager.count_tokens(history), 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests of MCPBatch: an interrupted approval prompt must not leave a tag unresolved.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+from unittest import mock
+from concurrent.futures import wait
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from src.approval_handler import ApprovalHandler
+from src.mcp_protocol import mcp
+
+
+class InterruptedApprovalTest(unittest.TestCase):
+    """Ctrl+C at the approval prompt."""
+
+    def setUp(self):
+        patcher = mock.patch.object(ApprovalHandler, "request_approval", side_effect=KeyboardInterrupt)
+        self.request_approval = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.batch = mcp.create_batch(require_approval=True, auto_approve=False)
+        self.addCleanup(self.batch.close)
+
+    def test_read_only_tag_raises_interrupt_and_cancels_the_rest(self):
+        first = self.batch.add("network", "dns")
+        second = self.batch.add("network", "hosts")
+        with self.assertRaises(KeyboardInterrupt):
+            first.result(timeout=5)
+        # Resolved as cancelled, not left pending for the stream to wait on
+        wait([second], timeout=5)
+        self.assertTrue(second.cancelled())
+        self.request_approval.assert_called_once()
+
+    def test_barrier_tag_raises_interrupt_and_cancels_the_rest(self):
+        first = self.batch.add("terminal", "echo never")
+        second = self.batch.add("terminal", "echo never either")
+        with self.assertRaises(KeyboardInterrupt):
+            first.result(timeout=5)
+        # Resolved as cancelled, not left pending for the stream to wait on
+        wait([second], timeout=5)
+        self.assertTrue(second.cancelled())
+
+    def test_interrupt_reaches_the_event_loop(self):
+        future = self.batch.add("network", "dns")
+
+        async def wait_for_tag():
+            await asyncio.wait_for(asyncio.wrap_future(future), 5)
+
+        with self.assertRaises(KeyboardInterrupt):
+            asyncio.run(wait_for_tag())
+
+
+class ReadOnlyTagsTest(unittest.TestCase):
+    """Tags that run in parallel and under the read_only approval policy."""
+
+    def test_network_probes_are_not_read_only(self):
+        handler = mcp.registry.get_handler("network")
+        self.assertTrue(handler.is_read_only("dns"))
+        for command in ("scan:10.0.0.0/24", "ping:example.com", "trace:example.com"):
+            with self.subTest(command=command):
+                self.assertFalse(handler.is_read_only(command))
+
+
+if __name__ == "__main__":
+    unittest.main()
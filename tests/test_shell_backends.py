@@ -0,0 +1,55 @@
+"""
+Tests of the pseudo-terminal shell backend: commands reading stdin must not wait for input.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from src.command_executor import PersistentTerminalExecutor
+from src.shell_backends import PtyBackend
+
+
+class PtyBackendTest(unittest.TestCase):
+    """Commands run by a persistent shell on a pseudo-terminal."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix="neo-test-")
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.executor = PersistentTerminalExecutor(directory, PtyBackend())
+        self.addCleanup(self.executor._cleanup)
+
+    def run_command(self, command):
+        """Run a command with a generous timeout, return its output and duration."""
+        started = time.monotonic()
+        self.executor.execute_command(command)
+        output = "".join(self.executor.stream_output(timeout=30))
+        return output, time.monotonic() - started
+
+    def test_pseudo_terminal_is_the_controlling_terminal_but_not_stdin(self):
+        # Opening /dev/tty only works with a controlling terminal
+        output, _ = self.run_command("[ -t 0 ] || echo stdin-not-a-tty; tty < /dev/tty")
+        self.assertIn("stdin-not-a-tty\n/dev/tty\n", output)
+        self.assertEqual(self.executor.last_completion["exit_code"], 0)
+
+    def test_stdin_reading_commands_finish_at_once(self):
+        for command in ("cat", "read answer; echo done", "head -n 1"):
+            with self.subTest(command=command):
+                output, elapsed = self.run_command(command)
+                self.assertLess(elapsed, 5)
+                self.assertIn("Command completed with exit code:", output)
+                self.assertIsNone(self.executor.last_completion["stopped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
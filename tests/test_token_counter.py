@@ -0,0 +1,68 @@
+"""
+Tests of TokenCounter: when counts are exact and when the tokenizer is loaded.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Make the src package importable when run from any directory
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from src.token_counter import TokenCounter
+
+
+class FakeEncoding:
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+def _unknown(model):
+    raise KeyError(model)
+
+
+def fake_tiktoken():
+    """tiktoken stand-in knowing a single model."""
+    module = mock.Mock()
+    module.encoding_for_model.side_effect = lambda model: FakeEncoding() if model == "gpt-4" else _unknown(model)
+    module.get_encoding.return_value = FakeEncoding()
+    return module
+
+
+class TokenizerSelectionTest(unittest.TestCase):
+    """Tokenizer 'auto' and 'tiktoken' with tiktoken installed."""
+
+    def setUp(self):
+        self.tiktoken = fake_tiktoken()
+        patcher = mock.patch.dict(sys.modules, {"tiktoken": self.tiktoken})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def counter(self, model, tokenizer="auto"):
+        return TokenCounter({"tokens": {"tokenizer": tokenizer}}, model)
+
+    def test_encoding_is_loaded_on_first_count(self):
+        counter = self.counter("gpt-4")
+        self.tiktoken.encoding_for_model.assert_not_called()
+        self.assertEqual(counter.count_text("one two three"), 3)
+        self.tiktoken.encoding_for_model.assert_called_once_with("gpt-4")
+
+    def test_auto_is_exact_for_a_known_model(self):
+        self.assertTrue(self.counter("gpt-4").exact)
+
+    def test_auto_fallback_encoding_is_an_estimate(self):
+        counter = self.counter("local-model")
+        self.assertEqual(counter.count_text("one two three"), 3)
+        self.assertFalse(counter.exact)
+
+    def test_explicit_tiktoken_fallback_is_trusted(self):
+        self.assertTrue(self.counter("local-model", tokenizer="tiktoken").exact)
+
+
+if __name__ == "__main__":
+    unittest.main()